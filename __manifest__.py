@@ -24,18 +24,32 @@ Features:
     "author": "Store Operations",
     "website": "",
     "license": "LGPL-3",
-    "depends": ["base", "web", "mail"],
+    "depends": ["base", "web", "mail", "bus"],
     "data": [
         "security/ir.model.access.csv",
+        "security/inventory_expense_security.xml",
+        "data/ir_cron_data.xml",
         "wizard/quick_add_wizard_views.xml",
+        "wizard/quick_add_batch_wizard_views.xml",
         "views/inventory_expense_views.xml",
         "report/inventory_expense_report.xml",
         "wizard/expense_report_wizard_views.xml",
+        "wizard/expense_import_wizard_views.xml",
+        "views/inventory_expense_report_job_views.xml",
+        "views/inventory_expense_import_job_views.xml",
+        "views/inventory_expense_extraction_cache_views.xml",
+        "views/inventory_expense_report_cache_views.xml",
+        "views/inventory_expense_daily_summary_views.xml",
+        "views/inventory_expense_audit_log_views.xml",
+        "views/inventory_expense_archive_views.xml",
+        "wizard/metrics_dashboard_views.xml",
+        "data/inventory_expense_summary_data.xml",
         "views/res_config_settings_views.xml",
     ],
     "assets": {
         "web.assets_backend": [
             "inventory_expense/static/src/scss/inventory_expense.scss",
+            "inventory_expense/static/src/js/extraction_service.js",
         ],
     },
     "installable": True,
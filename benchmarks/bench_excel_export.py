@@ -0,0 +1,158 @@
+"""Compare peak memory and wall time of the legacy and streaming Excel exports.
+
+Each measurement runs in a fresh interpreter so that ``ru_maxrss`` reflects a
+single export. Only openpyxl is required; no Odoo database is involved, the
+rows are synthetic tuples shaped like ``ExpenseReportWizard._iter_expense_rows``.
+
+Usage::
+
+    python benchmarks/bench_excel_export.py --sizes 10000 100000 1000000 \\
+        --output bench_excel.json
+"""
+
+import argparse
+import base64
+import importlib.util
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+MODULE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _load_writer_module():
+    spec = importlib.util.spec_from_file_location(
+        "xlsx_export", os.path.join(MODULE_ROOT, "tools", "xlsx_export.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_rows(count, seed=42):
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    vendors = ["Costco Business Center", "Walmart", "Home Depot", "Staples"]
+    users = ["Alice", "Bob", "Carol", "Dan"]
+    for index in range(count):
+        subtotal = round(rng.uniform(5, 2000), 2)
+        tax = round(subtotal * 0.13, 2)
+        yield (
+            str(start + timedelta(days=index % 1500)),
+            f"{rng.choice(vendors)} - #{index}",
+            subtotal,
+            subtotal + tax,
+            tax,
+            rng.choice(users),
+        )
+
+
+def export_legacy(count):
+    """Reproduces the pre-streaming export: styled cells, BytesIO, base64."""
+    from openpyxl import Workbook
+    from openpyxl.styles import Border, Side
+
+    workbook = Workbook()
+    sheet = workbook.active
+    border = Border(
+        left=Side(style="thin"),
+        right=Side(style="thin"),
+        top=Side(style="thin"),
+        bottom=Side(style="thin"),
+    )
+    row = 12
+    for values in synthetic_rows(count):
+        for col, value in enumerate(values, 1):
+            cell = sheet.cell(row=row, column=col)
+            cell.value = value
+            if col in (3, 4, 5):
+                cell.number_format = "#,##0.00"
+            cell.border = border
+        row += 1
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return len(base64.b64encode(buffer.read()))
+
+
+def export_streaming(count):
+    writer = _load_writer_module().ExpenseXlsxWriter()
+    writer.write_title("Inventory Expense Report", ["Period: benchmark"])
+    writer.write_table_header()
+    writer.write_rows(synthetic_rows(count))
+    with tempfile.TemporaryFile() as tmp:
+        writer.save(tmp)
+        return tmp.tell()
+
+
+MODES = {"legacy": export_legacy, "streaming": export_streaming}
+
+
+def run_single(mode, count):
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    size = MODES[mode](count)
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "mode": mode,
+        "rows": count,
+        "seconds": round(elapsed, 3),
+        "peak_rss_kb": peak,
+        "delta_rss_kb": peak - baseline,
+        "output_bytes": size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 100000, 1000000]
+    )
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument(
+        "--legacy-max-rows",
+        type=int,
+        default=None,
+        help="Skip the legacy export above this many rows (it can exhaust RAM).",
+    )
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--single", nargs=2, metavar=("MODE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_single(args.single[0], int(args.single[1]))))
+        return
+
+    results = []
+    for count in args.sizes:
+        for mode in args.modes:
+            if mode == "legacy" and args.legacy_max_rows and count > args.legacy_max_rows:
+                continue
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--single", mode, str(count)],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            result = json.loads(proc.stdout)
+            results.append(result)
+            print(
+                f"{mode:>9} {count:>9} rows  {result['seconds']:>8.2f}s  "
+                f"peak {result['peak_rss_kb'] / 1024:>8.1f} MiB"
+            )
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Measure receipt payload size and extraction latency before/after preprocessing.
+
+Runs every image/PDF in a corpus directory through
+``tools/receipt_preprocess.py`` and reports the base64 payload size of the
+original and preprocessed upload plus the preprocessing time. When
+``--extract`` is given (and ``OPENAI_API_KEY`` is set) both variants are also
+sent to the model to compare extraction latency.
+
+Usage::
+
+    python benchmarks/bench_receipt_preprocess.py ~/receipts --output bench.json
+    python benchmarks/bench_receipt_preprocess.py ~/receipts --extract --model gpt-4o-mini
+"""
+
+import argparse
+import base64
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+
+MODULE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MIME_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".pdf": "application/pdf",
+}
+
+
+def _load_tool(name):
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(MODULE_ROOT, "tools", f"{name}.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _payload_size(images):
+    return sum(len(base64.b64encode(data)) for data, _mime in images)
+
+
+def _extract(client, model, images):
+    started = time.perf_counter()
+    client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": "Return the receipt total as JSON."},
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:{mime};base64,{base64.b64encode(data).decode()}",
+                            "detail": "high",
+                        },
+                    }
+                    for data, mime in images
+                ],
+            },
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=100,
+    )
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", help="Directory of receipt images and PDFs")
+    parser.add_argument("--max-dimension", type=int, default=1600)
+    parser.add_argument("--format", choices=["JPEG", "WEBP"], default="JPEG")
+    parser.add_argument("--extract", action="store_true", help="Also time real API calls")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--output", help="Write per-file results as JSON to this file.")
+    args = parser.parse_args()
+
+    preprocess = _load_tool("receipt_preprocess")
+    client = None
+    if args.extract:
+        from openai import OpenAI
+
+        client = OpenAI(
+            api_key=os.environ["OPENAI_API_KEY"],
+            base_url=os.environ.get("OPENAI_API_BASE_URL", "https://api.openai.com/v1"),
+        )
+
+    results = []
+    for filename in sorted(os.listdir(args.corpus)):
+        mime_type = MIME_TYPES.get(os.path.splitext(filename)[1].lower())
+        if not mime_type:
+            continue
+        with open(os.path.join(args.corpus, filename), "rb") as fh:
+            raw = fh.read()
+
+        started = time.perf_counter()
+        processed = preprocess.preprocess_receipt(
+            raw, mime_type, max_dimension=args.max_dimension, image_format=args.format
+        )
+        result = {
+            "file": filename,
+            "original_payload": _payload_size([(raw, mime_type)]),
+            "processed_payload": _payload_size(processed),
+            "pages": len(processed),
+            "preprocess_seconds": round(time.perf_counter() - started, 4),
+        }
+        if client:
+            if mime_type != "application/pdf":
+                result["original_latency"] = round(
+                    _extract(client, args.model, [(raw, mime_type)]), 3
+                )
+            result["processed_latency"] = round(_extract(client, args.model, processed), 3)
+        results.append(result)
+        print(
+            f"{filename:<40} {result['original_payload'] / 1024:>9.0f} KiB -> "
+            f"{result['processed_payload'] / 1024:>7.0f} KiB  "
+            f"({result['preprocess_seconds']:.2f}s)"
+        )
+
+    if results:
+        ratios = [r["processed_payload"] / r["original_payload"] for r in results]
+        print(f"median payload ratio: {statistics.median(ratios):.3f}")
+        for key in ("original_latency", "processed_latency"):
+            values = [r[key] for r in results if key in r]
+            if values:
+                print(f"median {key}: {statistics.median(values):.2f}s")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
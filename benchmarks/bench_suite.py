@@ -0,0 +1,338 @@
+"""Synthetic-data benchmark suite for the inventory_expense module.
+
+Generates realistic ``inventory.expense`` rows across several companies and
+users inside a database where the module is installed, times the module's hot
+paths and writes the results to a JSON file so runs can be compared between
+versions. The synthetic data is rolled back at the end unless ``--keep`` is
+given.
+
+Usage (from a directory where ``odoo`` is importable)::
+
+    python benchmarks/bench_suite.py -c odoo.conf -d bench_db \\
+        --expenses 100000 --companies 3 --users 10 --days 1095 \\
+        --output bench_100k.json
+
+Compare two result files with ``--compare old.json new.json``.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+VENDORS = [
+    "Costco Business Center",
+    "Walmart",
+    "Home Depot",
+    "Staples",
+    "Restaurant Depot",
+    "Sam's Club",
+    "Office Depot",
+    "Lowe's",
+]
+GENERATE_BATCH_SIZE = 5000
+
+
+class Suite:
+    def __init__(self, env, args):
+        self.env = env
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.results = []
+        self.companies = env["res.company"]
+        self.users = env["res.users"]
+
+    # Data generation --------------------------------------------------------
+
+    def _setup_companies_and_users(self):
+        env = self.env
+        companies = env.company
+        for index in range(1, self.args.companies):
+            companies |= env["res.company"].create({"name": f"Bench Store {index}"})
+        users = env["res.users"]
+        for index in range(self.args.users):
+            company = companies[index % len(companies)]
+            users |= (
+                env["res.users"]
+                .with_context(no_reset_password=True)
+                .create(
+                    {
+                        "name": f"Bench User {index}",
+                        "login": f"bench_user_{index}_{self.args.seed}",
+                        "company_id": company.id,
+                        "company_ids": [(6, 0, companies.ids)],
+                    }
+                )
+            )
+        self.companies, self.users = companies, users
+
+    def _synthetic_values(self, count):
+        end = date.today()
+        for index in range(count):
+            subtotal = round(self.rng.lognormvariate(4.5, 1.0), 2)
+            tax = round(subtotal * self.rng.choice([0.0, 0.05, 0.13]), 2)
+            yield {
+                "name": f"{self.rng.choice(VENDORS)} - #{index}",
+                "date": end - timedelta(days=self.rng.randrange(self.args.days)),
+                "total_without_tax": subtotal,
+                "total_with_tax": subtotal + tax,
+                "company_id": self.rng.choice(self.companies).id,
+                "user_id": self.rng.choice(self.users).id,
+                "needs_review": self.rng.random() < 0.1,
+                "notes": "Synthetic benchmark expense" if self.rng.random() < 0.3 else False,
+            }
+
+    def generate(self):
+        self._setup_companies_and_users()
+        Expense = self.env["inventory.expense"].with_context(
+            tracking_disable=True, mail_create_nolog=True
+        )
+        started = time.perf_counter()
+        batch = []
+        for values in self._synthetic_values(self.args.expenses):
+            batch.append(values)
+            if len(batch) == GENERATE_BATCH_SIZE:
+                Expense.create(batch)
+                self.env.flush_all()
+                self.env.invalidate_all()
+                batch = []
+        if batch:
+            Expense.create(batch)
+        self.env.flush_all()
+        self.env.invalidate_all()
+        self._record("generate", [time.perf_counter() - started], rows=self.args.expenses)
+
+    # Measurement helpers ----------------------------------------------------
+
+    def _record(self, name, timings, **extra):
+        result = {
+            "name": name,
+            "runs": len(timings),
+            "median_s": round(statistics.median(timings), 6),
+            "min_s": round(min(timings), 6),
+            "max_s": round(max(timings), 6),
+        }
+        result.update(extra)
+        self.results.append(result)
+        print(f"{name:<45} median {result['median_s']:>10.4f}s  min {result['min_s']:>10.4f}s")
+
+    def measure(self, name, func, repeat=None, **extra):
+        timings = []
+        value = None
+        for _i in range(repeat or self.args.repeat):
+            self.env.flush_all()
+            self.env.invalidate_all()
+            started = time.perf_counter()
+            try:
+                value = func()
+            except Exception as e:
+                self.results.append({"name": name, "error": str(e)})
+                print(f"{name:<45} error: {e}")
+                return None
+            timings.append(time.perf_counter() - started)
+        self._record(name, timings, **extra)
+        return value
+
+    # Benchmarks -------------------------------------------------------------
+
+    def _wizard(self, date_from):
+        return self.env["expense.report.wizard"].create(
+            {
+                "date_from": date_from,
+                "date_to": date.today(),
+                "company_id": self.env.company.id,
+                "report_type": "detailed",
+            }
+        )
+
+    def bench_report_wizard(self):
+        ranges = {
+            "month": date.today().replace(day=1),
+            "year": date.today() - timedelta(days=365),
+            "all": date.today() - timedelta(days=self.args.days),
+        }
+        for label, date_from in ranges.items():
+            wizard = self._wizard(date_from)
+            count = self.measure(
+                f"wizard_compute_totals[{label}]", lambda: wizard.expense_count
+            )
+            self.measure(
+                f"wizard_compute_expenses[{label}]",
+                lambda: len(wizard.expense_ids),
+                rows=count,
+            )
+
+            def export_excel():
+                with tempfile.TemporaryFile() as tmp:
+                    wizard._write_excel(tmp)
+                    return tmp.tell()
+
+            size = self.measure(f"export_excel[{label}]", export_excel, repeat=1, rows=count)
+            if size is not None:
+                self.results[-1]["bytes"] = size
+            if label == "month" or self.args.pdf_all_ranges:
+                self.measure(
+                    f"generate_pdf[{label}]", wizard._render_pdf, repeat=1, rows=count
+                )
+
+    def bench_read_group(self):
+        Expense = self.env["inventory.expense"]
+        measures = ["total_with_tax:sum", "tax_amount:sum", "total_without_tax:sum"]
+        self.measure(
+            "pivot_read_group[date:month]",
+            lambda: Expense.read_group([], measures, ["date:month"], lazy=False),
+        )
+        self.measure(
+            "pivot_read_group[date:month,company_id]",
+            lambda: Expense.read_group(
+                [], measures, ["date:month", "company_id"], lazy=False
+            ),
+        )
+        if "inventory.expense.daily.summary" in self.env:
+            Summary = self.env["inventory.expense.daily.summary"]
+            self.measure(
+                "summary_read_group[date:month]",
+                lambda: Summary.read_group(
+                    [], ["expense_count:sum"] + measures, ["date:month"], lazy=False
+                ),
+            )
+
+    def bench_search_filters(self):
+        today = date.today()
+        quarter_start = today.replace(day=1, month=(today.month - 1) // 3 * 3 + 1)
+        filters = {
+            "this_month": [("date", ">=", today.replace(day=1))],
+            "this_quarter": [("date", ">=", quarter_start)],
+            "this_year": [("date", ">=", today.replace(month=1, day=1))],
+            "needs_review": [("needs_review", "=", True)],
+        }
+        Expense = self.env["inventory.expense"]
+        for name, domain in filters.items():
+            self.measure(
+                f"search_filter[{name}]",
+                lambda domain=domain: Expense.search_fetch(
+                    domain, ["date", "name", "total_with_tax", "user_id"], limit=80
+                ),
+            )
+            self.measure(
+                f"search_count[{name}]", lambda domain=domain: Expense.search_count(domain)
+            )
+
+    def bench_create(self):
+        Expense = self.env["inventory.expense"]
+        single = self.args.create_count
+        values = list(self._synthetic_values(single))
+
+        def create_single(model):
+            for vals in values:
+                model.create(dict(vals))
+            self.env.flush_all()
+
+        def create_multi(model):
+            model.create([dict(vals) for vals in values])
+            self.env.flush_all()
+
+        variants = [("", Expense)]
+        if "ledger_source" in Expense._fields:
+            variants.append(
+                ("_ledger", Expense.with_context(inventory_expense_ledger="api"))
+            )
+        for suffix, model in variants:
+            for name, func in [("create_single", create_single), ("create_multi", create_multi)]:
+                self.measure(f"{name}{suffix}", lambda: func(model), repeat=1, rows=single)
+                if "median_s" in self.results[-1]:
+                    self.results[-1]["rows_per_s"] = round(
+                        single / self.results[-1]["median_s"], 1
+                    )
+
+    def run(self):
+        self.generate()
+        self.bench_report_wizard()
+        self.bench_read_group()
+        self.bench_search_filters()
+        self.bench_create()
+        return self.results
+
+
+def compare(old_path, new_path):
+    with open(old_path) as fh:
+        old = {r["name"]: r for r in json.load(fh)["results"] if "median_s" in r}
+    with open(new_path) as fh:
+        new = {r["name"]: r for r in json.load(fh)["results"] if "median_s" in r}
+    for name in sorted(old.keys() & new.keys()):
+        ratio = new[name]["median_s"] / old[name]["median_s"] if old[name]["median_s"] else 0
+        flag = "  REGRESSION" if ratio > 1.2 else ""
+        print(
+            f"{name:<45} {old[name]['median_s']:>10.4f}s -> "
+            f"{new[name]['median_s']:>10.4f}s  x{ratio:.2f}{flag}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-c", "--config", help="Odoo configuration file")
+    parser.add_argument("-d", "--database", help="Database with inventory_expense installed")
+    parser.add_argument("--expenses", type=int, default=10000)
+    parser.add_argument("--companies", type=int, default=3)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--days", type=int, default=3 * 365, help="Date spread in days")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--create-count", type=int, default=500)
+    parser.add_argument("--pdf-all-ranges", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Commit the synthetic data")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if not args.database:
+        parser.error("--database is required")
+
+    import odoo
+    from odoo import SUPERUSER_ID, api
+    from odoo.modules.registry import Registry
+
+    odoo_args = ["-d", args.database]
+    if args.config:
+        odoo_args = ["-c", args.config] + odoo_args
+    odoo.tools.config.parse_config(odoo_args)
+
+    registry = Registry(args.database)
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        module = env["ir.module.module"].search([("name", "=", "inventory_expense")])
+        results = Suite(env, args).run()
+        if args.keep:
+            cr.commit()
+        else:
+            cr.rollback()
+
+    payload = {
+        "meta": {
+            "module_version": module.installed_version,
+            "odoo_version": odoo.release.version,
+            "python": platform.python_version(),
+            "expenses": args.expenses,
+            "companies": args.companies,
+            "users": args.users,
+            "days": args.days,
+            "seed": args.seed,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as fh:
+        json.dump(payload, fh, indent=2, default=str)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from . import export
+from . import metrics
+from . import archive
+from . import upload
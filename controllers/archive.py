@@ -0,0 +1,30 @@
+from odoo import http
+from odoo.http import request
+
+
+class InventoryExpenseArchive(http.Controller):
+    @http.route(
+        "/inventory_expense/archive/<int:archive_id>/receipt",
+        type="http",
+        auth="user",
+        methods=["GET"],
+    )
+    def receipt(self, archive_id):
+        """Serve one archived receipt straight out of its pack."""
+        archive = request.env["inventory.expense.archive"].browse(archive_id).exists()
+        if not archive or not archive.pack_id:
+            raise request.not_found()
+        archive.check_access("read")
+        data = archive.pack_id._read_member(archive.pack_member)
+        return request.make_response(
+            data,
+            headers=[
+                ("Content-Type", archive.receipt_mimetype or "application/octet-stream"),
+                (
+                    "Content-Disposition",
+                    http.content_disposition(
+                        archive.receipt_filename or archive.pack_member, "inline"
+                    ),
+                ),
+            ],
+        )
@@ -0,0 +1,132 @@
+import csv
+import io
+import json
+import tempfile
+
+from odoo import api, http
+from odoo.http import Response, request
+from odoo.modules.registry import Registry
+
+from ..tools import xlsx_export
+
+STREAM_CHUNK_SIZE = 64 * 1024
+EXPORT_MIMETYPES = {
+    "pdf": "application/pdf",
+    "xlsx": xlsx_export.XLSX_MIMETYPE,
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+}
+
+
+def _encode_csv(records):
+    buffer = io.StringIO()
+    writer = None
+    for record in records:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(record))
+            writer.writeheader()
+        writer.writerow(record)
+        if buffer.tell() >= STREAM_CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def _encode_jsonl(records):
+    chunk = []
+    size = 0
+    for record in records:
+        line = json.dumps(record, default=str, separators=(",", ":")) + "\n"
+        chunk.append(line)
+        size += len(line)
+        if size >= STREAM_CHUNK_SIZE:
+            yield "".join(chunk).encode()
+            chunk, size = [], 0
+    yield "".join(chunk).encode()
+
+
+ENCODERS = {
+    "csv": _encode_csv,
+    "jsonl": _encode_jsonl,
+}
+
+
+class InventoryExpenseExport(http.Controller):
+    @http.route(
+        "/inventory_expense/export/<int:wizard_id>/<string:export_format>",
+        type="http",
+        auth="user",
+        methods=["GET"],
+    )
+    def export(self, wizard_id, export_format):
+        """Stream a report export to the browser without storing it."""
+        if export_format not in EXPORT_MIMETYPES:
+            raise request.not_found()
+        wizard = request.env["expense.report.wizard"].browse(wizard_id).exists()
+        if not wizard:
+            raise request.not_found()
+        wizard.check_access("read")
+        headers = [
+            ("Content-Type", EXPORT_MIMETYPES[export_format]),
+            (
+                "Content-Disposition",
+                http.content_disposition(wizard._get_export_filename(export_format)),
+            ),
+            ("Cache-Control", "no-store"),
+        ]
+        cached = (
+            wizard._get_cached_report(export_format)
+            if export_format in ("pdf", "xlsx")
+            else None
+        )
+        if cached:
+            body = self._content_chunks(cached._get_content())
+        elif export_format == "pdf":
+            content = wizard._render_pdf()
+            wizard._cache_report("pdf", content)
+            body = self._content_chunks(content)
+        elif export_format == "xlsx":
+            body = self._xlsx_chunks(wizard)
+        else:
+            body = self._record_chunks(
+                request.db,
+                request.env.uid,
+                dict(request.env.context),
+                wizard_id,
+                ENCODERS[export_format],
+            )
+        return Response(body, headers=headers, direct_passthrough=True)
+
+    def _xlsx_chunks(self, wizard):
+        # the zip container must be complete before it can be sent; it is
+        # spooled to a temporary file and streamed from there
+        tmp = tempfile.TemporaryFile()
+        try:
+            wizard._write_excel(tmp)
+            if wizard.env["inventory.expense.report.cache"]._get_key(wizard, "xlsx"):
+                tmp.seek(0)
+                wizard._cache_report("xlsx", tmp.read())
+            tmp.seek(0)
+        except Exception:
+            tmp.close()
+            raise
+
+        def chunks():
+            with tmp:
+                while data := tmp.read(STREAM_CHUNK_SIZE):
+                    yield data
+
+        return chunks()
+
+    def _content_chunks(self, content):
+        for offset in range(0, len(content), STREAM_CHUNK_SIZE):
+            yield content[offset : offset + STREAM_CHUNK_SIZE]
+
+    def _record_chunks(self, dbname, uid, context, wizard_id, encoder):
+        # the response body is consumed after the request cursor is closed,
+        # so rows are read with a dedicated cursor while streaming
+        with Registry(dbname).cursor() as cr:
+            env = api.Environment(cr, uid, context)
+            wizard = env["expense.report.wizard"].browse(wizard_id)
+            yield from encoder(wizard._iter_export_records())
@@ -0,0 +1,38 @@
+import hmac
+import os
+
+from odoo import http
+from odoo.http import request
+from odoo.tools import config
+
+from ..tools import metrics
+
+metrics.configure(os.path.join(config["data_dir"], "inventory_expense_metrics"))
+
+
+class InventoryExpenseMetrics(http.Controller):
+    @http.route("/inventory_expense/metrics", type="http", auth="public", methods=["GET"])
+    def metrics(self):
+        """Prometheus scrape endpoint for the metrics of all workers.
+
+        Accessible with ``Authorization: Bearer <inventory_expense.metrics_token>``
+        or from an administrator session.
+        """
+        token = request.env["ir.config_parameter"].sudo().get_param(
+            "inventory_expense.metrics_token"
+        )
+        header = request.httprequest.headers.get("Authorization", "")
+        authorized = bool(token) and hmac.compare_digest(
+            header.encode(), f"Bearer {token}".encode()
+        )
+        if not (authorized or request.env.user.has_group("base.group_system")):
+            return request.make_response("Forbidden", status=403)
+        gauges = {
+            "inventory_expense_ai_rate_limit_queue_depth": request.env[
+                "inventory.expense.rate.bucket"
+            ].sudo()._get_queue_depth(),
+        }
+        return request.make_response(
+            metrics.render_prometheus(gauges),
+            headers=[("Content-Type", "text/plain; version=0.0.4; charset=utf-8")],
+        )
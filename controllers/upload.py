@@ -0,0 +1,97 @@
+import json
+
+from odoo import _, http
+from odoo.exceptions import AccessError, UserError
+from odoo.http import request
+
+
+class InventoryExpenseUpload(http.Controller):
+    """Resumable receipt upload API for mobile clients.
+
+    1. ``POST /inventory_expense/api/uploads`` with a JSON body
+       ``{"filename", "size", "sha256"?, "mode": "ai"|"quick_add", "name"?,
+       "date"?, "subtotal"?, "total"?}`` opens an upload, or answers with the
+       existing expense when ``sha256`` matches an earlier upload.
+    2. ``PUT /inventory_expense/api/uploads/<id>?offset=<n>`` with raw bytes
+       sends one chunk; the answer holds the next offset to send.
+    3. ``GET /inventory_expense/api/uploads/<id>`` tells where to resume.
+    4. ``POST /inventory_expense/api/uploads/<id>/complete`` creates the
+       expense through Quick Add or Quick Add AI.
+    """
+
+    def _respond(self, func, *args):
+        try:
+            return request.make_json_response(func(*args))
+        except (UserError, AccessError) as e:
+            request.env.cr.rollback()
+            return request.make_json_response({"error": str(e)}, status=400)
+
+    @http.route(
+        "/inventory_expense/api/uploads",
+        type="http",
+        auth="user",
+        methods=["POST"],
+        csrf=False,
+    )
+    def start(self):
+        # requiring a JSON content type keeps cross-site form posts out
+        if request.httprequest.mimetype != "application/json":
+            return request.make_json_response(
+                {"error": "Expected an application/json body"}, status=415
+            )
+        try:
+            params = json.loads(request.httprequest.get_data() or b"{}")
+        except ValueError:
+            return request.make_json_response(
+                {"error": "Invalid JSON body"}, status=400
+            )
+        return self._respond(request.env["inventory.expense.upload"]._start, params)
+
+    @http.route(
+        "/inventory_expense/api/uploads/<string:token>",
+        type="http",
+        auth="user",
+        methods=["GET"],
+    )
+    def status(self, token):
+        def get_status():
+            upload = request.env["inventory.expense.upload"].search(
+                [("token", "=", token)], limit=1
+            )
+            if not upload:
+                raise UserError(_("Unknown upload."))
+            return upload._get_status()
+
+        return self._respond(get_status)
+
+    @http.route(
+        "/inventory_expense/api/uploads/<string:token>",
+        type="http",
+        auth="user",
+        methods=["PUT"],
+        csrf=False,
+    )
+    def chunk(self, token, offset=0):
+        def write_chunk():
+            try:
+                start = int(offset)
+            except (TypeError, ValueError):
+                raise UserError(_("The chunk offset must be a whole number."))
+            upload = request.env["inventory.expense.upload"]._get_open_upload(token)
+            return upload._write_chunk(start, request.httprequest.stream)
+
+        return self._respond(write_chunk)
+
+    @http.route(
+        "/inventory_expense/api/uploads/<string:token>/complete",
+        type="http",
+        auth="user",
+        methods=["POST"],
+        csrf=False,
+    )
+    def complete(self, token):
+        def complete_upload():
+            upload = request.env["inventory.expense.upload"]._get_open_upload(token)
+            return upload._complete()
+
+        return self._respond(complete_upload)
@@ -1,2 +1,11 @@
+from . import inventory_expense_audit_log
 from . import inventory_expense
 from . import res_config_settings
+from . import inventory_expense_report_job
+from . import inventory_expense_import_job
+from . import inventory_expense_extraction_cache
+from . import inventory_expense_daily_summary
+from . import inventory_expense_archive
+from . import inventory_expense_rate_limit
+from . import inventory_expense_report_cache
+from . import inventory_expense_upload
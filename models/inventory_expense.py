@@ -1,5 +1,34 @@
+import base64
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from urllib.parse import quote
+
 from odoo import api, fields, models, _
-from odoo.exceptions import ValidationError
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+from ..tools import expense_import, metrics, receipt_preprocess
+from .inventory_expense_audit_log import LEDGER_SOURCES
+from .inventory_expense_daily_summary import SUMMARY_FIELDS
+
+_logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 1000
+EXTRACTION_BATCH_LIMIT = 500
+EXTRACTION_TIMEOUT_MINUTES = 30
+# re-photos measured at up to 6 bits shifted 20px and 10 bits rotated 0.5°
+DUPLICATE_HASH_DISTANCE = 10
+QUICK_SEARCH_LIMIT = 20
+TRUE_VALUES = {"1", "true", "yes", "y", "x"}
+REPORTED_FIELDS = SUMMARY_FIELDS + ["name", "user_id"]
+LEDGER_CONTEXT = {
+    "tracking_disable": True,
+    "mail_create_nolog": True,
+    "mail_create_nosubscribe": True,
+    "mail_notrack": True,
+}
 
 
 class InventoryExpense(models.Model):
@@ -7,13 +36,20 @@ class InventoryExpense(models.Model):
     _description = "Inventory Expense"
     _order = "date desc, id desc"
     _inherit = ["mail.thread", "mail.activity.mixin"]
+    _rec_names_search = ["name", "vendor_name"]
 
     name = fields.Char(
         string="Expense Name",
         required=True,
         tracking=True,
+        index="trigram",
         help='Brief description of the expense (e.g., "Costco Business Center - Office Supplies")',
     )
+    vendor_name = fields.Char(
+        string="Vendor",
+        index="trigram",
+        help="Vendor name read from the receipt by AI extraction",
+    )
     date = fields.Date(
         string="Expense Date",
         required=True,
@@ -57,8 +93,56 @@ class InventoryExpense(models.Model):
     receipt_filename = fields.Char(
         string="Receipt Filename",
     )
+    receipt_image_512 = fields.Image(
+        string="Receipt Preview",
+        compute="_compute_receipt_image_512",
+        store=True,
+        attachment=True,
+        max_width=512,
+        max_height=512,
+        help="Precomputed preview of the receipt (first page for PDFs)",
+    )
+    receipt_image_128 = fields.Image(
+        string="Receipt Thumbnail",
+        related="receipt_image_512",
+        store=True,
+        max_width=128,
+        max_height=128,
+    )
+    receipt_phash = fields.Char(
+        string="Receipt Hash",
+        compute="_compute_receipt_phash",
+        store=True,
+        readonly=True,
+        copy=False,
+        help="Perceptual hash of the receipt preview, used to spot duplicate receipts",
+    )
+    duplicate_of_id = fields.Many2one(
+        comodel_name="inventory.expense",
+        string="Possible Duplicate Of",
+        readonly=True,
+        copy=False,
+        index="btree_not_null",
+        ondelete="set null",
+    )
+    duplicate_of_archive_id = fields.Many2one(
+        comodel_name="inventory.expense.archive",
+        string="Possible Duplicate Of (Archived)",
+        readonly=True,
+        copy=False,
+        index="btree_not_null",
+        ondelete="set null",
+        help="Set when the expense this one repeats was moved to the archive",
+    )
+    duplicate_dismissed = fields.Boolean(
+        string="Not a Duplicate",
+        readonly=True,
+        copy=False,
+        help="Set when a user confirmed this expense is not a duplicate",
+    )
     notes = fields.Text(
         string="Notes",
+        index="trigram",
         help="Additional details about the expense",
     )
     company_id = fields.Many2one(
@@ -91,6 +175,70 @@ class InventoryExpense(models.Model):
         tracking=True,
         help="Indicates the expense data needs to be verified by a user",
     )
+    ledger_source = fields.Selection(
+        selection=LEDGER_SOURCES,
+        string="Created Via",
+        readonly=True,
+        help="Set for system-created expenses recorded in ledger mode (no chatter; see the audit log)",
+    )
+    extraction_state = fields.Selection(
+        selection=[
+            ("pending", "Pending"),
+            ("running", "Running"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+        ],
+        string="AI Extraction",
+        readonly=True,
+        copy=False,
+        index="btree_not_null",
+        help="Status of the background AI extraction of the receipt",
+    )
+    extraction_error = fields.Char(
+        string="Extraction Error",
+        readonly=True,
+        copy=False,
+    )
+    extraction_started = fields.Datetime(
+        string="Extraction Started",
+        readonly=True,
+        copy=False,
+    )
+    extraction_batch = fields.Char(
+        string="Extraction Batch",
+        readonly=True,
+        copy=False,
+        index="btree_not_null",
+        help="Batch API job the receipt was submitted with",
+    )
+    audit_log_ids = fields.One2many(
+        comodel_name="inventory.expense.audit.log",
+        inverse_name="expense_id",
+        string="Audit Log",
+        readonly=True,
+    )
+
+    @api.depends("receipt_image", "receipt_filename")
+    def _compute_receipt_image_512(self):
+        for record in self:
+            receipt = record.with_context(bin_size=False).receipt_image
+            thumbnail = None
+            if receipt:
+                thumbnail = receipt_preprocess.make_thumbnail(
+                    base64.b64decode(receipt),
+                    receipt_preprocess.get_mime_type(record.receipt_filename),
+                )
+            record.receipt_image_512 = base64.b64encode(thumbnail) if thumbnail else False
+
+    @api.depends("receipt_image_512")
+    def _compute_receipt_phash(self):
+        for record in self:
+            preview = record.with_context(bin_size=False).receipt_image_512
+            record.receipt_phash = (
+                receipt_preprocess.perceptual_hash(base64.b64decode(preview))
+                if preview
+                else False
+            )
 
     @api.depends("total_with_tax")
     def _compute_is_zero_value(self):
@@ -119,6 +267,592 @@ class InventoryExpense(models.Model):
             if record.total_without_tax > record.total_with_tax:
                 raise ValidationError(_("Subtotal cannot exceed total paid."))
 
+    def init(self):
+        super().init()
+        create_index(
+            self.env.cr,
+            "inventory_expense_company_date_total_index",
+            self._table,
+            ["company_id", "date", "total_with_tax"],
+        )
+
+    @api.model
+    @metrics.timed("inventory_expense_quick_search_seconds")
+    def quick_search(self, query, limit=QUICK_SEARCH_LIMIT):
+        """Return expenses matching ``query``, best matches first.
+
+        Name, vendor and notes are matched by substring and by trigram word
+        similarity, so misspelled vendors ("cstco") are found too. Both
+        operators are served by the trigram indexes on these columns.
+        """
+        query = (query or "").strip()
+        if not query:
+            return []
+        read_fields = ["name", "vendor_name", "date", "total_with_tax"]
+        if not self.env.registry.has_trigram:
+            records = self.search_read(
+                [
+                    "|",
+                    "|",
+                    ("name", "ilike", query),
+                    ("vendor_name", "ilike", query),
+                    ("notes", "ilike", query),
+                ],
+                read_fields,
+                limit=limit,
+            )
+            return [dict(record, score=1.0) for record in records]
+
+        unaccent = self.env.registry.unaccent
+        term = unaccent(SQL("%s", query))
+        pattern = unaccent(SQL("%s", f"%{query}%"))
+        matches = []
+        scores = []
+        for fname in ("name", "vendor_name", "notes"):
+            column = unaccent(SQL.identifier(self._table, fname))
+            matches.append(
+                SQL("%s ILIKE %s OR %s <%% %s", column, pattern, term, column)
+            )
+            scores.append(SQL("word_similarity(%s, coalesce(%s, ''))", term, column))
+        score = SQL("GREATEST(%s)", SQL(", ").join(scores))
+        search_query = self._search([])
+        search_query.add_where(SQL("(%s)", SQL(" OR ").join(matches)))
+        search_query.order = SQL(
+            "%s DESC, %s DESC", score, SQL.identifier(self._table, "date")
+        )
+        search_query.limit = limit
+        rows = self.env.execute_query(
+            search_query.select(SQL.identifier(self._table, "id"), score)
+        )
+        scores_by_id = dict(rows)
+        records = self.browse(list(scores_by_id)).read(read_fields)
+        return [dict(record, score=scores_by_id[record["id"]]) for record in records]
+
+    def _ledger_env(self):
+        """Return ``(records, source)``, muted for chatter in ledger mode."""
+        source = self.env.context.get("inventory_expense_ledger")
+        if not source:
+            return self, False
+        return self.with_context(**LEDGER_CONTEXT), source
+
+    @api.model_create_multi
+    @metrics.timed("inventory_expense_create_seconds")
+    def create(self, vals_list):
+        model, source = self._ledger_env()
+        if source:
+            for vals in vals_list:
+                vals.setdefault("ledger_source", source)
+        records = super(InventoryExpense, model).create(vals_list)
+        Summary = self.env["inventory.expense.daily.summary"]
+        Summary._apply_deltas(Summary._get_deltas(records))
+        self.env["inventory.expense.data.version"]._bump(records)
+        if source:
+            self.env["inventory.expense.audit.log"]._log(records, "create", source)
+        records._flag_duplicates()
+        metrics.inc(
+            "inventory_expense_created_total", len(records), source=source or "form"
+        )
+        return records.with_env(self.env)
+
+    def write(self, vals):
+        records, source = self._ledger_env()
+        if any(field in vals for field in REPORTED_FIELDS):
+            self.env["inventory.expense.data.version"]._bump(self)
+        if any(field in vals for field in SUMMARY_FIELDS):
+            Summary = self.env["inventory.expense.daily.summary"]
+            before = Summary._get_deltas(self, sign=-1)
+            result = super(InventoryExpense, records).write(vals)
+            Summary._apply_deltas(
+                Summary._merge_deltas(before, Summary._get_deltas(self))
+            )
+        else:
+            result = super(InventoryExpense, records).write(vals)
+        if "date" in vals or "company_id" in vals:
+            self.env["inventory.expense.data.version"]._bump(self)
+        if source:
+            self.env["inventory.expense.audit.log"]._log(self, "write", source, vals)
+        return result
+
+    def unlink(self):
+        if self.env.context.get("inventory_expense_archiving"):
+            # archived expenses keep counting in the daily summary
+            return super().unlink()
+        Summary = self.env["inventory.expense.daily.summary"]
+        deltas = Summary._get_deltas(self, sign=-1)
+        self.env["inventory.expense.data.version"]._bump(self)
+        result = super().unlink()
+        Summary._apply_deltas(deltas)
+        return result
+
+    @api.model
+    def _import_lookup_maps(self):
+        companies = {}
+        for company in self.env.companies:
+            companies[str(company.id)] = company.id
+            companies[company.name.lower()] = company.id
+        users = {
+            user["login"].lower(): user["id"]
+            for user in self.env["res.users"].search_read([], ["login"])
+        }
+        return companies, users
+
+    @api.model
+    def _import_convert_row(self, row, companies, users):
+        """Convert one normalized import row to create values or raise ValueError."""
+        if "__error__" in row:
+            raise ValueError(row["__error__"])
+        name = row.get("name")
+        if not name:
+            raise ValueError(_("Missing expense name"))
+        if not row.get("date"):
+            raise ValueError(_("Missing date"))
+        try:
+            expense_date = fields.Date.to_date(row["date"])
+        except (TypeError, ValueError):
+            raise ValueError(_("Invalid date %r (expected YYYY-MM-DD)", row["date"]))
+
+        def amount(key):
+            value = row.get(key)
+            if value in (None, ""):
+                return None
+            try:
+                return float(str(value).replace(",", ""))
+            except ValueError:
+                raise ValueError(_("Invalid amount %r", value))
+
+        total = amount("total_with_tax")
+        if total is None:
+            raise ValueError(_("Missing total paid"))
+        subtotal = amount("total_without_tax")
+        if subtotal is None:
+            subtotal = total
+        if total < 0 or subtotal < 0:
+            raise ValueError(_("Amounts cannot be negative"))
+        if subtotal > total:
+            raise ValueError(_("Subtotal cannot exceed total paid"))
+
+        company_id = self.env.company.id
+        if row.get("company"):
+            company_id = companies.get(str(row["company"]).lower())
+            if not company_id:
+                raise ValueError(_("Unknown or inaccessible company %r", row["company"]))
+        user_id = self.env.user.id
+        if row.get("user"):
+            user_id = users.get(str(row["user"]).lower())
+            if not user_id:
+                raise ValueError(_("Unknown user %r", row["user"]))
+
+        return {
+            "name": name,
+            "date": expense_date,
+            "total_with_tax": total,
+            "total_without_tax": subtotal,
+            "notes": row.get("notes") or False,
+            "company_id": company_id,
+            "user_id": user_id,
+            "needs_review": str(row.get("needs_review") or "").lower() in TRUE_VALUES,
+        }
+
+    @api.model
+    def _import_expenses(
+        self, rows, chunk_size=IMPORT_CHUNK_SIZE, source="import", progress=None
+    ):
+        """Create expenses from ``(line, row)`` pairs in ``create`` batches.
+
+        Rows are validated a chunk at a time before creation so a bad row
+        never aborts its batch; rejected rows are returned with their reason.
+        The ORM cache is cleared after each chunk to keep memory flat. After
+        each chunk ``progress(rows, created, rejected)`` is called with the
+        chunk's counts, e.g. to commit it along with a resume offset.
+        """
+        companies, users = self._import_lookup_maps()
+        Expense = self.with_context(inventory_expense_ledger=source)
+        created = 0
+        rejected = []
+        for chunk in expense_import.chunked(rows, chunk_size):
+            vals_list = []
+            chunk_rejected = []
+            for line, row in chunk:
+                try:
+                    vals_list.append(self._import_convert_row(row, companies, users))
+                except ValueError as e:
+                    chunk_rejected.append((line, str(e)))
+            if vals_list:
+                Expense.create(vals_list)
+                created += len(vals_list)
+            rejected += chunk_rejected
+            if progress:
+                progress(len(chunk), len(vals_list), chunk_rejected)
+            self.env.invalidate_all()
+        return {"created": created, "rejected": rejected}
+
+    @api.model
+    def import_expenses(self, rows, chunk_size=IMPORT_CHUNK_SIZE):
+        """Bulk-create expenses from a list of dicts (CSV/JSON column names).
+
+        Returns ``{"created": int, "rejected": [[index, reason], ...]}``.
+        """
+        result = self._import_expenses(
+            (
+                (index, expense_import.normalize_row(row))
+                for index, row in enumerate(rows, 1)
+            ),
+            chunk_size=chunk_size,
+            source="api",
+        )
+        result["rejected"] = [list(item) for item in result["rejected"]]
+        return result
+
+    def _find_duplicates(self):
+        """Return ``{expense_id: original_id}`` for likely duplicates in ``self``.
+
+        An older expense of the same company with the same date and total
+        (non-zero) is always a duplicate. Expenses of the same company and
+        date whose receipt hashes are within ``DUPLICATE_HASH_DISTANCE``
+        bits are too, which catches re-photos whose total was read
+        differently. Both lookups use the company/date/total index.
+        """
+        expense_ids = [
+            expense.id for expense in self if not expense.duplicate_dismissed
+        ]
+        if not expense_ids:
+            return {}
+        self.flush_model(
+            [
+                "company_id",
+                "date",
+                "total_with_tax",
+                "receipt_phash",
+                "duplicate_dismissed",
+            ]
+        )
+        self.env.cr.execute(
+            """
+            SELECT e.id, o.id,
+                   e.total_with_tax != 0 AND o.total_with_tax = e.total_with_tax,
+                   e.receipt_phash, o.receipt_phash
+              FROM inventory_expense e
+              JOIN inventory_expense o
+                ON o.company_id = e.company_id
+               AND o.date = e.date
+               AND o.id < e.id
+             WHERE e.id = ANY(%s)
+               AND (
+                    (e.total_with_tax != 0 AND o.total_with_tax = e.total_with_tax)
+                    OR (e.receipt_phash IS NOT NULL AND o.receipt_phash IS NOT NULL)
+               )
+          ORDER BY o.id
+            """,
+            [expense_ids],
+        )
+        rows = self.env.cr.fetchall()
+        duplicates = {}
+        for expense_id, original_id, same_total, phash, original_phash in rows:
+            if expense_id in duplicates:
+                continue
+            if same_total or (
+                receipt_preprocess.hash_distance(phash, original_phash)
+                <= DUPLICATE_HASH_DISTANCE
+            ):
+                duplicates[expense_id] = original_id
+        return duplicates
+
+    def _flag_duplicates(self):
+        """Point likely duplicates in ``self`` to the expense they repeat."""
+        by_original = defaultdict(list)
+        for expense_id, original_id in self._find_duplicates().items():
+            by_original[original_id].append(expense_id)
+        Expense = self.with_context(inventory_expense_ledger=False)
+        for original_id, expense_ids in by_original.items():
+            Expense.browse(expense_ids).write({"duplicate_of_id": original_id})
+        return len(by_original)
+
+    @api.model
+    def _cron_scan_duplicates(self, batch_size=1000):
+        """Flag duplicate clusters in the existing history.
+
+        Candidates (same company, date and total, or same company and date
+        with a receipt hash) are found with two grouped scans; their members
+        are then checked in batches like new expenses.
+        """
+        self.env.cr.execute(
+            """
+            SELECT unnest((array_agg(id ORDER BY id))[2:])
+              FROM inventory_expense
+             WHERE total_with_tax != 0
+          GROUP BY company_id, date, total_with_tax
+            HAVING count(*) > 1
+             UNION
+            SELECT unnest((array_agg(id ORDER BY id))[2:])
+              FROM inventory_expense
+             WHERE receipt_phash IS NOT NULL
+          GROUP BY company_id, date
+            HAVING count(*) > 1
+            """
+        )
+        candidate_ids = sorted(row[0] for row in self.env.cr.fetchall())
+        for chunk in expense_import.chunked(candidate_ids, batch_size):
+            expenses = self.browse(chunk).filtered(
+                lambda expense: not expense.duplicate_of_id
+            )
+            expenses._flag_duplicates()
+            self.env.cr.commit()
+            self.env.invalidate_all()
+
+    def action_dismiss_duplicate(self):
+        self.write(
+            {
+                "duplicate_of_id": False,
+                "duplicate_of_archive_id": False,
+                "duplicate_dismissed": True,
+            }
+        )
+
+    def action_open_duplicate(self):
+        self.ensure_one()
+        original = self.duplicate_of_id or self.duplicate_of_archive_id
+        return {
+            "type": "ir.actions.act_window",
+            "res_model": original._name,
+            "res_id": original.id,
+            "view_mode": "form",
+            "target": "current",
+        }
+
+    def _uses_batch_extraction(self):
+        QuickAdd = self.env["quick.add.wizard"]
+        return QuickAdd._get_provider_class(QuickAdd._get_config()).batch
+
+    def _trigger_extraction(self):
+        # batch providers collect the backlog on the cron's own schedule
+        if not self._uses_batch_extraction():
+            self.env.ref("inventory_expense.ir_cron_process_extractions")._trigger()
+
+    def _get_receipts(self):
+        return [
+            (
+                expense.receipt_image,
+                receipt_preprocess.get_mime_type(expense.receipt_filename),
+            )
+            for expense in self
+        ]
+
+    def _run_extractions(self):
+        """Extract the receipts of ``self`` with AI and fill in the expenses.
+
+        Runs in the cron worker: the records are marked as running and
+        committed before the (slow) API calls, which run concurrently. If
+        the worker dies meanwhile, the records are claimed again once the
+        extraction timeout has passed.
+        """
+        self.write(
+            {
+                "extraction_state": "running",
+                "extraction_error": False,
+                "extraction_started": fields.Datetime.now(),
+            }
+        )
+        self.env.cr.commit()
+        try:
+            results = self.env["quick.add.batch.wizard"]._extract_all(
+                self._get_receipts()
+            )
+        except Exception as e:
+            _logger.warning("AI extraction failed: %s", e)
+            results = [(None, str(e))] * len(self)
+        self._apply_extractions(results)
+
+    def _apply_extractions(self, results):
+        """Write one ``(extraction, error)`` result per expense, then notify.
+
+        An expense whose result is refused by the constraints is marked as
+        failed instead of rolling back the others.
+        """
+        QuickAdd = self.env["quick.add.wizard"]
+        for expense, (extraction, error) in zip(self, results):
+            if extraction:
+                values = QuickAdd._prepare_extracted_values(
+                    extraction, expense.receipt_image, expense.receipt_filename
+                )
+                del values["receipt_image"], values["receipt_filename"]
+                values.update(extraction_state="done", extraction_batch=False)
+            else:
+                values = {
+                    "extraction_state": "failed",
+                    "extraction_error": error or _("No data could be extracted"),
+                    "extraction_batch": False,
+                }
+            owner = expense.user_id or self.env.user
+            target = expense.with_user(owner).with_company(expense.company_id)
+            try:
+                with self.env.cr.savepoint():
+                    target.with_context(inventory_expense_ledger="quick_add_ai").write(
+                        values
+                    )
+            except UserError as e:
+                # a bad result must not hold back the rest of the claim
+                _logger.warning("Extraction of expense %s rejected: %s", expense.id, e)
+                target.write(
+                    {
+                        "extraction_state": "failed",
+                        "extraction_error": str(e),
+                        "extraction_batch": False,
+                    }
+                )
+        self.filtered(
+            lambda expense: expense.extraction_state == "done"
+        )._flag_duplicates()
+        self.env.cr.commit()
+        for expense in self:
+            expense._notify_extraction()
+
+    def _notify_extraction(self):
+        self.ensure_one()
+        self.env["bus.bus"]._sendone(
+            self.user_id.partner_id,
+            "inventory_expense/extraction",
+            {
+                "expense_id": self.id,
+                "name": self.name,
+                "state": self.extraction_state,
+            },
+        )
+
+    @api.model
+    def _claim_pending_extractions(self, limit):
+        """Lock up to ``limit`` pending expenses, and running ones whose
+        worker gave up on them (not batch submissions, which take hours).
+        """
+        self.env.cr.execute(
+            """
+            SELECT id FROM inventory_expense
+             WHERE extraction_state = 'pending'
+                OR (
+                    extraction_state = 'running'
+                    AND extraction_batch IS NULL
+                    AND extraction_started < %s
+                )
+          ORDER BY id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+            """,
+            [
+                fields.Datetime.now() - timedelta(minutes=EXTRACTION_TIMEOUT_MINUTES),
+                limit,
+            ],
+        )
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    @api.model
+    def _submit_extraction_batch(self, provider):
+        """Send pending receipts to the batch provider in one request file.
+
+        Receipts found in the extraction cache are applied right away; if
+        the submission fails the rest stay pending for the next run.
+        """
+        expenses = self._claim_pending_extractions(EXTRACTION_BATCH_LIMIT)
+        if not expenses:
+            return
+        Cache = self.env["inventory.expense.extraction.cache"]
+        cached = []
+        for expense in expenses:
+            checksum = Cache._checksum(base64.b64decode(expense.receipt_image))
+            cached.append(Cache._lookup(checksum, provider.config))
+        hits = self.browse(
+            [expense.id for expense, result in zip(expenses, cached) if result]
+        )
+        if hits:
+            hits._apply_extractions([(result, None) for result in cached if result])
+        remaining = expenses - hits
+        if not remaining:
+            return
+        try:
+            batch_id = provider.submit(
+                [
+                    (expense.id, data, mime_type)
+                    for expense, (data, mime_type) in zip(
+                        remaining, remaining._get_receipts()
+                    )
+                ],
+                metadata={"source": "inventory_expense"},
+            )
+        except Exception as e:
+            _logger.warning("Could not submit the extraction batch: %s", e)
+            return
+        remaining.write(
+            {
+                "extraction_state": "running",
+                "extraction_error": False,
+                "extraction_started": fields.Datetime.now(),
+                "extraction_batch": batch_id,
+            }
+        )
+        self.env.cr.commit()
+
+    @api.model
+    def _collect_extraction_batches(self, provider):
+        Cache = self.env["inventory.expense.extraction.cache"]
+        groups = self._read_group(
+            [("extraction_state", "=", "running"), ("extraction_batch", "!=", False)],
+            groupby=["extraction_batch"],
+        )
+        for (batch_id,) in groups:
+            try:
+                results = provider.collect(batch_id)
+            except Exception as e:
+                _logger.warning("Could not collect extraction batch %s: %s", batch_id, e)
+                continue
+            if results is None:
+                continue
+            expenses = self.search(
+                [
+                    ("extraction_batch", "=", batch_id),
+                    ("extraction_state", "=", "running"),
+                ]
+            )
+            missing = results.get("*", (None, _("Missing from the batch results")))
+            expense_results = [
+                results.get(str(expense.id), missing) for expense in expenses
+            ]
+            QuickAdd = self.env["quick.add.wizard"]
+            for expense, (extraction, _error) in zip(expenses, expense_results):
+                if extraction and not QuickAdd._check_extraction(extraction):
+                    checksum = Cache._checksum(base64.b64decode(expense.receipt_image))
+                    Cache._store(checksum, provider.config, extraction)
+            expenses._apply_extractions(expense_results)
+
+    @api.model
+    def _cron_process_extractions(self, limit=10):
+        if self._uses_batch_extraction():
+            QuickAdd = self.env["quick.add.wizard"]
+            try:
+                provider = QuickAdd._get_provider()
+            except UserError as e:
+                _logger.warning("Batch extraction is not available: %s", e)
+                return
+            self._collect_extraction_batches(provider)
+            self._submit_extraction_batch(provider)
+            return
+        batch_size = self.env["quick.add.batch.wizard"]._get_max_workers()
+        for _i in range(limit):
+            expenses = self._claim_pending_extractions(batch_size)
+            if not expenses:
+                return
+            expenses._run_extractions()
+        self._trigger_extraction()
+
+    def action_retry_extraction(self):
+        self.filtered(
+            lambda expense: expense.extraction_state in ("failed", "running")
+        ).write(
+            {
+                "extraction_state": "pending",
+                "extraction_error": False,
+                "extraction_batch": False,
+            }
+        )
+        self._trigger_extraction()
+
     def name_get(self):
         result = []
         for record in self:
@@ -126,6 +860,15 @@ class InventoryExpense(models.Model):
             result.append((record.id, name))
         return result
 
+    def action_open_receipt(self):
+        self.ensure_one()
+        filename = quote(self.receipt_filename or "receipt", safe="")
+        return {
+            "type": "ir.actions.act_url",
+            "url": f"/web/content/{self._name}/{self.id}/receipt_image/{filename}",
+            "target": "new",
+        }
+
     def action_view_report_wizard(self):
         self.ensure_one()
         return {
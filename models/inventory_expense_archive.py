@@ -0,0 +1,441 @@
+import base64
+import tempfile
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+from odoo.tools import str2bool
+
+from ..tools import receipt_archive, receipt_preprocess
+from .inventory_expense import LEDGER_CONTEXT
+
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_MAX_BATCHES = 20
+ARCHIVED_FIELDS = [
+    "name",
+    "vendor_name",
+    "date",
+    "total_with_tax",
+    "total_without_tax",
+    "tax_amount",
+    "company_id",
+    "user_id",
+    "notes",
+    "needs_review",
+    "receipt_filename",
+]
+
+
+class InventoryExpenseArchivePack(models.Model):
+    """Zip blob holding the receipts of archived expenses."""
+
+    _name = "inventory.expense.archive.pack"
+    _description = "Archived Receipt Pack"
+    _order = "id desc"
+
+    name = fields.Char(
+        string="Name",
+        required=True,
+        readonly=True,
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        string="Company",
+        readonly=True,
+    )
+    attachment_id = fields.Many2one(
+        comodel_name="ir.attachment",
+        string="Pack File",
+        readonly=True,
+        ondelete="restrict",
+    )
+    receipt_count = fields.Integer(
+        string="Receipts",
+        readonly=True,
+    )
+    original_size = fields.Integer(
+        string="Original Size (bytes)",
+        readonly=True,
+    )
+    packed_size = fields.Integer(
+        string="Packed Size (bytes)",
+        readonly=True,
+    )
+
+    def _read_member(self, member):
+        self.ensure_one()
+        attachment = self.attachment_id.sudo()
+        if attachment.store_fname:
+            return receipt_archive.read_member(
+                attachment._full_path(attachment.store_fname), member
+            )
+        with tempfile.TemporaryFile() as source:
+            source.write(attachment.raw)
+            source.seek(0)
+            return receipt_archive.read_member(source, member)
+
+
+class InventoryExpenseArchive(models.Model):
+    """Cold storage for expenses of closed periods.
+
+    Expenses older than the configured age are moved here in batches by a
+    cron: the row is copied, its receipt is stored in a pack (recompressed
+    only when enabled in the settings), its chatter and audit log are moved
+    over and the live record is deleted. The daily summary keeps their
+    totals, and the ``inventory.expense.all`` view reads live and archived
+    rows together.
+    """
+
+    _name = "inventory.expense.archive"
+    _description = "Archived Inventory Expense"
+    _order = "date desc, id desc"
+    _inherit = ["mail.thread"]
+
+    original_id = fields.Integer(
+        string="Original ID",
+        readonly=True,
+        index=True,
+    )
+    name = fields.Char(
+        string="Expense Name",
+        required=True,
+        readonly=True,
+    )
+    vendor_name = fields.Char(
+        string="Vendor",
+        readonly=True,
+    )
+    date = fields.Date(
+        string="Expense Date",
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    total_with_tax = fields.Monetary(
+        string="Total Paid",
+        currency_field="currency_id",
+        readonly=True,
+    )
+    total_without_tax = fields.Monetary(
+        string="Subtotal",
+        currency_field="currency_id",
+        readonly=True,
+    )
+    tax_amount = fields.Monetary(
+        string="Tax Paid",
+        currency_field="currency_id",
+        readonly=True,
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        string="Company",
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    currency_id = fields.Many2one(
+        comodel_name="res.currency",
+        string="Currency",
+        related="company_id.currency_id",
+        readonly=True,
+    )
+    user_id = fields.Many2one(
+        comodel_name="res.users",
+        string="Created By",
+        readonly=True,
+    )
+    notes = fields.Text(
+        string="Notes",
+        readonly=True,
+    )
+    needs_review = fields.Boolean(
+        string="Needs Review",
+        readonly=True,
+    )
+    receipt_filename = fields.Char(
+        string="Receipt Filename",
+        readonly=True,
+    )
+    receipt_mimetype = fields.Char(
+        string="Receipt Type",
+        readonly=True,
+    )
+    pack_id = fields.Many2one(
+        comodel_name="inventory.expense.archive.pack",
+        string="Receipt Pack",
+        readonly=True,
+        index="btree_not_null",
+        ondelete="restrict",
+    )
+    pack_member = fields.Char(
+        string="Pack Member",
+        readonly=True,
+    )
+    archive_date = fields.Datetime(
+        string="Archived On",
+        readonly=True,
+    )
+    audit_log_ids = fields.One2many(
+        comodel_name="inventory.expense.audit.log",
+        inverse_name="archive_id",
+        string="Audit Log",
+        readonly=True,
+    )
+
+    @api.model
+    def _get_cutoff(self):
+        """First date that stays live, or ``None`` if archiving is disabled."""
+        months = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("inventory_expense.archive_after_months", default=0)
+        )
+        if months <= 0:
+            return None
+        return fields.Date.today().replace(day=1) - relativedelta(months=months)
+
+    @api.model
+    def _recompress_receipts(self):
+        return str2bool(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("inventory_expense.archive_recompress", default="False")
+        )
+
+    @api.model
+    def _archive_expenses(self, expenses):
+        """Move ``expenses`` to the archive with their receipts in one pack."""
+        now = fields.Datetime.now()
+        recompress = self._recompress_receipts()
+        snapshots = expenses.read(ARCHIVED_FIELDS, load=None)
+        members = []
+        original_size = 0
+        for expense, snapshot in zip(expenses, snapshots):
+            receipt = expense.with_context(bin_size=False).receipt_image
+            if not receipt:
+                continue
+            raw = base64.b64decode(receipt)
+            original_size += len(raw)
+            data = raw
+            mime_type = receipt_preprocess.get_mime_type(expense.receipt_filename)
+            if recompress:
+                data, mime_type = receipt_archive.compact_receipt(raw, mime_type)
+            member = receipt_archive.member_name(expense.id, mime_type)
+            members.append((member, data, mime_type))
+            snapshot.update(pack_member=member, receipt_mimetype=mime_type)
+
+        pack = self.env["inventory.expense.archive.pack"]
+        if members:
+            company = expenses[:1].company_id
+            dates = expenses.mapped("date")
+            with tempfile.TemporaryFile() as tmp:
+                receipt_archive.write_pack(tmp, members)
+                packed_size = tmp.tell()
+                tmp.seek(0)
+                name = f"{company.name} {min(dates)} - {max(dates)}"
+                attachment = self.env["ir.attachment"].sudo().create(
+                    {
+                        "name": f"{name}.zip",
+                        "raw": tmp.read(),
+                        "mimetype": receipt_archive.PACK_MIMETYPE,
+                        "res_model": pack._name,
+                    }
+                )
+            pack = pack.sudo().create(
+                {
+                    "name": name,
+                    "company_id": company.id,
+                    "attachment_id": attachment.id,
+                    "receipt_count": len(members),
+                    "original_size": original_size,
+                    "packed_size": packed_size,
+                }
+            )
+            attachment.res_id = pack.id
+
+        archives = (
+            self.sudo()
+            .with_context(**LEDGER_CONTEXT)
+            .create(
+                [
+                    dict(
+                        {key: value for key, value in snapshot.items() if key != "id"},
+                        original_id=snapshot["id"],
+                        pack_id=pack.id if snapshot.get("pack_member") else False,
+                        archive_date=now,
+                    )
+                    for snapshot in snapshots
+                ]
+            )
+        )
+        archives._take_over_history()
+        expenses.with_context(inventory_expense_archiving=True).unlink()
+
+    def _take_over_history(self):
+        """Point what refers to the original expenses of ``self`` at ``self``.
+
+        Chatter messages (with their tracking values), audit log entries
+        and the duplicate links of other expenses would otherwise be
+        deleted or cleared with the originals.
+        """
+        self.env["mail.message"].flush_model(["model", "res_id"])
+        self.env["inventory.expense.audit.log"].flush_model(["expense_id"])
+        self.env["inventory.expense"].flush_model(["duplicate_of_id"])
+        self.env.cr.execute(
+            """
+            UPDATE mail_message m
+               SET model = %(model)s, res_id = a.id
+              FROM inventory_expense_archive a
+             WHERE a.id = ANY(%(ids)s)
+               AND m.model = 'inventory.expense'
+               AND m.res_id = a.original_id
+            """,
+            {"model": self._name, "ids": self.ids},
+        )
+        self.env.cr.execute(
+            """
+            UPDATE inventory_expense_audit_log l
+               SET archive_id = a.id
+              FROM inventory_expense_archive a
+             WHERE a.id = ANY(%s)
+               AND l.expense_id = a.original_id
+            """,
+            [self.ids],
+        )
+        self.env.cr.execute(
+            """
+            UPDATE inventory_expense e
+               SET duplicate_of_archive_id = a.id
+              FROM inventory_expense_archive a
+             WHERE a.id = ANY(%s)
+               AND e.duplicate_of_id = a.original_id
+            """,
+            [self.ids],
+        )
+        self.env["mail.message"].invalidate_model(["model", "res_id"])
+        self.env["inventory.expense.audit.log"].invalidate_model(["archive_id"])
+        self.env["inventory.expense"].invalidate_model(["duplicate_of_archive_id"])
+
+    @api.model
+    def _cron_archive(
+        self, batch_size=ARCHIVE_BATCH_SIZE, max_batches=ARCHIVE_MAX_BATCHES
+    ):
+        cutoff = self._get_cutoff()
+        if not cutoff:
+            return
+        Expense = self.env["inventory.expense"].sudo()
+        domain = [
+            ("date", "<", cutoff),
+            ("extraction_state", "not in", ("pending", "running")),
+        ]
+        for _i in range(max_batches):
+            first = Expense.search(domain, order="company_id, date, id", limit=1)
+            if not first:
+                return
+            expenses = Expense.search(
+                domain + [("company_id", "=", first.company_id.id)],
+                order="date, id",
+                limit=batch_size,
+            )
+            self._archive_expenses(expenses)
+            self.env.cr.commit()
+            self.env.invalidate_all()
+        self.env.ref("inventory_expense.ir_cron_archive_expenses")._trigger()
+
+    def action_open_receipt(self):
+        self.ensure_one()
+        if not self.pack_id:
+            raise UserError(_("This archived expense has no receipt."))
+        return {
+            "type": "ir.actions.act_url",
+            "url": f"/inventory_expense/archive/{self.id}/receipt",
+            "target": "new",
+        }
+
+
+class InventoryExpenseAll(models.Model):
+    """Read-only union of live and archived expenses, for reporting."""
+
+    _name = "inventory.expense.all"
+    _description = "Inventory Expenses (Live and Archived)"
+    _auto = False
+    _order = "date desc, id desc"
+
+    res_id = fields.Integer(
+        string="Record ID",
+        readonly=True,
+    )
+    is_archived = fields.Boolean(
+        string="Archived",
+        readonly=True,
+    )
+    name = fields.Char(
+        string="Expense Name",
+        readonly=True,
+    )
+    date = fields.Date(
+        string="Expense Date",
+        readonly=True,
+    )
+    total_with_tax = fields.Monetary(
+        string="Total Paid",
+        currency_field="currency_id",
+        readonly=True,
+    )
+    total_without_tax = fields.Monetary(
+        string="Subtotal",
+        currency_field="currency_id",
+        readonly=True,
+    )
+    tax_amount = fields.Monetary(
+        string="Tax Paid",
+        currency_field="currency_id",
+        readonly=True,
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        string="Company",
+        readonly=True,
+    )
+    currency_id = fields.Many2one(
+        comodel_name="res.currency",
+        string="Currency",
+        related="company_id.currency_id",
+        readonly=True,
+    )
+    user_id = fields.Many2one(
+        comodel_name="res.users",
+        string="Created By",
+        readonly=True,
+    )
+
+    def init(self):
+        # even ids are live expenses, odd ids archived ones
+        self.env.cr.execute(
+            f"""
+            CREATE OR REPLACE VIEW {self._table} AS (
+                SELECT e.id * 2 AS id, e.id AS res_id, FALSE AS is_archived,
+                       e.name, e.date, e.total_with_tax, e.total_without_tax,
+                       e.tax_amount, e.company_id, e.user_id
+                  FROM inventory_expense e
+             UNION ALL
+                SELECT a.id * 2 + 1, a.id, TRUE,
+                       a.name, a.date, a.total_with_tax, a.total_without_tax,
+                       a.tax_amount, a.company_id, a.user_id
+                  FROM inventory_expense_archive a
+            )
+            """
+        )
+
+    def action_open_record(self):
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_window",
+            "res_model": "inventory.expense.archive"
+            if self.is_archived
+            else "inventory.expense",
+            "res_id": self.res_id,
+            "view_mode": "form",
+            "target": "current",
+        }
@@ -0,0 +1,109 @@
+import json
+
+from odoo import api, fields, models
+
+AUDIT_FIELDS = [
+    "name",
+    "date",
+    "total_without_tax",
+    "total_with_tax",
+    "company_id",
+    "needs_review",
+]
+
+LEDGER_SOURCES = [
+    ("quick_add_ai", "Quick Add AI"),
+    ("import", "Bulk Import"),
+    ("api", "API"),
+]
+
+
+class InventoryExpenseAuditLog(models.Model):
+    """Compact, append-only audit trail for machine-created expenses.
+
+    Expenses created or updated in ledger mode (``inventory_expense_ledger``
+    in the context) skip chatter messages and field tracking; instead one
+    row per record is appended here in a single batched insert.
+    """
+
+    _name = "inventory.expense.audit.log"
+    _description = "Inventory Expense Audit Log"
+    _order = "id desc"
+    _log_access = False
+
+    expense_id = fields.Many2one(
+        comodel_name="inventory.expense",
+        string="Expense",
+        index=True,
+        ondelete="set null",
+        readonly=True,
+    )
+    res_id = fields.Integer(
+        string="Expense ID",
+        readonly=True,
+        help="Kept when the expense itself is deleted",
+    )
+    archive_id = fields.Many2one(
+        comodel_name="inventory.expense.archive",
+        string="Archived Expense",
+        index="btree_not_null",
+        ondelete="set null",
+        readonly=True,
+        help="Set when the expense was moved to the archive",
+    )
+    event = fields.Selection(
+        selection=[
+            ("create", "Created"),
+            ("write", "Updated"),
+        ],
+        string="Event",
+        required=True,
+        readonly=True,
+    )
+    source = fields.Selection(
+        selection=LEDGER_SOURCES,
+        string="Source",
+        readonly=True,
+    )
+    user_id = fields.Many2one(
+        comodel_name="res.users",
+        string="User",
+        readonly=True,
+    )
+    date = fields.Datetime(
+        string="Date",
+        readonly=True,
+    )
+    values = fields.Text(
+        string="Values",
+        readonly=True,
+        help="JSON snapshot of the audited fields",
+    )
+
+    @api.model
+    def _log(self, expenses, event, source, vals=None):
+        """Append one entry per expense with a single batched insert."""
+        now = fields.Datetime.now()
+        if vals is None:
+            snapshots = expenses.read(AUDIT_FIELDS, load=None)
+        else:
+            changed = {key: value for key, value in vals.items() if key in AUDIT_FIELDS}
+            snapshots = [dict(changed, id=expense.id) for expense in expenses]
+        self.sudo().create(
+            [
+                {
+                    "expense_id": snapshot["id"],
+                    "res_id": snapshot["id"],
+                    "event": event,
+                    "source": source,
+                    "user_id": self.env.uid,
+                    "date": now,
+                    "values": json.dumps(
+                        {k: v for k, v in snapshot.items() if k != "id"},
+                        default=str,
+                        separators=(",", ":"),
+                    ),
+                }
+                for snapshot in snapshots
+            ]
+        )
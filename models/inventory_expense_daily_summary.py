@@ -0,0 +1,149 @@
+from collections import defaultdict
+
+from odoo import api, fields, models
+
+SUMMARY_FIELDS = [
+    "company_id",
+    "date",
+    "total_with_tax",
+    "total_without_tax",
+    "tax_amount",
+]
+
+
+class InventoryExpenseDailySummary(models.Model):
+    """Per-company, per-day expense totals maintained incrementally.
+
+    Rows are updated by ``inventory.expense`` create/write/unlink through
+    :meth:`_apply_deltas` and can be rebuilt from scratch with
+    :meth:`_rebuild`. Archived expenses keep their contribution.
+    """
+
+    _name = "inventory.expense.daily.summary"
+    _description = "Inventory Expense Daily Summary"
+    _order = "date desc, company_id"
+    _rec_name = "date"
+
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        string="Company",
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    date = fields.Date(
+        string="Date",
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    currency_id = fields.Many2one(
+        comodel_name="res.currency",
+        string="Currency",
+        related="company_id.currency_id",
+        readonly=True,
+    )
+    expense_count = fields.Integer(
+        string="Number of Expenses",
+        readonly=True,
+    )
+    total_without_tax = fields.Monetary(
+        string="Subtotal",
+        currency_field="currency_id",
+        readonly=True,
+    )
+    tax_amount = fields.Monetary(
+        string="Tax Paid",
+        currency_field="currency_id",
+        readonly=True,
+    )
+    total_with_tax = fields.Monetary(
+        string="Total Paid",
+        currency_field="currency_id",
+        readonly=True,
+    )
+
+    _sql_constraints = [
+        (
+            "company_date_unique",
+            "unique(company_id, date)",
+            "There can only be one summary row per company and day.",
+        ),
+    ]
+
+    @api.model
+    def _get_deltas(self, expenses, sign=1):
+        """Aggregate the contribution of ``expenses`` per (company, day)."""
+        deltas = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+        for expense in expenses:
+            delta = deltas[(expense.company_id.id, expense.date)]
+            delta[0] += sign
+            delta[1] += sign * (expense.total_without_tax or 0.0)
+            delta[2] += sign * (expense.tax_amount or 0.0)
+            delta[3] += sign * (expense.total_with_tax or 0.0)
+        return deltas
+
+    @api.model
+    def _merge_deltas(self, *deltas_list):
+        merged = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+        for deltas in deltas_list:
+            for key, delta in deltas.items():
+                merged[key] = [a + b for a, b in zip(merged[key], delta)]
+        return merged
+
+    @api.model
+    def _apply_deltas(self, deltas):
+        rows = [
+            (company_id, day, *delta)
+            for (company_id, day), delta in deltas.items()
+            if company_id and day and any(delta)
+        ]
+        if not rows:
+            return
+        now = fields.Datetime.now()
+        self.env.cr.execute(
+            f"""
+            INSERT INTO inventory_expense_daily_summary AS s
+                   (company_id, date, expense_count, total_without_tax, tax_amount,
+                    total_with_tax, create_uid, create_date, write_uid, write_date)
+            VALUES {", ".join(["%s"] * len(rows))}
+            ON CONFLICT (company_id, date) DO UPDATE
+               SET expense_count = s.expense_count + EXCLUDED.expense_count,
+                   total_without_tax = s.total_without_tax + EXCLUDED.total_without_tax,
+                   tax_amount = s.tax_amount + EXCLUDED.tax_amount,
+                   total_with_tax = s.total_with_tax + EXCLUDED.total_with_tax,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+            """,
+            [row + (self.env.uid, now, self.env.uid, now) for row in rows],
+        )
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild(self):
+        """Recompute every summary row from live and archived expenses."""
+        self.env["inventory.expense"].flush_model(SUMMARY_FIELDS)
+        self.env["inventory.expense.archive"].flush_model(SUMMARY_FIELDS)
+        cr = self.env.cr
+        cr.execute("DELETE FROM inventory_expense_daily_summary")
+        cr.execute(
+            """
+            INSERT INTO inventory_expense_daily_summary
+                   (company_id, date, expense_count, total_without_tax, tax_amount,
+                    total_with_tax, create_uid, create_date, write_uid, write_date)
+            SELECT company_id, date, count(*), sum(coalesce(total_without_tax, 0)),
+                   sum(coalesce(tax_amount, 0)), sum(coalesce(total_with_tax, 0)),
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM (
+                    SELECT company_id, date, total_without_tax, tax_amount, total_with_tax
+                      FROM inventory_expense
+                 UNION ALL
+                    SELECT company_id, date, total_without_tax, tax_amount, total_with_tax
+                      FROM inventory_expense_archive
+                   ) AS expense
+          GROUP BY company_id, date
+            """,
+            {"uid": self.env.uid},
+        )
+        self.invalidate_model()
+        return True
@@ -0,0 +1,163 @@
+import hashlib
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+from ..tools import metrics
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_MAX_ENTRIES = 10000
+DEFAULT_CACHE_MAX_AGE_DAYS = 90
+
+
+class InventoryExpenseExtractionCache(models.Model):
+    _name = "inventory.expense.extraction.cache"
+    _description = "Receipt Extraction Cache"
+    _order = "last_used desc, id desc"
+
+    key = fields.Char(
+        string="Key",
+        required=True,
+        readonly=True,
+        help="SHA-256 of the receipt checksum, model name and prompt version",
+    )
+    checksum = fields.Char(
+        string="Receipt Checksum",
+        required=True,
+        readonly=True,
+        help="SHA-256 of the receipt file contents",
+    )
+    model_name = fields.Char(
+        string="Model",
+        readonly=True,
+    )
+    prompt_version = fields.Char(
+        string="Prompt Version",
+        readonly=True,
+    )
+    vendor_name = fields.Char(
+        string="Vendor",
+        readonly=True,
+    )
+    receipt_date = fields.Char(
+        string="Receipt Date",
+        readonly=True,
+    )
+    subtotal = fields.Float(
+        string="Subtotal",
+        readonly=True,
+    )
+    total = fields.Float(
+        string="Total",
+        readonly=True,
+    )
+    hit_count = fields.Integer(
+        string="Hits",
+        readonly=True,
+        default=0,
+    )
+    last_used = fields.Datetime(
+        string="Last Used",
+        readonly=True,
+        default=fields.Datetime.now,
+        index=True,
+    )
+
+    _sql_constraints = [
+        ("key_unique", "unique(key)", "An extraction is already cached for this receipt."),
+    ]
+
+    @api.model
+    def _checksum(self, raw):
+        return hashlib.sha256(raw).hexdigest()
+
+    @api.model
+    def _get_key(self, checksum, config):
+        material = f"{checksum}:{config['model']}:{config['prompt_version']}"
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    @api.model
+    def _lookup(self, checksum, config):
+        """Return the cached extraction for a receipt, or ``None`` on a miss."""
+        entry = self.sudo().search(
+            [("key", "=", self._get_key(checksum, config))], limit=1
+        )
+        if not entry:
+            metrics.inc("inventory_expense_extraction_cache_lookups_total", result="miss")
+            return None
+        metrics.inc("inventory_expense_extraction_cache_lookups_total", result="hit")
+        self.env.cr.execute(
+            """
+            UPDATE inventory_expense_extraction_cache
+               SET hit_count = hit_count + 1, last_used = now() at time zone 'UTC'
+             WHERE id = %s
+            """,
+            [entry.id],
+        )
+        return {
+            "vendor_name": entry.vendor_name or None,
+            "date": entry.receipt_date or None,
+            "subtotal": entry.subtotal,
+            "total": entry.total,
+        }
+
+    @api.model
+    def _store(self, checksum, config, result):
+        key = self._get_key(checksum, config)
+        try:
+            with self.env.cr.savepoint():
+                self.sudo().create(
+                    {
+                        "key": key,
+                        "checksum": checksum,
+                        "model_name": config["model"],
+                        "prompt_version": config["prompt_version"],
+                        "vendor_name": result.get("vendor_name"),
+                        "receipt_date": result.get("date"),
+                        "subtotal": result.get("subtotal") or 0.0,
+                        "total": result.get("total") or 0.0,
+                    }
+                )
+        except Exception as e:
+            _logger.debug("Extraction cache entry %s not stored: %s", key, e)
+
+    @api.model
+    def _get_stats(self):
+        """Entries stored, and lookups counted by all workers since the
+        metrics were last reset (evicted entries' hits included)."""
+        [(entries,)] = self.sudo()._read_group([], aggregates=["__count"])
+        counters, _histograms = metrics.collect()
+        lookups = {
+            dict(labels).get("result"): value
+            for (name, labels), value in counters.items()
+            if name == "inventory_expense_extraction_cache_lookups_total"
+        }
+        return {
+            "entries": entries,
+            "hits": lookups.get("hit", 0),
+            "misses": lookups.get("miss", 0),
+        }
+
+    @api.model
+    def _cron_evict(self):
+        get_param = self.env["ir.config_parameter"].sudo().get_param
+        max_age = int(
+            get_param(
+                "inventory_expense.extraction_cache_max_age_days",
+                default=DEFAULT_CACHE_MAX_AGE_DAYS,
+            )
+        )
+        max_entries = int(
+            get_param(
+                "inventory_expense.extraction_cache_max_entries",
+                default=DEFAULT_CACHE_MAX_ENTRIES,
+            )
+        )
+        Cache = self.sudo()
+        if max_age:
+            cutoff = fields.Datetime.now() - timedelta(days=max_age)
+            Cache.search([("last_used", "<", cutoff)]).unlink()
+        if max_entries:
+            Cache.search([], offset=max_entries).unlink()
@@ -0,0 +1,337 @@
+import csv
+import io
+import itertools
+import logging
+import tempfile
+import time
+from datetime import timedelta
+
+from odoo import _, api, fields, models
+
+from ..tools import expense_import
+
+_logger = logging.getLogger(__name__)
+
+IMPORT_JOB_TIMEOUT_MINUTES = 30
+IMPORT_JOB_MAX_ATTEMPTS = 3
+IMPORT_JOB_RETENTION_DAYS = 7
+
+
+class InventoryExpenseImportJob(models.Model):
+    """Bulk import of a large file, run by a cron worker.
+
+    Each batch of rows is committed together with the number of rows read
+    so far, so an interrupted import resumes after its last committed batch
+    without creating any row twice.
+    """
+
+    _name = "inventory.expense.import.job"
+    _description = "Inventory Expense Import Job"
+    _order = "id desc"
+
+    name = fields.Char(
+        string="File",
+        required=True,
+        readonly=True,
+    )
+    state = fields.Selection(
+        selection=[
+            ("queued", "Queued"),
+            ("running", "Running"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+        ],
+        string="Status",
+        default="queued",
+        required=True,
+        index=True,
+    )
+    file_format = fields.Selection(
+        selection=[
+            ("csv", "CSV"),
+            ("jsonl", "JSON Lines"),
+            ("json", "JSON Array"),
+        ],
+        string="Format",
+        required=True,
+        readonly=True,
+    )
+    chunk_size = fields.Integer(
+        string="Batch Size",
+        required=True,
+        readonly=True,
+    )
+    user_id = fields.Many2one(
+        comodel_name="res.users",
+        string="Requested By",
+        required=True,
+        readonly=True,
+        default=lambda self: self.env.user,
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        string="Company",
+        required=True,
+        readonly=True,
+        default=lambda self: self.env.company,
+    )
+    source_attachment_id = fields.Many2one(
+        comodel_name="ir.attachment",
+        string="Source File",
+        readonly=True,
+        ondelete="set null",
+    )
+    rows_read = fields.Integer(
+        string="Rows Read",
+        readonly=True,
+        default=0,
+        help="Rows of the file already imported or rejected; an interrupted "
+        "import resumes after them",
+    )
+    created_count = fields.Integer(
+        string="Imported",
+        readonly=True,
+        default=0,
+    )
+    rejected_count = fields.Integer(
+        string="Rejected",
+        readonly=True,
+        default=0,
+    )
+    rejected_rows = fields.Text(
+        string="Rejected Rows",
+        readonly=True,
+    )
+    rejected_attachment_id = fields.Many2one(
+        comodel_name="ir.attachment",
+        string="Rejected Rows File",
+        readonly=True,
+        ondelete="set null",
+    )
+    attempts = fields.Integer(
+        string="Attempts",
+        readonly=True,
+        default=0,
+    )
+    date_started = fields.Datetime(
+        string="Started",
+        readonly=True,
+    )
+    date_finished = fields.Datetime(
+        string="Finished",
+        readonly=True,
+    )
+    elapsed_time = fields.Float(
+        string="Elapsed (s)",
+        digits=(16, 2),
+        readonly=True,
+    )
+    error_message = fields.Text(
+        string="Error",
+        readonly=True,
+    )
+
+    @api.model
+    def enqueue(self, filename, file_format, chunk_size, content):
+        """Queue the import of ``content`` (raw file bytes)."""
+        job = self.create(
+            {
+                "name": filename,
+                "file_format": file_format,
+                "chunk_size": chunk_size,
+            }
+        )
+        job.source_attachment_id = self.env["ir.attachment"].create(
+            {
+                "name": filename,
+                "type": "binary",
+                "raw": content,
+                "res_model": self._name,
+                "res_id": job.id,
+            }
+        )
+        self.env.ref("inventory_expense.ir_cron_process_import_jobs")._trigger()
+        return job
+
+    def _commit_chunk(self, rows, created, rejected):
+        output = io.StringIO()
+        csv.writer(output).writerows(rejected)
+        self.write(
+            {
+                "rows_read": self.rows_read + rows,
+                "created_count": self.created_count + created,
+                "rejected_count": self.rejected_count + len(rejected),
+                "rejected_rows": (self.rejected_rows or "") + output.getvalue(),
+            }
+        )
+        self.env.cr.commit()
+
+    def _import(self):
+        self.ensure_one()
+        reader = expense_import.READERS[self.file_format]
+        with tempfile.TemporaryFile() as source:
+            source.write(self.source_attachment_id.sudo().raw)
+            source.seek(0)
+            try:
+                self.env["inventory.expense"]._import_expenses(
+                    itertools.islice(reader(source), self.rows_read, None),
+                    chunk_size=self.chunk_size,
+                    progress=self._commit_chunk,
+                )
+            except (ValueError, UnicodeDecodeError, csv.Error) as e:
+                raise ValueError(_("The file could not be read: %s", e)) from e
+
+    def _finish(self):
+        self.ensure_one()
+        values = {"state": "done"}
+        if self.rejected_rows:
+            values["rejected_attachment_id"] = (
+                self.env["ir.attachment"]
+                .create(
+                    {
+                        "name": "rejected_rows.csv",
+                        "type": "binary",
+                        "raw": ("line,reason\n" + self.rejected_rows).encode(),
+                        "res_model": self._name,
+                        "res_id": self.id,
+                        "mimetype": "text/csv",
+                    }
+                )
+                .id
+            )
+        source = self.source_attachment_id
+        self.write(values)
+        source.sudo().unlink()
+
+    def _run(self):
+        self.ensure_one()
+        started = time.monotonic()
+        self.write(
+            {
+                "state": "running",
+                "attempts": self.attempts + 1,
+                "date_started": fields.Datetime.now(),
+                "error_message": False,
+            }
+        )
+        self.env.cr.commit()
+        try:
+            job = self.with_user(self.user_id).with_company(self.company_id)
+            job._import()
+            job._finish()
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.exception("Import job %s failed", self.id)
+            self.write({"state": "failed", "error_message": str(e)})
+        self.write(
+            {
+                "date_finished": fields.Datetime.now(),
+                "elapsed_time": time.monotonic() - started,
+            }
+        )
+        self.env.cr.commit()
+        self._notify_user()
+
+    def _notify_user(self):
+        self.ensure_one()
+        if self.state == "done":
+            message = _(
+                "%(name)s: %(created)s expenses imported, %(rejected)s rows rejected.",
+                name=self.name,
+                created=self.created_count,
+                rejected=self.rejected_count,
+            )
+            notification_type = "success"
+        else:
+            message = _(
+                "%(name)s stopped after %(rows)s rows; retry it to resume.",
+                name=self.name,
+                rows=self.rows_read,
+            )
+            notification_type = "danger"
+        self.env["bus.bus"]._sendone(
+            self.user_id.partner_id,
+            "simple_notification",
+            {
+                "type": notification_type,
+                "title": _("Expense Import"),
+                "message": message,
+                "sticky": True,
+            },
+        )
+
+    @api.model
+    def _recover_stale_jobs(self):
+        """Requeue running jobs whose worker died, or fail them for good.
+
+        A running job commits every batch, so one that has not been written
+        for ``IMPORT_JOB_TIMEOUT_MINUTES`` lost its worker.
+        """
+        cutoff = fields.Datetime.now() - timedelta(minutes=IMPORT_JOB_TIMEOUT_MINUTES)
+        self.env.cr.execute(
+            """
+            SELECT id FROM inventory_expense_import_job
+             WHERE state = 'running' AND write_date < %s
+               FOR UPDATE SKIP LOCKED
+            """,
+            [cutoff],
+        )
+        stale = self.browse([row[0] for row in self.env.cr.fetchall()])
+        retried = stale.filtered(lambda job: job.attempts < IMPORT_JOB_MAX_ATTEMPTS)
+        retried.write({"state": "queued"})
+        failed = stale - retried
+        failed.write(
+            {
+                "state": "failed",
+                "date_finished": fields.Datetime.now(),
+                "error_message": _(
+                    "The import was interrupted %s times before it could finish.",
+                    IMPORT_JOB_MAX_ATTEMPTS,
+                ),
+            }
+        )
+        self.env.cr.commit()
+        for job in failed:
+            job._notify_user()
+
+    @api.model
+    def _cron_process_jobs(self, limit=5):
+        self._recover_stale_jobs()
+        for _i in range(limit):
+            self.env.cr.execute(
+                """
+                SELECT id FROM inventory_expense_import_job
+                 WHERE state = 'queued'
+              ORDER BY id
+                 LIMIT 1
+                   FOR UPDATE SKIP LOCKED
+                """
+            )
+            row = self.env.cr.fetchone()
+            if not row:
+                return
+            self.browse(row[0])._run()
+        self.env.ref("inventory_expense.ir_cron_process_import_jobs")._trigger()
+
+    def action_download_rejected(self):
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_url",
+            "url": f"/web/content/{self.rejected_attachment_id.id}?download=true",
+            "target": "self",
+        }
+
+    def action_retry(self):
+        """Resume failed imports after their last committed batch."""
+        self.filtered(lambda job: job.state == "failed").write(
+            {"state": "queued", "attempts": 0}
+        )
+        self.env.ref("inventory_expense.ir_cron_process_import_jobs")._trigger()
+
+    @api.autovacuum
+    def _gc_jobs(self):
+        """Drop finished jobs after a week; their files go with them."""
+        cutoff = fields.Datetime.now() - timedelta(days=IMPORT_JOB_RETENTION_DAYS)
+        self.sudo().search(
+            [("state", "in", ("done", "failed")), ("write_date", "<", cutoff)]
+        ).unlink()
@@ -0,0 +1,225 @@
+import math
+import time
+
+from odoo import api, fields, models
+from odoo.modules.registry import Registry
+
+from ..tools import metrics, rate_limit
+
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 200000
+DEFAULT_ESTIMATED_TOKENS = 1500
+DEFAULT_MAX_WAIT = 300
+# (classid, objid) of the transaction advisory lock guarding the buckets
+RATE_LIMIT_LOCK = (0x1E7E, 1)
+
+
+class DatabaseRateLimiter:
+    """Admit OpenAI requests across every worker of a database.
+
+    A caller reserves its cost in one short transaction and then sleeps,
+    outside of any lock, until the buckets have refilled enough to cover
+    it. Buckets may go negative, so later callers are queued behind
+    earlier ones in arrival order. Each call uses its own cursor, so it is
+    safe from worker threads.
+    """
+
+    def __init__(self, dbname, limits, estimated_tokens, max_wait):
+        self.dbname = dbname
+        self.limits = limits
+        self.estimated_tokens = estimated_tokens
+        self.max_wait = max_wait
+
+    def _costs(self, tokens):
+        return {"requests": 1, "tokens": tokens}
+
+    def acquire(self, tokens=None):
+        """Block until one request of ``tokens`` tokens may be sent.
+
+        Returns the number of tokens charged, to be passed to :meth:`settle`
+        once the real usage is known.
+        """
+        costs = self._costs(tokens or self.estimated_tokens)
+        with Registry(self.dbname).cursor() as cr:
+            wait = self._reserve(cr, costs)
+        if wait > 0:
+            time.sleep(wait)
+        metrics.observe("inventory_expense_ai_rate_limit_wait_seconds", wait)
+        return costs["tokens"]
+
+    def _reserve(self, cr, costs):
+        """Charge ``costs`` and return the seconds until they are covered."""
+        cr.execute("SELECT pg_advisory_xact_lock(%s, %s)", RATE_LIMIT_LOCK)
+        cr.execute(
+            """
+            INSERT INTO inventory_expense_rate_bucket (name, level, updated_at)
+            SELECT name, limit_value, EXTRACT(EPOCH FROM clock_timestamp())
+              FROM unnest(%s::varchar[], %s::float[]) AS l(name, limit_value)
+            ON CONFLICT (name) DO NOTHING
+            """,
+            [list(self.limits), list(self.limits.values())],
+        )
+        cr.execute(
+            """
+            SELECT name, level, EXTRACT(EPOCH FROM clock_timestamp()) - updated_at
+              FROM inventory_expense_rate_bucket
+             WHERE name IN %s
+            """,
+            [tuple(self.limits)],
+        )
+        levels = {
+            name: rate_limit.refill(level, elapsed, self.limits[name])
+            for name, level, elapsed in cr.fetchall()
+        }
+        wait = rate_limit.wait_time(levels, costs, self.limits)
+        if wait > self.max_wait:
+            self._timeout(wait)
+        for name, limit in self.limits.items():
+            cr.execute(
+                """
+                UPDATE inventory_expense_rate_bucket
+                   SET level = %(level)s - %(cost)s,
+                       updated_at = EXTRACT(EPOCH FROM clock_timestamp())
+                 WHERE name = %(name)s
+                """,
+                {"level": levels[name], "cost": min(costs[name], limit), "name": name},
+            )
+        return wait
+
+    def _timeout(self, wait):
+        metrics.inc("inventory_expense_ai_rate_limit_timeouts_total")
+        raise rate_limit.RateLimitTimeout(
+            f"OpenAI rate limit queue wait of {wait:.1f}s exceeds {self.max_wait}s"
+        )
+
+    def settle(self, charged, actual):
+        """Charge the difference between the real and the charged token use."""
+        if "tokens" not in self.limits or not actual or actual == charged:
+            return
+        with Registry(self.dbname).cursor() as cr:
+            cr.execute("SELECT pg_advisory_xact_lock(%s, %s)", RATE_LIMIT_LOCK)
+            cr.execute(
+                """
+                UPDATE inventory_expense_rate_bucket
+                   SET level = level - %s
+                 WHERE name = 'tokens'
+                """,
+                [actual - charged],
+            )
+
+
+class InventoryExpenseRateBucket(models.Model):
+    """Shared token buckets of the OpenAI rate limiter (one row per limit)."""
+
+    _name = "inventory.expense.rate.bucket"
+    _description = "AI Extraction Rate Limit Bucket"
+    _order = "name"
+
+    name = fields.Selection(
+        selection=[
+            ("requests", "Requests"),
+            ("tokens", "Tokens"),
+        ],
+        string="Limit",
+        required=True,
+        readonly=True,
+    )
+    level = fields.Float(
+        string="Available",
+        readonly=True,
+    )
+    updated_at = fields.Float(
+        string="Updated At (epoch)",
+        readonly=True,
+    )
+
+    _sql_constraints = [
+        ("name_unique", "unique(name)", "There can only be one bucket per limit."),
+    ]
+
+    @api.model
+    def _get_limits(self):
+        get_param = self.env["ir.config_parameter"].sudo().get_param
+        limits = {
+            "requests": int(
+                get_param(
+                    "inventory_expense.openai_requests_per_minute",
+                    default=DEFAULT_REQUESTS_PER_MINUTE,
+                )
+            ),
+            "tokens": int(
+                get_param(
+                    "inventory_expense.openai_tokens_per_minute",
+                    default=DEFAULT_TOKENS_PER_MINUTE,
+                )
+            ),
+        }
+        return {name: limit for name, limit in limits.items() if limit > 0}
+
+    @api.model
+    def _get_limiter(self):
+        """Return the shared limiter, or ``None`` when no limit is set."""
+        limits = self._get_limits()
+        if not limits:
+            return None
+        get_param = self.env["ir.config_parameter"].sudo().get_param
+        return DatabaseRateLimiter(
+            self.env.cr.dbname,
+            limits,
+            estimated_tokens=self._get_estimated_tokens(),
+            max_wait=float(
+                get_param(
+                    "inventory_expense.openai_rate_limit_max_wait",
+                    default=DEFAULT_MAX_WAIT,
+                )
+            ),
+        )
+
+    @api.model
+    def _get_estimated_tokens(self):
+        return int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param(
+                "inventory_expense.openai_estimated_tokens",
+                default=DEFAULT_ESTIMATED_TOKENS,
+            )
+        )
+
+    @api.model
+    def _get_levels(self, limits):
+        self.env.cr.execute(
+            """
+            SELECT name, level, EXTRACT(EPOCH FROM clock_timestamp()) - updated_at
+              FROM inventory_expense_rate_bucket
+            """
+        )
+        return {
+            name: rate_limit.refill(level, elapsed, limits[name])
+            for name, level, elapsed in self.env.cr.fetchall()
+            if name in limits
+        }
+
+    @api.model
+    def _get_queue_depth(self, levels=None):
+        """Number of requests currently waiting to be admitted.
+
+        A waiting request has driven its buckets below zero; the debt left
+        is one request in the requests bucket and about the estimated
+        tokens in the tokens bucket per waiting request.
+        """
+        if levels is None:
+            levels = self._get_levels(self._get_limits())
+        units = {"requests": 1, "tokens": max(1, self._get_estimated_tokens())}
+        depths = [math.ceil(-level / units[name]) for name, level in levels.items()]
+        return max(depths + [0])
+
+    @api.model
+    def _get_stats(self):
+        limits = self._get_limits()
+        levels = self._get_levels(limits)
+        return {
+            "queue_depth": self._get_queue_depth(levels),
+            "requests": max(0, levels.get("requests", limits.get("requests", 0))),
+            "tokens": max(0, levels.get("tokens", limits.get("tokens", 0))),
+        }
@@ -0,0 +1,284 @@
+import base64
+import hashlib
+import json
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_REPORT_CACHE_MAX_MB = 200
+
+
+class InventoryExpenseDataVersion(models.Model):
+    """Change counter per company and month of expense dates.
+
+    Bumped whenever an expense of that month is created, changed or deleted,
+    so a cached report is valid as long as the versions it covers are.
+    """
+
+    _name = "inventory.expense.data.version"
+    _description = "Inventory Expense Data Version"
+    _order = "period desc, company_id"
+    _rec_name = "period"
+
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        string="Company",
+        required=True,
+        readonly=True,
+        ondelete="cascade",
+    )
+    period = fields.Date(
+        string="Month",
+        required=True,
+        readonly=True,
+    )
+    version = fields.Integer(
+        string="Version",
+        readonly=True,
+        default=1,
+    )
+
+    _sql_constraints = [
+        (
+            "company_period_unique",
+            "unique(company_id, period)",
+            "There can only be one data version per company and month.",
+        ),
+    ]
+
+    @api.model
+    def _bump(self, expenses):
+        keys = {
+            (expense.company_id.id, expense.date.replace(day=1))
+            for expense in expenses
+            if expense.company_id and expense.date
+        }
+        if not keys:
+            return
+        self.env.cr.execute(
+            f"""
+            INSERT INTO inventory_expense_data_version AS v (company_id, period, version)
+            VALUES {", ".join(["(%s, %s, 1)"] * len(keys))}
+            ON CONFLICT (company_id, period) DO UPDATE SET version = v.version + 1
+            """,
+            [value for key in sorted(keys) for value in key],
+        )
+
+    @api.model
+    def _get_versions(self, company_ids, date_from, date_to):
+        self.env.cr.execute(
+            """
+            SELECT company_id, period, version
+              FROM inventory_expense_data_version
+             WHERE company_id IN %s AND period >= %s AND period <= %s
+          ORDER BY company_id, period
+            """,
+            [tuple(company_ids), date_from.replace(day=1), date_to],
+        )
+        return [
+            (company_id, str(period), version)
+            for company_id, period, version in self.env.cr.fetchall()
+        ]
+
+
+class InventoryExpenseReportCache(models.Model):
+    """Rendered PDF and Excel reports of closed periods.
+
+    Entries are keyed by the report parameters and the data versions of
+    the months they cover, so changed data simply stops matching and the
+    stale entry ages out. The least recently used entries are evicted once
+    the cache exceeds its size limit.
+    """
+
+    _name = "inventory.expense.report.cache"
+    _description = "Report Cache"
+    _order = "last_used desc, id desc"
+
+    key = fields.Char(
+        string="Key",
+        required=True,
+        readonly=True,
+    )
+    name = fields.Char(
+        string="Filename",
+        readonly=True,
+    )
+    report_type = fields.Char(
+        string="Report Type",
+        readonly=True,
+    )
+    report_format = fields.Char(
+        string="Format",
+        readonly=True,
+    )
+    date_from = fields.Date(
+        string="Start Date",
+        readonly=True,
+    )
+    date_to = fields.Date(
+        string="End Date",
+        readonly=True,
+    )
+    mimetype = fields.Char(
+        string="Type",
+        readonly=True,
+    )
+    data = fields.Binary(
+        string="File",
+        attachment=True,
+        readonly=True,
+    )
+    size = fields.Integer(
+        string="Size (bytes)",
+        readonly=True,
+    )
+    hit_count = fields.Integer(
+        string="Hits",
+        readonly=True,
+        default=0,
+    )
+    last_used = fields.Datetime(
+        string="Last Used",
+        readonly=True,
+        default=fields.Datetime.now,
+        index=True,
+    )
+
+    _sql_constraints = [
+        ("key_unique", "unique(key)", "A report is already cached for this key."),
+    ]
+
+    @api.model
+    def _get_max_size(self):
+        max_mb = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param(
+                "inventory_expense.report_cache_max_mb",
+                default=DEFAULT_REPORT_CACHE_MAX_MB,
+            )
+        )
+        return max_mb * 1024 * 1024
+
+    @api.model
+    def _get_key(self, wizard, report_format):
+        """Cache key for a wizard's report, or ``None`` if it is not cacheable.
+
+        Only reports whose whole range lies before the current month are
+        cached: their data rarely changes after the month is closed.
+        Consolidated reports also convert amounts, so their key includes the
+        state of the currency rates involved.
+        """
+        if not self._get_max_size():
+            return None
+        date_from, date_to = wizard._get_report_range()
+        if date_to >= fields.Date.context_today(wizard).replace(day=1):
+            return None
+        companies = wizard._get_report_companies()
+        params = {
+            "format": report_format,
+            "report_type": wizard.report_type,
+            "date_from": str(wizard.date_from),
+            "date_to": str(wizard.date_to),
+            "companies": companies.ids,
+            "summary_groupby": wizard.summary_groupby,
+            "comparison": [wizard.comparison_granularity, wizard.comparison_periods],
+            "currency": wizard.currency_id.id,
+            "lang": self.env.lang,
+            "versions": self.env["inventory.expense.data.version"]._get_versions(
+                companies.ids, date_from, date_to
+            ),
+        }
+        if wizard.report_type == "consolidated":
+            params["rates"] = self._get_rates_version(
+                companies.currency_id | wizard.currency_id, companies
+            )
+        return hashlib.sha256(
+            json.dumps(params, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    @api.model
+    def _get_rates_version(self, currencies, companies):
+        """Fingerprint of the rates of ``currencies`` the companies convert with."""
+        rate_companies = companies | companies.root_id
+        [(count, total, last_change)] = (
+            self.env["res.currency.rate"]
+            .sudo()
+            ._read_group(
+                [
+                    ("currency_id", "in", currencies.ids),
+                    ("company_id", "in", rate_companies.ids + [False]),
+                ],
+                aggregates=["__count", "rate:sum", "write_date:max"],
+            )
+        )
+        return [count, total, str(last_change)]
+
+    @api.model
+    def _lookup(self, key, touch=True):
+        """Return the cache entry for ``key`` (empty on a miss)."""
+        entry = self.sudo().search([("key", "=", key)], limit=1)
+        if entry and touch:
+            self.env.cr.execute(
+                """
+                UPDATE inventory_expense_report_cache
+                   SET hit_count = hit_count + 1, last_used = now() at time zone 'UTC'
+                 WHERE id = %s
+                """,
+                [entry.id],
+            )
+        return entry
+
+    def _get_content(self):
+        self.ensure_one()
+        return base64.b64decode(self.sudo().with_context(bin_size=False).data)
+
+    @api.model
+    def _store(self, key, wizard, report_format, filename, mimetype, content):
+        try:
+            with self.env.cr.savepoint():
+                self.sudo().create(
+                    {
+                        "key": key,
+                        "name": filename,
+                        "report_type": wizard.report_type,
+                        "report_format": report_format,
+                        "date_from": wizard.date_from,
+                        "date_to": wizard.date_to,
+                        "mimetype": mimetype,
+                        "data": base64.b64encode(content),
+                        "size": len(content),
+                    }
+                )
+        except Exception as e:
+            _logger.debug("Report cache entry %s not stored: %s", key, e)
+            return
+        self._evict()
+
+    @api.model
+    def _evict(self):
+        """Drop the least recently used entries beyond the size limit."""
+        self.env.cr.execute(
+            """
+            SELECT id
+              FROM (
+                    SELECT id,
+                           sum(size) OVER (ORDER BY last_used DESC, id DESC) AS running_size
+                      FROM inventory_expense_report_cache
+                   ) AS entries
+             WHERE running_size > %s
+            """,
+            [self._get_max_size()],
+        )
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        if ids:
+            self.sudo().browse(ids).unlink()
+
+    @api.model
+    def _get_stats(self):
+        [(entries, size, hits)] = self.sudo()._read_group(
+            [], aggregates=["__count", "size:sum", "hit_count:sum"]
+        )
+        return {"entries": entries, "size": size or 0, "hits": hits or 0}
@@ -0,0 +1,351 @@
+import logging
+import tempfile
+import time
+from datetime import timedelta
+
+from odoo import _, api, fields, models
+
+from ..tools import xlsx_export
+
+_logger = logging.getLogger(__name__)
+
+REPORT_JOB_TIMEOUT_MINUTES = 30
+REPORT_JOB_MAX_ATTEMPTS = 2
+REPORT_JOB_RETENTION_DAYS = 7
+REPORT_JOB_PARAMS = [
+    "date_from",
+    "date_to",
+    "company_id",
+    "report_type",
+    "summary_groupby",
+    "comparison_granularity",
+    "comparison_periods",
+    "report_format",
+]
+
+
+class InventoryExpenseReportJob(models.Model):
+    _name = "inventory.expense.report.job"
+    _description = "Inventory Expense Report Job"
+    _order = "id desc"
+
+    name = fields.Char(
+        string="Name",
+        compute="_compute_name",
+        store=True,
+    )
+    state = fields.Selection(
+        selection=[
+            ("queued", "Queued"),
+            ("running", "Running"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+        ],
+        string="Status",
+        default="queued",
+        required=True,
+        index=True,
+    )
+    date_from = fields.Date(
+        string="Start Date",
+        required=True,
+    )
+    date_to = fields.Date(
+        string="End Date",
+        required=True,
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        string="Company",
+        required=True,
+    )
+    report_type = fields.Selection(
+        selection=[
+            ("summary", "Summary Only"),
+            ("detailed", "Detailed Report"),
+            ("comparison", "Period Comparison"),
+        ],
+        string="Report Type",
+        default="detailed",
+        required=True,
+    )
+    summary_groupby = fields.Selection(
+        selection=[
+            ("none", "No Breakdown"),
+            ("month", "Month"),
+            ("week", "Week"),
+            ("user", "User"),
+        ],
+        string="Break Down By",
+    )
+    comparison_granularity = fields.Selection(
+        selection=[
+            ("month", "Month"),
+            ("quarter", "Quarter"),
+            ("year", "Year"),
+        ],
+        string="Compare By",
+    )
+    comparison_periods = fields.Integer(
+        string="Number of Periods",
+    )
+    report_format = fields.Selection(
+        selection=[
+            ("pdf", "PDF"),
+            ("xlsx", "Excel"),
+        ],
+        string="Format",
+        required=True,
+    )
+    user_ids = fields.Many2many(
+        comodel_name="res.users",
+        string="Requested By",
+        default=lambda self: self.env.user,
+        help="Users notified when the report is ready (identical requests are merged)",
+    )
+    progress = fields.Float(
+        string="Progress",
+        digits=(5, 1),
+        help="Completion percentage",
+    )
+    attempts = fields.Integer(
+        string="Attempts",
+        readonly=True,
+        default=0,
+    )
+    date_started = fields.Datetime(
+        string="Started",
+        readonly=True,
+    )
+    date_finished = fields.Datetime(
+        string="Finished",
+        readonly=True,
+    )
+    elapsed_time = fields.Float(
+        string="Elapsed (s)",
+        digits=(16, 2),
+        readonly=True,
+    )
+    attachment_id = fields.Many2one(
+        comodel_name="ir.attachment",
+        string="Report File",
+        readonly=True,
+        ondelete="set null",
+    )
+    error_message = fields.Text(
+        string="Error",
+        readonly=True,
+    )
+
+    @api.depends("date_from", "date_to", "report_format")
+    def _compute_name(self):
+        for job in self:
+            job.name = _(
+                "Expense Report %(date_from)s to %(date_to)s (%(format)s)",
+                date_from=job.date_from,
+                date_to=job.date_to,
+                format=(job.report_format or "").upper(),
+            )
+
+    @api.model
+    def enqueue(self, values):
+        """Queue a report, merging into an identical job that is still queued."""
+        domain = [("state", "=", "queued")] + [
+            (param, "=", values.get(param)) for param in REPORT_JOB_PARAMS
+        ]
+        job = self.sudo().search(domain, limit=1)
+        if job:
+            job.user_ids = [(4, self.env.user.id)]
+            return job.sudo(False)
+        job = self.create(values)
+        self.env.ref("inventory_expense.ir_cron_process_report_jobs")._trigger()
+        return job
+
+    def _get_wizard(self):
+        self.ensure_one()
+        return (
+            self.env["expense.report.wizard"]
+            .with_company(self.company_id)
+            .create(
+                {
+                    "date_from": self.date_from,
+                    "date_to": self.date_to,
+                    "company_id": self.company_id.id,
+                    "currency_id": self.company_id.currency_id.id,
+                    "report_type": self.report_type,
+                    "summary_groupby": self.summary_groupby,
+                    "comparison_granularity": self.comparison_granularity,
+                    "comparison_periods": self.comparison_periods,
+                }
+            )
+        )
+
+    def _set_progress(self, progress):
+        self.progress = progress
+        self.env.cr.commit()
+
+    def _render(self, wizard):
+        self.ensure_one()
+        filename = f"expense_report_{self.date_from}_{self.date_to}.{self.report_format}"
+        cached = wizard._get_cached_report(self.report_format)
+        if cached:
+            return filename, cached.mimetype, cached._get_content()
+        if self.report_format == "pdf":
+            self._set_progress(10.0)
+            content = wizard._render_pdf()
+            wizard._cache_report("pdf", content)
+            return filename, "application/pdf", content
+
+        total = wizard.expense_count or 1
+
+        def progress(rows_done):
+            self._set_progress(min(95.0, 100.0 * rows_done / total))
+
+        with tempfile.TemporaryFile() as tmp:
+            wizard._write_excel(tmp, progress=progress)
+            tmp.seek(0)
+            content = tmp.read()
+        wizard._cache_report("xlsx", content)
+        return filename, xlsx_export.XLSX_MIMETYPE, content
+
+    def _run(self):
+        self.ensure_one()
+        started = time.monotonic()
+        self.write(
+            {
+                "state": "running",
+                "progress": 0.0,
+                "attempts": self.attempts + 1,
+                "date_started": fields.Datetime.now(),
+                "error_message": False,
+            }
+        )
+        self.env.cr.commit()
+        try:
+            owner = self.user_ids[:1] or self.env.user
+            job = self.with_user(owner).with_company(self.company_id)
+            filename, mimetype, content = job._render(job._get_wizard())
+            attachment = self.env["ir.attachment"].create(
+                {
+                    "name": filename,
+                    "type": "binary",
+                    "raw": content,
+                    "res_model": self._name,
+                    "res_id": self.id,
+                    "mimetype": mimetype,
+                }
+            )
+            self.write(
+                {
+                    "state": "done",
+                    "progress": 100.0,
+                    "attachment_id": attachment.id,
+                }
+            )
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.exception("Report job %s failed", self.id)
+            self.write({"state": "failed", "error_message": str(e)})
+        self.write(
+            {
+                "date_finished": fields.Datetime.now(),
+                "elapsed_time": time.monotonic() - started,
+            }
+        )
+        self.env.cr.commit()
+        self._notify_users()
+
+    def _notify_users(self):
+        self.ensure_one()
+        if self.state == "done":
+            message = _("%s is ready for download.", self.name)
+            notification_type = "success"
+        else:
+            message = _("%s could not be generated.", self.name)
+            notification_type = "danger"
+        for user in self.user_ids:
+            self.env["bus.bus"]._sendone(
+                user.partner_id,
+                "simple_notification",
+                {
+                    "type": notification_type,
+                    "title": _("Expense Report"),
+                    "message": message,
+                    "sticky": True,
+                },
+            )
+
+    @api.model
+    def _recover_stale_jobs(self):
+        """Requeue running jobs whose worker died, or fail them for good.
+
+        A running job commits every progress update, so one that has not
+        been written for ``REPORT_JOB_TIMEOUT_MINUTES`` lost its worker.
+        """
+        cutoff = fields.Datetime.now() - timedelta(minutes=REPORT_JOB_TIMEOUT_MINUTES)
+        self.env.cr.execute(
+            """
+            SELECT id FROM inventory_expense_report_job
+             WHERE state = 'running' AND write_date < %s
+               FOR UPDATE SKIP LOCKED
+            """,
+            [cutoff],
+        )
+        stale = self.browse([row[0] for row in self.env.cr.fetchall()])
+        retried = stale.filtered(lambda job: job.attempts < REPORT_JOB_MAX_ATTEMPTS)
+        retried.write({"state": "queued", "progress": 0.0})
+        failed = stale - retried
+        failed.write(
+            {
+                "state": "failed",
+                "date_finished": fields.Datetime.now(),
+                "error_message": _(
+                    "The report was interrupted %s times before it could finish.",
+                    REPORT_JOB_MAX_ATTEMPTS,
+                ),
+            }
+        )
+        self.env.cr.commit()
+        for job in failed:
+            job._notify_users()
+
+    @api.model
+    def _cron_process_jobs(self, limit=10):
+        self._recover_stale_jobs()
+        for _i in range(limit):
+            self.env.cr.execute(
+                """
+                SELECT id FROM inventory_expense_report_job
+                 WHERE state = 'queued'
+              ORDER BY id
+                 LIMIT 1
+                   FOR UPDATE SKIP LOCKED
+                """
+            )
+            row = self.env.cr.fetchone()
+            if not row:
+                return
+            self.browse(row[0])._run()
+        self.env.ref("inventory_expense.ir_cron_process_report_jobs")._trigger()
+
+    def action_download(self):
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_url",
+            "url": f"/web/content/{self.attachment_id.id}?download=true",
+            "target": "self",
+        }
+
+    def action_retry(self):
+        self.filtered(lambda job: job.state == "failed").write(
+            {"state": "queued", "progress": 0.0, "attempts": 0}
+        )
+        self.env.ref("inventory_expense.ir_cron_process_report_jobs")._trigger()
+
+    @api.autovacuum
+    def _gc_jobs(self):
+        """Drop finished jobs after a week; their report files go with them."""
+        cutoff = fields.Datetime.now() - timedelta(days=REPORT_JOB_RETENTION_DAYS)
+        self.sudo().search(
+            [("state", "in", ("done", "failed")), ("write_date", "<", cutoff)]
+        ).unlink()
@@ -0,0 +1,350 @@
+import base64
+import hashlib
+import os
+import uuid
+from datetime import timedelta
+
+from psycopg2 import errors
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+from odoo.tools import config
+
+from ..tools import metrics
+
+UPLOAD_MAX_SIZE = 25 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 256 * 1024
+UPLOAD_COPY_SIZE = 64 * 1024
+UPLOAD_EXPIRY_HOURS = 24
+
+
+class InventoryExpenseUpload(models.Model):
+    """Resumable receipt upload, received in chunks through the upload API.
+
+    Chunks are written at their offset in a part file next to the
+    filestore, so a chunk lost to a dropped connection is simply sent again
+    from the last acknowledged offset. Completing the upload creates the
+    expense, or returns the existing one if the same file was already sent.
+    """
+
+    _name = "inventory.expense.upload"
+    _description = "Receipt Upload"
+    _order = "id desc"
+
+    token = fields.Char(
+        string="Token",
+        required=True,
+        readonly=True,
+        index=True,
+        default=lambda self: uuid.uuid4().hex,
+    )
+    user_id = fields.Many2one(
+        comodel_name="res.users",
+        string="User",
+        required=True,
+        readonly=True,
+        default=lambda self: self.env.user,
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        string="Company",
+        required=True,
+        readonly=True,
+        default=lambda self: self.env.company,
+    )
+    filename = fields.Char(
+        string="Filename",
+        required=True,
+        readonly=True,
+    )
+    size = fields.Integer(
+        string="Size (bytes)",
+        required=True,
+        readonly=True,
+    )
+    received = fields.Integer(
+        string="Received (bytes)",
+        readonly=True,
+        default=0,
+    )
+    sha256 = fields.Char(
+        string="SHA-256",
+        readonly=True,
+        index="btree_not_null",
+    )
+    mode = fields.Selection(
+        selection=[
+            ("quick_add", "Quick Add"),
+            ("ai", "Quick Add AI"),
+        ],
+        string="Mode",
+        required=True,
+        readonly=True,
+        default="ai",
+    )
+    expense_name = fields.Char(
+        string="Expense Name",
+        readonly=True,
+    )
+    expense_date = fields.Char(
+        string="Expense Date",
+        readonly=True,
+    )
+    subtotal = fields.Float(
+        string="Subtotal",
+        readonly=True,
+    )
+    total = fields.Float(
+        string="Total",
+        readonly=True,
+    )
+    state = fields.Selection(
+        selection=[
+            ("open", "Uploading"),
+            ("done", "Done"),
+        ],
+        string="Status",
+        required=True,
+        readonly=True,
+        default="open",
+    )
+    expense_id = fields.Many2one(
+        comodel_name="inventory.expense",
+        string="Expense",
+        readonly=True,
+        ondelete="set null",
+    )
+
+    _sql_constraints = [
+        ("token_unique", "unique(token)", "Upload tokens must be unique."),
+    ]
+
+    @api.model
+    def _get_upload_dir(self):
+        path = os.path.join(
+            config.filestore(self.env.cr.dbname), "inventory_expense_uploads"
+        )
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _get_part_path(self):
+        self.ensure_one()
+        return os.path.join(self._get_upload_dir(), f"{self.token}.part")
+
+    def _get_status(self):
+        self.ensure_one()
+        return {
+            "upload_id": self.token,
+            "state": self.state,
+            "offset": self.received,
+            "size": self.size,
+            "chunk_size": UPLOAD_CHUNK_SIZE,
+            "expense_id": self.expense_id.id or None,
+        }
+
+    @api.model
+    def _find_duplicate(self, sha256=None, sha1=None):
+        """Return an expense whose receipt has the same content, if any."""
+        company_ids = self.env.companies.ids
+        if sha256:
+            upload = self.search(
+                [
+                    ("sha256", "=", sha256),
+                    ("state", "=", "done"),
+                    ("expense_id", "!=", False),
+                    ("company_id", "in", company_ids),
+                ],
+                limit=1,
+            )
+            if upload:
+                return upload.expense_id
+        if sha1:
+            attachment = (
+                self.env["ir.attachment"]
+                .sudo()
+                .search(
+                    [
+                        ("res_model", "=", "inventory.expense"),
+                        ("res_field", "=", "receipt_image"),
+                        ("checksum", "=", sha1),
+                    ],
+                    limit=1,
+                )
+            )
+            if attachment:
+                expense = (
+                    self.env["inventory.expense"].browse(attachment.res_id).exists()
+                )
+                if expense and expense.company_id.id in company_ids:
+                    return expense
+        return self.env["inventory.expense"]
+
+    @api.model
+    def _start(self, params):
+        """Open an upload; answer at once when the declared hash is known."""
+        filename = params.get("filename") or "receipt.jpg"
+        try:
+            size = int(params.get("size") or 0)
+        except (TypeError, ValueError):
+            size = 0
+        if size <= 0:
+            raise UserError(_("The upload size is required."))
+        if size > UPLOAD_MAX_SIZE:
+            raise UserError(
+                _(
+                    "Receipts larger than %s MB are not accepted.",
+                    UPLOAD_MAX_SIZE // 2**20,
+                )
+            )
+        mode = params.get("mode") or "ai"
+        if mode not in ("quick_add", "ai"):
+            raise UserError(_("Unknown upload mode %s.", mode))
+        sha256 = (params.get("sha256") or "").lower() or None
+        duplicate = self._find_duplicate(sha256=sha256)
+        if duplicate:
+            metrics.inc("inventory_expense_uploads_total", outcome="duplicate")
+            return {"state": "done", "expense_id": duplicate.id, "duplicate": True}
+        upload = self.create(
+            {
+                "filename": filename,
+                "size": size,
+                "mode": mode,
+                "expense_name": params.get("name"),
+                "expense_date": params.get("date"),
+                "subtotal": params.get("subtotal") or 0.0,
+                "total": params.get("total") or 0.0,
+            }
+        )
+        open(upload._get_part_path(), "wb").close()
+        return upload._get_status()
+
+    @api.model
+    def _get_open_upload(self, token):
+        upload = self.search([("token", "=", token)], limit=1)
+        if not upload:
+            raise UserError(_("Unknown upload."))
+        try:
+            self.env.cr.execute(
+                """
+                SELECT id FROM inventory_expense_upload
+                 WHERE id = %s
+                   FOR UPDATE NOWAIT
+                """,
+                [upload.id],
+            )
+        except errors.LockNotAvailable:
+            raise UserError(
+                _("This upload is busy with another request; retry shortly.")
+            )
+        upload.invalidate_recordset()
+        return upload
+
+    def _write_chunk(self, offset, stream):
+        """Write ``stream`` at ``offset`` and return the new status.
+
+        A chunk may start anywhere up to the received size, so a retried
+        chunk overwrites its earlier copy; gaps are refused.
+        """
+        self.ensure_one()
+        if self.state != "open":
+            return self._get_status()
+        if offset < 0 or offset > self.received:
+            raise UserError(
+                _("Chunks must continue at offset %s at the latest.", self.received)
+            )
+        written = 0
+        with open(self._get_part_path(), "r+b") as part:
+            part.seek(offset)
+            while data := stream.read(UPLOAD_COPY_SIZE):
+                if offset + written + len(data) > self.size:
+                    raise UserError(
+                        _("The chunk goes beyond the declared upload size.")
+                    )
+                part.write(data)
+                written += len(data)
+        metrics.inc("inventory_expense_upload_bytes_total", written)
+        self.received = max(self.received, offset + written)
+        return self._get_status()
+
+    def _hash_part(self):
+        self.ensure_one()
+        sha256, sha1 = hashlib.sha256(), hashlib.sha1()
+        with open(self._get_part_path(), "rb") as part:
+            while data := part.read(UPLOAD_COPY_SIZE):
+                sha256.update(data)
+                sha1.update(data)
+        return sha256.hexdigest(), sha1.hexdigest()
+
+    def _complete(self):
+        """Create the expense for a fully received upload."""
+        self.ensure_one()
+        if self.state == "done":
+            return dict(self._get_status(), duplicate=False)
+        if self.received != self.size:
+            raise UserError(
+                _(
+                    "Only %(received)s of %(size)s bytes were received.",
+                    received=self.received,
+                    size=self.size,
+                )
+            )
+        sha256, sha1 = self._hash_part()
+        expense = self._find_duplicate(sha256=sha256, sha1=sha1)
+        duplicate = bool(expense)
+        if not expense:
+            expense = self._create_expense()
+        self.write({"state": "done", "sha256": sha256, "expense_id": expense.id})
+        path = self._get_part_path()
+        self.env.cr.postcommit.add(lambda: os.path.exists(path) and os.unlink(path))
+        metrics.inc(
+            "inventory_expense_uploads_total",
+            outcome="duplicate" if duplicate else "created",
+        )
+        return dict(
+            self._get_status(),
+            duplicate=duplicate,
+            extraction_state=expense.extraction_state or None,
+        )
+
+    def _create_expense(self):
+        self.ensure_one()
+        with open(self._get_part_path(), "rb") as part:
+            receipt = base64.b64encode(part.read())
+        QuickAdd = self.env["quick.add.wizard"]
+        Expense = self.env["inventory.expense"].with_context(
+            inventory_expense_ledger="api"
+        )
+        if self.mode == "ai":
+            expense = Expense.create(
+                dict(
+                    QuickAdd._prepare_extracted_values(None, receipt, self.filename),
+                    extraction_state="pending",
+                )
+            )
+            expense._trigger_extraction()
+            return expense
+        return Expense.create(
+            QuickAdd._prepare_expense_values(
+                self.expense_name
+                or f"Quick Add - {fields.Date.context_today(self)}",
+                date=self.expense_date,
+                subtotal=self.subtotal,
+                total=self.total,
+                receipt_file=receipt,
+                receipt_filename=self.filename,
+            )
+        )
+
+    @api.autovacuum
+    def _gc_uploads(self):
+        """Drop uploads abandoned for a day, and their part files."""
+        cutoff = fields.Datetime.now() - timedelta(hours=UPLOAD_EXPIRY_HOURS)
+        expired = self.sudo().search(
+            [("state", "=", "open"), ("write_date", "<", cutoff)]
+        )
+        for upload in expired:
+            path = upload._get_part_path()
+            if os.path.exists(path):
+                os.unlink(path)
+        metrics.inc("inventory_expense_uploads_total", len(expired), outcome="expired")
+        expired.unlink()
@@ -1,4 +1,4 @@
-from odoo import fields, models
+from odoo import _, api, fields, models
 
 
 class ResConfigSettings(models.TransientModel):
@@ -10,3 +10,222 @@ class ResConfigSettings(models.TransientModel):
         default="gpt-4o-mini",
         help="The OpenAI model to use for receipt extraction (e.g., gpt-4o-mini, gpt-4o)",
     )
+    openai_connect_timeout = fields.Float(
+        string="Connect Timeout (s)",
+        config_parameter="inventory_expense.openai_connect_timeout",
+        default=5.0,
+        help="Seconds to wait for a connection to the OpenAI API",
+    )
+    openai_read_timeout = fields.Float(
+        string="Read Timeout (s)",
+        config_parameter="inventory_expense.openai_read_timeout",
+        default=60.0,
+        help="Seconds to wait for the OpenAI API to answer an extraction request",
+    )
+    openai_max_retries = fields.Integer(
+        string="Max Retries",
+        config_parameter="inventory_expense.openai_max_retries",
+        default=3,
+        help="Retries for rate-limited, timed-out or 5xx extraction requests (with jittered backoff)",
+    )
+    openai_requests_per_minute = fields.Integer(
+        string="Requests per Minute",
+        config_parameter="inventory_expense.openai_requests_per_minute",
+        default=500,
+        help="Extraction requests admitted per minute across all workers (0 for no limit)",
+    )
+    openai_tokens_per_minute = fields.Integer(
+        string="Tokens per Minute",
+        config_parameter="inventory_expense.openai_tokens_per_minute",
+        default=200000,
+        help="Tokens admitted per minute across all workers (0 for no limit)",
+    )
+    openai_estimated_tokens = fields.Integer(
+        string="Estimated Tokens per Receipt",
+        config_parameter="inventory_expense.openai_estimated_tokens",
+        default=1500,
+        help="Tokens reserved before each request; corrected with the real usage afterwards",
+    )
+    openai_rate_limit_max_wait = fields.Integer(
+        string="Max Queue Wait (s)",
+        config_parameter="inventory_expense.openai_rate_limit_max_wait",
+        default=300,
+        help="An extraction that waits longer than this for the rate limiter fails",
+    )
+    rate_limit_queue_depth = fields.Integer(
+        string="Waiting Requests",
+        compute="_compute_rate_limit_stats",
+    )
+    rate_limit_requests_available = fields.Integer(
+        string="Requests Available",
+        compute="_compute_rate_limit_stats",
+    )
+    rate_limit_tokens_available = fields.Integer(
+        string="Tokens Available",
+        compute="_compute_rate_limit_stats",
+    )
+    receipt_preprocess = fields.Boolean(
+        string="Preprocess Receipt Images",
+        config_parameter="inventory_expense.receipt_preprocess",
+        default=True,
+        help="Rotate, crop, convert to grayscale and downscale receipts before AI extraction",
+    )
+    receipt_max_dimension = fields.Integer(
+        string="Max Image Dimension (px)",
+        config_parameter="inventory_expense.receipt_max_dimension",
+        default=1600,
+        help="Longest side of the image sent to the model",
+    )
+    receipt_image_format = fields.Selection(
+        selection=[
+            ("JPEG", "JPEG"),
+            ("WEBP", "WebP"),
+        ],
+        string="Image Format",
+        config_parameter="inventory_expense.receipt_image_format",
+        default="JPEG",
+    )
+    receipt_image_detail = fields.Selection(
+        selection=[
+            ("low", "Low"),
+            ("auto", "Automatic"),
+            ("high", "High"),
+        ],
+        string="Image Detail",
+        config_parameter="inventory_expense.receipt_image_detail",
+        default="auto",
+        help="Detail level the model reads receipt images at; high detail is "
+        "billed per 512 px tile and costs the most tokens",
+    )
+    ai_max_workers = fields.Integer(
+        string="Parallel AI Extractions",
+        config_parameter="inventory_expense.ai_max_workers",
+        default=4,
+        help="Maximum number of receipts extracted concurrently by Batch Quick Add",
+    )
+    extraction_provider = fields.Selection(
+        selection=[
+            ("openai_chat", "OpenAI (one request per receipt)"),
+            ("openai_batch", "OpenAI Batch API (queued receipts)"),
+            ("stub", "Local stub (offline testing)"),
+        ],
+        string="Extraction Provider",
+        config_parameter="inventory_expense.extraction_provider",
+        default="openai_chat",
+        help="Provider used for background extractions; interactive extractions "
+        "use the chat endpoint when the Batch API is selected",
+    )
+    background_report_threshold = fields.Integer(
+        string="Background Report Threshold",
+        config_parameter="inventory_expense.background_report_threshold",
+        default=5000,
+        help="Reports covering more expenses than this are generated by a background job (0 disables)",
+    )
+    background_import_kb = fields.Integer(
+        string="Background Import Threshold (KB)",
+        config_parameter="inventory_expense.background_import_kb",
+        default=1024,
+        help="Import files larger than this are imported by a background job, "
+        "committed batch by batch (0 disables)",
+    )
+    report_cache_max_mb = fields.Integer(
+        string="Report Cache Size (MB)",
+        config_parameter="inventory_expense.report_cache_max_mb",
+        default=200,
+        help="Rendered PDF and Excel reports of closed months are kept up to this "
+        "total size, least recently used first out (0 disables)",
+    )
+    report_cache_entries = fields.Integer(
+        string="Cached Reports",
+        compute="_compute_report_cache_stats",
+    )
+    report_cache_size_mb = fields.Float(
+        string="Cache Usage (MB)",
+        digits=(16, 1),
+        compute="_compute_report_cache_stats",
+    )
+    archive_after_months = fields.Integer(
+        string="Archive Expenses After (months)",
+        config_parameter="inventory_expense.archive_after_months",
+        default=0,
+        help="Expenses older than this many full months are moved to the archive "
+        "(0 disables)",
+    )
+    archive_recompress = fields.Boolean(
+        string="Recompress Archived Receipts",
+        config_parameter="inventory_expense.archive_recompress",
+        help="Store archived receipt images as grayscale JPEG (quality 70, at "
+        "most 1600 px). This is lossy: the original files are not kept",
+    )
+    metrics_token = fields.Char(
+        string="Metrics Token",
+        config_parameter="inventory_expense.metrics_token",
+        help="Bearer token accepted by the Prometheus metrics endpoint",
+    )
+    extraction_cache_max_entries = fields.Integer(
+        string="Extraction Cache Size",
+        config_parameter="inventory_expense.extraction_cache_max_entries",
+        default=10000,
+        help="Maximum number of cached receipt extractions (0 for unlimited)",
+    )
+    extraction_cache_max_age_days = fields.Integer(
+        string="Extraction Cache Max Age (days)",
+        config_parameter="inventory_expense.extraction_cache_max_age_days",
+        default=90,
+        help="Cached extractions unused for longer than this are evicted (0 keeps them)",
+    )
+    extraction_cache_entries = fields.Integer(
+        string="Cache Entries",
+        compute="_compute_extraction_cache_stats",
+    )
+    extraction_cache_hits = fields.Integer(
+        string="Cache Hits",
+        compute="_compute_extraction_cache_stats",
+    )
+    extraction_cache_misses = fields.Integer(
+        string="Cache Misses",
+        compute="_compute_extraction_cache_stats",
+    )
+    extraction_cache_hit_rate = fields.Float(
+        string="Hit Rate (%)",
+        digits=(5, 1),
+        compute="_compute_extraction_cache_stats",
+    )
+
+    @api.depends("company_id")
+    def _compute_extraction_cache_stats(self):
+        stats = self.env["inventory.expense.extraction.cache"]._get_stats()
+        for settings in self:
+            settings.extraction_cache_entries = stats["entries"]
+            settings.extraction_cache_hits = stats["hits"]
+            settings.extraction_cache_misses = stats["misses"]
+            lookups = stats["hits"] + stats["misses"]
+            settings.extraction_cache_hit_rate = (
+                100.0 * stats["hits"] / lookups if lookups else 0.0
+            )
+
+    @api.depends("company_id")
+    def _compute_report_cache_stats(self):
+        stats = self.env["inventory.expense.report.cache"]._get_stats()
+        for settings in self:
+            settings.report_cache_entries = stats["entries"]
+            settings.report_cache_size_mb = stats["size"] / (1024 * 1024)
+
+    @api.depends("company_id")
+    def _compute_rate_limit_stats(self):
+        stats = self.env["inventory.expense.rate.bucket"]._get_stats()
+        for settings in self:
+            settings.rate_limit_queue_depth = stats["queue_depth"]
+            settings.rate_limit_requests_available = int(stats["requests"])
+            settings.rate_limit_tokens_available = int(stats["tokens"])
+
+    def action_rebuild_expense_summary(self):
+        self.env["inventory.expense.daily.summary"]._rebuild()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "type": "success",
+                "message": _("The expense summary has been rebuilt."),
+            },
+        }
@@ -0,0 +1,34 @@
+import { _t } from "@web/core/l10n/translation";
+import { registry } from "@web/core/registry";
+
+/**
+ * Listens for background AI extraction results and refreshes the expense
+ * form when it is the one currently open.
+ */
+export const extractionService = {
+    dependencies: ["action", "bus_service", "notification"],
+
+    start(env, { action, bus_service, notification }) {
+        bus_service.subscribe("inventory_expense/extraction", (payload) => {
+            const controller = action.currentController;
+            const props = controller?.props;
+            const isOpen =
+                props?.resModel === "inventory.expense" &&
+                props?.resId === payload.expense_id;
+            if (isOpen) {
+                action.doAction("soft_reload");
+            }
+            if (payload.state === "done") {
+                notification.add(_t("Receipt values extracted for %s.", payload.name), {
+                    type: "success",
+                });
+            } else {
+                notification.add(_t("AI extraction failed for %s.", payload.name), {
+                    type: "danger",
+                });
+            }
+        });
+    },
+};
+
+registry.category("services").add("inventory_expense_extraction", extractionService);
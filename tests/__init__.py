@@ -0,0 +1,13 @@
+from . import test_duplicates
+from . import test_extraction
+from . import test_extraction_providers
+from . import test_rate_limit
+from . import test_report_job
+from . import test_archive
+from . import test_import
+from . import test_metrics
+from . import test_extraction_cache
+from . import test_daily_summary
+from . import test_report_cache
+from . import test_upload
+from . import test_report_wizard
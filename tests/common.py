@@ -0,0 +1,45 @@
+import base64
+import io
+import random
+
+from PIL import Image, ImageDraw, ImageFilter
+
+
+def make_receipt_photo(seed, width=600, height=1400):
+    """A receipt-like photo: printed lines on paper over a darker table."""
+    rng = random.Random(seed)
+    paper = Image.new("L", (width, height), 245)
+    draw = ImageDraw.Draw(paper)
+    top = 40
+    if rng.random() < 0.6:
+        left = rng.randint(20, width // 2)
+        draw.rectangle((left, top, left + rng.randint(80, 250), top + 90), fill=40)
+        top += 140
+    while top < height - 80:
+        left = rng.choice([20, 40, width // 4])
+        right = min(width - 20, left + rng.randint(60, width - 80))
+        draw.rectangle((left, top, right, top + 12), fill=rng.randint(0, 60))
+        top += rng.randint(24, 60)
+    photo = Image.new("L", (width + 300, height + 300), 100)
+    photo.paste(paper, (150, 150))
+    return photo.filter(ImageFilter.GaussianBlur(1))
+
+
+def shifted(image, dx, dy):
+    return image.transform(
+        image.size, Image.AFFINE, (1, 0, -dx, 0, 1, -dy), fillcolor=100
+    )
+
+
+def rotated(image, angle):
+    return image.rotate(angle, resample=Image.BICUBIC, fillcolor=100)
+
+
+def to_jpeg(image, quality=85):
+    output = io.BytesIO()
+    image.convert("RGB").save(output, format="JPEG", quality=quality)
+    return output.getvalue()
+
+
+def to_base64(image):
+    return base64.b64encode(to_jpeg(image))
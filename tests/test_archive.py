@@ -0,0 +1,82 @@
+import base64
+
+from odoo.tests import TransactionCase, tagged
+
+from .common import make_receipt_photo, to_base64
+
+
+@tagged("post_install", "-at_install")
+class TestArchive(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.Expense = self.env["inventory.expense"]
+        self.Archive = self.env["inventory.expense.archive"]
+
+    def _create(self, total, **values):
+        return self.Expense.create(
+            dict(
+                {
+                    "name": "Old Receipt",
+                    "date": "2020-01-15",
+                    "total_with_tax": total,
+                    "total_without_tax": total,
+                },
+                **values,
+            )
+        )
+
+    def _summary(self):
+        return self.env["inventory.expense.daily.summary"].search(
+            [("company_id", "=", self.env.company.id), ("date", "=", "2020-01-15")]
+        )
+
+    def test_round_trip(self):
+        receipt = to_base64(make_receipt_photo(0))
+        expense = self.Expense.with_context(inventory_expense_ledger="import").create(
+            {
+                "name": "Old Receipt",
+                "date": "2020-01-15",
+                "total_with_tax": 42.0,
+                "total_without_tax": 40.0,
+                "receipt_image": receipt,
+                "receipt_filename": "receipt.jpg",
+            }
+        )
+        expense.message_post(body="Checked with the supplier")
+        log = expense.audit_log_ids
+        self.assertTrue(log)
+        summary = self._summary()
+        totals = summary.read(["expense_count", "total_with_tax"])
+
+        self.Archive._archive_expenses(expense)
+
+        self.assertFalse(expense.exists())
+        archive = self.Archive.search([("original_id", "=", expense.id)])
+        self.assertEqual(archive.total_with_tax, 42.0)
+        self.assertEqual(
+            archive.pack_id._read_member(archive.pack_member),
+            base64.b64decode(receipt),
+        )
+        self.assertIn(
+            "Checked with the supplier", archive.message_ids.mapped("body")[0]
+        )
+        self.assertEqual(log.archive_id, archive)
+        self.assertEqual(log.res_id, expense.id)
+        summary.invalidate_recordset()
+        self.assertEqual(summary.read(["expense_count", "total_with_tax"]), totals)
+        self.assertEqual(
+            self.env["inventory.expense.all"]
+            .search([("res_id", "=", archive.id), ("is_archived", "=", True)])
+            .total_with_tax,
+            42.0,
+        )
+
+    def test_duplicate_link_kept(self):
+        original = self._create(42.0)
+        duplicate = self._create(42.0)
+        self.assertEqual(duplicate.duplicate_of_id, original)
+        self.Archive._archive_expenses(original)
+        archive = self.Archive.search([("original_id", "=", original.id)])
+        self.assertFalse(duplicate.duplicate_of_id)
+        self.assertEqual(duplicate.duplicate_of_archive_id, archive)
+        self.assertEqual(duplicate.action_open_duplicate()["res_id"], archive.id)
@@ -0,0 +1,47 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestDailySummary(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.Summary = self.env["inventory.expense.daily.summary"]
+
+    def _create(self, date, total, subtotal):
+        return self.env["inventory.expense"].create(
+            {
+                "name": "Supplies",
+                "date": date,
+                "total_with_tax": total,
+                "total_without_tax": subtotal,
+            }
+        )
+
+    def _row(self, date):
+        row = self.Summary.search(
+            [("company_id", "=", self.env.company.id), ("date", "=", date)]
+        )
+        return (row.expense_count, row.total_without_tax, row.tax_amount, row.total_with_tax)
+
+    def test_create_write_unlink(self):
+        first = self._create("2023-05-02", 113.0, 100.0)
+        self._create("2023-05-02", 11.3, 10.0)
+        self.assertEqual(self._row("2023-05-02"), (2, 110.0, 14.3, 124.3))
+
+        first.write({"total_with_tax": 226.0, "total_without_tax": 200.0})
+        self.assertEqual(self._row("2023-05-02"), (2, 210.0, 27.3, 237.3))
+
+        first.date = "2023-05-03"
+        self.assertEqual(self._row("2023-05-02"), (1, 10.0, 1.3, 11.3))
+        self.assertEqual(self._row("2023-05-03"), (1, 200.0, 26.0, 226.0))
+
+        first.unlink()
+        self.assertEqual(self._row("2023-05-03"), (0, 0.0, 0.0, 0.0))
+
+    def test_rebuild_matches_deltas(self):
+        self._create("2023-06-01", 50.0, 40.0)
+        expense = self._create("2023-06-02", 20.0, 20.0)
+        expense.total_with_tax = 25.0
+        incremental = [self._row("2023-06-01"), self._row("2023-06-02")]
+        self.Summary._rebuild()
+        self.assertEqual([self._row("2023-06-01"), self._row("2023-06-02")], incremental)
@@ -0,0 +1,77 @@
+from odoo.tests import TransactionCase, tagged
+
+from ..models.inventory_expense import DUPLICATE_HASH_DISTANCE
+from ..tools import receipt_preprocess
+from .common import make_receipt_photo, rotated, shifted, to_base64, to_jpeg
+
+
+def _hash(image):
+    thumbnail = receipt_preprocess.make_thumbnail(to_jpeg(image), "image/jpeg")
+    return receipt_preprocess.perceptual_hash(thumbnail)
+
+
+@tagged("post_install", "-at_install")
+class TestDuplicates(TransactionCase):
+    def _create(self, photo=None, total=42.0, date="2024-03-05"):
+        return self.env["inventory.expense"].create(
+            {
+                "name": "Receipt",
+                "date": date,
+                "total_with_tax": total,
+                "total_without_tax": total,
+                "receipt_image": to_base64(photo) if photo else False,
+                "receipt_filename": "receipt.jpg" if photo else False,
+            }
+        )
+
+    def test_hash_survives_rephotos(self):
+        for seed in range(5):
+            photo = make_receipt_photo(seed)
+            original = _hash(photo)
+            for variant in (
+                shifted(photo, 20, 0),
+                shifted(photo, 0, 20),
+                rotated(photo, 0.5),
+                rotated(photo, -0.5),
+            ):
+                self.assertLessEqual(
+                    receipt_preprocess.hash_distance(original, _hash(variant)),
+                    DUPLICATE_HASH_DISTANCE,
+                )
+
+    def test_hash_tells_receipts_apart(self):
+        hashes = [_hash(make_receipt_photo(seed)) for seed in range(5)]
+        self.assertEqual(len(set(hashes)), len(hashes))
+        self.assertGreater(
+            receipt_preprocess.hash_distance(hashes[0], hashes[1]),
+            DUPLICATE_HASH_DISTANCE,
+        )
+
+    def test_same_total_flagged_whatever_the_photos(self):
+        original = self._create(make_receipt_photo(0))
+        duplicate = self._create(make_receipt_photo(1))
+        self.assertEqual(duplicate.duplicate_of_id, original)
+
+    def test_rephoto_flagged_with_misread_total(self):
+        photo = make_receipt_photo(2)
+        original = self._create(photo, total=42.0)
+        duplicate = self._create(rotated(shifted(photo, 20, 0), 0.5), total=24.0)
+        self.assertEqual(duplicate.duplicate_of_id, original)
+
+    def test_rephoto_of_another_day_not_flagged(self):
+        photo = make_receipt_photo(3)
+        self._create(photo, date="2024-03-05")
+        other = self._create(shifted(photo, 20, 0), total=24.0, date="2024-03-06")
+        self.assertFalse(other.duplicate_of_id)
+
+    def test_zero_totals_not_matched(self):
+        self._create(total=0.0)
+        other = self._create(total=0.0)
+        self.assertFalse(other.duplicate_of_id)
+
+    def test_dismissed_duplicate_not_flagged_again(self):
+        self._create()
+        duplicate = self._create()
+        duplicate.action_dismiss_duplicate()
+        duplicate._flag_duplicates()
+        self.assertFalse(duplicate.duplicate_of_id)
@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+from ..models.inventory_expense import EXTRACTION_TIMEOUT_MINUTES
+from ..tools.extraction_providers import StubProvider
+from .common import make_receipt_photo, to_base64
+
+
+@tagged("post_install", "-at_install")
+class TestExtraction(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.env["ir.config_parameter"].sudo().set_param(
+            "inventory_expense.extraction_provider", StubProvider.name
+        )
+        # the extraction commits between the claim and the API calls
+        self.patch(self.env.cr, "commit", lambda: None)
+
+    def _create(self, seed, **values):
+        return self.env["inventory.expense"].create(
+            dict(
+                {
+                    "name": "Quick Add",
+                    "receipt_image": to_base64(make_receipt_photo(seed)),
+                    "receipt_filename": "receipt.jpg",
+                    "extraction_state": "pending",
+                },
+                **values,
+            )
+        )
+
+    def test_pending_extraction_filled_in(self):
+        expense = self._create(0)
+        expected = StubProvider({}).extract(expense.receipt_image, "image/jpeg")
+        self.env["inventory.expense"]._cron_process_extractions()
+        self.assertEqual(expense.extraction_state, "done")
+        self.assertEqual(expense.vendor_name, expected["vendor_name"])
+        self.assertEqual(expense.total_with_tax, expected["total"])
+
+    def test_stale_running_extraction_reclaimed(self):
+        started = fields.Datetime.now() - timedelta(
+            minutes=EXTRACTION_TIMEOUT_MINUTES + 1
+        )
+        stale = self._create(1, extraction_state="running", extraction_started=started)
+        busy = self._create(
+            2, extraction_state="running", extraction_started=fields.Datetime.now()
+        )
+        self.env["inventory.expense"]._cron_process_extractions()
+        self.assertEqual(stale.extraction_state, "done")
+        self.assertEqual(busy.extraction_state, "running")
+
+    def test_retry_running_extraction(self):
+        expense = self._create(
+            3, extraction_state="running", extraction_started=fields.Datetime.now()
+        )
+        expense.action_retry_extraction()
+        self.assertEqual(expense.extraction_state, "pending")
+
+    def test_unusable_amounts_clamped(self):
+        expense = self._create(4)
+        self.patch(
+            StubProvider,
+            "extract",
+            lambda provider, data, mime_type: {
+                "vendor_name": "Hardware Store",
+                "date": "2023-03-10",
+                "subtotal": 50.0,
+                "total": None,
+            },
+        )
+        self.env["inventory.expense"]._cron_process_extractions()
+        self.assertEqual(expense.extraction_state, "done")
+        self.assertTrue(expense.needs_review)
+        self.assertEqual(expense.total_with_tax, 50.0)
+        self.assertEqual(expense.total_without_tax, 50.0)
+
+    def test_refused_result_does_not_block_others(self):
+        refused, accepted = self._create(5), self._create(6)
+        QuickAdd = type(self.env["quick.add.wizard"])
+        prepare = QuickAdd._prepare_extracted_values
+
+        def prepare_values(wizard, extraction, receipt_file, receipt_filename):
+            values = prepare(wizard, extraction, receipt_file, receipt_filename)
+            if receipt_file == refused.receipt_image:
+                values.update(total_without_tax=20.0, total_with_tax=10.0)
+            return values
+
+        self.patch(QuickAdd, "_prepare_extracted_values", prepare_values)
+        self.env["inventory.expense"]._cron_process_extractions()
+        self.assertEqual(refused.extraction_state, "failed")
+        self.assertTrue(refused.extraction_error)
+        self.assertEqual(accepted.extraction_state, "done")
+
+    def test_batch_wizard_falls_back_per_file(self):
+        good, bad = to_base64(make_receipt_photo(7)), to_base64(make_receipt_photo(8))
+        extract = StubProvider.extract
+
+        def extract_bad(provider, data, mime_type):
+            result = extract(provider, data, mime_type)
+            if data == bad:
+                result.update(subtotal=20.0, total=10.0)
+            return result
+
+        self.patch(StubProvider, "extract", extract_bad)
+        attachments = self.env["ir.attachment"].create(
+            [
+                {"name": "good.jpg", "datas": good},
+                {"name": "bad.jpg", "datas": bad},
+            ]
+        )
+        wizard = self.env["quick.add.batch.wizard"].create(
+            {"attachment_ids": [(6, 0, attachments.ids)]}
+        )
+        wizard.action_process()
+        self.assertEqual((wizard.success_count, wizard.failure_count), (1, 1))
+        lines = {line.filename: line for line in wizard.line_ids}
+        self.assertEqual(lines["good.jpg"].status, "success")
+        self.assertEqual(lines["bad.jpg"].status, "failed")
+        self.assertTrue(lines["bad.jpg"].message)
+        self.assertEqual(lines["bad.jpg"].expense_id.total_with_tax, 0.0)
@@ -0,0 +1,50 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestExtractionCache(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.Cache = self.env["inventory.expense.extraction.cache"]
+        self.config = {"model": "gpt-4o", "prompt_version": "1"}
+        self.checksum = self.Cache._checksum(b"receipt")
+
+    def test_key(self):
+        key = self.Cache._get_key(self.checksum, self.config)
+        self.assertEqual(key, self.Cache._get_key(self.checksum, dict(self.config)))
+        self.assertNotEqual(
+            key, self.Cache._get_key(self.checksum, dict(self.config, model="gpt-4.1"))
+        )
+        self.assertNotEqual(
+            key, self.Cache._get_key(self.checksum, dict(self.config, prompt_version="2"))
+        )
+        self.assertNotEqual(
+            key, self.Cache._get_key(self.Cache._checksum(b"other"), self.config)
+        )
+
+    def test_store_and_lookup(self):
+        self.assertIsNone(self.Cache._lookup(self.checksum, self.config))
+        self.Cache._store(
+            self.checksum,
+            self.config,
+            {"vendor_name": "Hardware Store", "date": "2023-03-10", "subtotal": 10.0, "total": 11.3},
+        )
+        result = self.Cache._lookup(self.checksum, self.config)
+        self.assertEqual(result["vendor_name"], "Hardware Store")
+        self.assertEqual(result["total"], 11.3)
+        self.assertIsNone(
+            self.Cache._lookup(self.checksum, dict(self.config, prompt_version="2"))
+        )
+        entry = self.Cache.sudo().search([("checksum", "=", self.checksum)])
+        self.assertEqual(entry.hit_count, 1)
+
+    def test_stats_count_hits_and_misses(self):
+        before = self.Cache._get_stats()
+        self.Cache._lookup(self.checksum, self.config)
+        self.Cache._store(self.checksum, self.config, {"total": 11.3})
+        self.Cache._lookup(self.checksum, self.config)
+        self.Cache._lookup(self.checksum, self.config)
+        after = self.Cache._get_stats()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 2)
+        self.assertEqual(after["entries"] - before["entries"], 1)
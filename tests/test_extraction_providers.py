@@ -0,0 +1,194 @@
+import base64
+import json
+from types import SimpleNamespace
+
+from odoo.tests import BaseCase, tagged
+
+from ..tools.extraction_providers import (
+    DEFAULT_IMAGE_DETAIL,
+    OpenAIBatchProvider,
+    OpenAIChatProvider,
+    StubProvider,
+)
+
+CONFIG = {
+    "model": "gpt-4o-mini",
+    "prompt": "Extract the receipt.",
+    "prompt_version": "1",
+    "connect_timeout": 5.0,
+    "read_timeout": 60.0,
+    "max_retries": 0,
+    "preprocess": False,
+}
+RECEIPT = base64.b64encode(b"receipt")
+EXTRACTION = {
+    "vendor_name": "Hardware Store",
+    "date": "2023-03-10",
+    "subtotal": 10.0,
+    "total": 11.3,
+}
+
+
+def completion(content, prompt_tokens=900, completion_tokens=40):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        ),
+    )
+
+
+def batch_line(custom_id, content=None, status_code=200, error=None):
+    if error:
+        return {"custom_id": custom_id, "error": error, "response": None}
+    return {
+        "custom_id": custom_id,
+        "response": {
+            "status_code": status_code,
+            "body": {
+                "choices": [{"message": {"content": content}}],
+                "usage": {"prompt_tokens": 900, "completion_tokens": 40},
+            },
+        },
+    }
+
+
+class FakeClient:
+    """Records the calls the providers make to the OpenAI client."""
+
+    def __init__(self, responses=(), batch=None, files=None):
+        self.responses = list(responses)
+        self.requests = []
+        self.uploads = []
+        self.batches_created = []
+        self.batch = batch
+        self.file_contents = files or {}
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.files = SimpleNamespace(create=self._upload, content=self._content)
+        self.batches = SimpleNamespace(
+            create=self._create_batch, retrieve=lambda batch_id: self.batch
+        )
+
+    def with_options(self, **options):
+        return self
+
+    def _create(self, **request):
+        self.requests.append(request)
+        return self.responses.pop(0)
+
+    def _upload(self, file, purpose):
+        self.uploads.append((file, purpose))
+        return SimpleNamespace(id="file-in")
+
+    def _content(self, file_id):
+        return SimpleNamespace(text=self.file_contents[file_id])
+
+    def _create_batch(self, **params):
+        self.batches_created.append(params)
+        return SimpleNamespace(id="batch-1")
+
+
+class FakeLimiter:
+    def __init__(self):
+        self.settled = []
+
+    def acquire(self):
+        return 1500
+
+    def settle(self, charged, actual):
+        self.settled.append((charged, actual))
+
+
+@tagged("post_install", "-at_install")
+class TestExtractionProviders(BaseCase):
+    def test_chat_provider(self):
+        client = FakeClient([completion(json.dumps(dict(EXTRACTION, extra=1)))])
+        limiter = FakeLimiter()
+        provider = OpenAIChatProvider(CONFIG, client=client, limiter=limiter)
+        self.assertEqual(provider.extract(RECEIPT, "image/jpeg"), EXTRACTION)
+        [request] = client.requests
+        self.assertEqual(request["model"], CONFIG["model"])
+        self.assertEqual(request["messages"][0]["content"], CONFIG["prompt"])
+        [image] = request["messages"][1]["content"]
+        self.assertEqual(
+            image["image_url"]["url"], f"data:image/jpeg;base64,{RECEIPT.decode()}"
+        )
+        self.assertEqual(limiter.settled, [(1500, 940)])
+
+    def test_image_detail(self):
+        client = FakeClient([completion(json.dumps(EXTRACTION))] * 2)
+        OpenAIChatProvider(CONFIG, client=client).extract(RECEIPT, "image/jpeg")
+        OpenAIChatProvider(dict(CONFIG, image_detail="low"), client=client).extract(
+            RECEIPT, "image/jpeg"
+        )
+        details = [
+            request["messages"][1]["content"][0]["image_url"]["detail"]
+            for request in client.requests
+        ]
+        self.assertEqual(details, [DEFAULT_IMAGE_DETAIL, "low"])
+        self.assertNotEqual(DEFAULT_IMAGE_DETAIL, "high")
+
+    def test_chat_provider_empty_answer(self):
+        provider = OpenAIChatProvider(CONFIG, client=FakeClient([completion("")]))
+        with self.assertRaises(ValueError):
+            provider.extract(RECEIPT, "image/jpeg")
+
+    def test_batch_submit(self):
+        client = FakeClient()
+        provider = OpenAIBatchProvider(CONFIG, client=client)
+        batch_id = provider.submit(
+            [(7, RECEIPT, "image/jpeg"), (8, RECEIPT, "image/png")],
+            metadata={"source": "test"},
+        )
+        self.assertEqual(batch_id, "batch-1")
+        [((filename, content), purpose)] = client.uploads
+        self.assertEqual(purpose, "batch")
+        lines = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual([line["custom_id"] for line in lines], ["7", "8"])
+        self.assertEqual(lines[0]["body"]["model"], CONFIG["model"])
+        [params] = client.batches_created
+        self.assertEqual(params["input_file_id"], "file-in")
+        self.assertEqual(params["metadata"], {"source": "test"})
+
+    def test_batch_collect_pending(self):
+        client = FakeClient(batch=SimpleNamespace(status="in_progress"))
+        self.assertIsNone(OpenAIBatchProvider(CONFIG, client=client).collect("batch-1"))
+
+    def test_batch_collect_results(self):
+        output = [
+            batch_line("7", json.dumps(EXTRACTION)),
+            batch_line("8", "not json"),
+            batch_line("9", status_code=500),
+        ]
+        errors = [batch_line("10", error={"message": "expired"})]
+        client = FakeClient(
+            batch=SimpleNamespace(
+                status="completed", output_file_id="file-out", error_file_id="file-err"
+            ),
+            files={
+                "file-out": "\n".join(json.dumps(line) for line in output),
+                "file-err": "\n".join(json.dumps(line) for line in errors),
+            },
+        )
+        results = OpenAIBatchProvider(CONFIG, client=client).collect("batch-1")
+        self.assertEqual(results["7"], (EXTRACTION, None))
+        for custom_id in ("8", "9", "10"):
+            extraction, error = results[custom_id]
+            self.assertIsNone(extraction)
+            self.assertTrue(error)
+
+    def test_batch_collect_failed_batch(self):
+        client = FakeClient(batch=SimpleNamespace(status="expired"))
+        results = OpenAIBatchProvider(CONFIG, client=client).collect("batch-1")
+        self.assertEqual(list(results), ["*"])
+        extraction, error = results["*"]
+        self.assertIsNone(extraction)
+        self.assertIn("expired", error)
+
+    def test_stub_provider(self):
+        provider = StubProvider(CONFIG)
+        result = provider.extract(RECEIPT, "image/jpeg")
+        self.assertEqual(result, provider.extract(RECEIPT.decode(), "image/jpeg"))
+        other = provider.extract(base64.b64encode(b"other"), "image/jpeg")
+        self.assertNotEqual(result, other)
+        self.assertLessEqual(result["subtotal"], result["total"])
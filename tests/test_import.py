@@ -0,0 +1,109 @@
+import base64
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestImport(TransactionCase):
+    def test_wizard_imports_in_one_transaction(self):
+        def commit():
+            raise AssertionError("the import must not commit")
+
+        self.patch(self.env.cr, "commit", commit)
+        content = "\n".join(
+            [
+                "name,date,subtotal,total",
+                "Paper,2024-02-01,10,11.3",
+                "Toner,2024-02-31,20,22.6",
+                "Pens,2024-02-03,5,5.65",
+            ]
+        )
+        wizard = self.env["expense.import.wizard"].create(
+            {
+                "import_file": base64.b64encode(content.encode()),
+                "import_filename": "expenses.csv",
+                "chunk_size": 1,
+            }
+        )
+        wizard.action_import()
+        self.assertEqual(wizard.created_count, 2)
+        self.assertEqual(wizard.rejected_count, 1)
+        self.assertEqual(
+            self.env["inventory.expense"].search_count(
+                [("name", "in", ("Paper", "Pens")), ("date", ">=", "2024-02-01")]
+            ),
+            2,
+        )
+
+    def test_api_rejects_rows_with_reasons(self):
+        result = self.env["inventory.expense"].import_expenses(
+            [
+                {"name": "Paper", "date": "2024-02-01", "total": "11.30"},
+                {"name": "Toner", "date": "2024-02-02"},
+                {"name": "Pens", "date": "2024-02-03", "total": "5", "subtotal": "6"},
+            ]
+        )
+        self.assertEqual(result["created"], 1)
+        self.assertEqual([line for line, _reason in result["rejected"]], [2, 3])
+
+
+@tagged("post_install", "-at_install")
+class TestImportJob(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.commits = []
+        self.patch(self.env.cr, "commit", lambda: self.commits.append(True))
+
+    def _csv(self, names, bad=()):
+        lines = ["name,date,subtotal,total"]
+        for name in names:
+            date = "2024-02-31" if name in bad else "2024-03-01"
+            lines.append(f"{name},{date},10,11.3")
+        return "\n".join(lines).encode()
+
+    def _count(self, names):
+        return self.env["inventory.expense"].search_count([("name", "in", names)])
+
+    def test_large_file_imported_in_background(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "inventory_expense.background_import_kb", 1
+        )
+        names = [f"Import Job Row {index:03d}" for index in range(60)]
+        wizard = self.env["expense.import.wizard"].create(
+            {
+                "import_file": base64.b64encode(self._csv(names, bad=names[:1])),
+                "import_filename": "expenses.csv",
+                "chunk_size": 25,
+            }
+        )
+        wizard.action_import()
+        self.assertEqual(wizard.state, "queued")
+        self.assertEqual(self._count(names), 0)
+
+        job = wizard.job_id
+        source = job.source_attachment_id
+        self.commits.clear()
+        job._run()
+        self.assertEqual(job.state, "done")
+        self.assertEqual(
+            (job.rows_read, job.created_count, job.rejected_count), (60, 59, 1)
+        )
+        self.assertEqual(self._count(names), 59)
+        # one commit per batch, plus the start and the end of the job
+        self.assertEqual(len(self.commits), 3 + 2)
+        self.assertFalse(source.exists())
+        self.assertIn(b"Invalid date", job.rejected_attachment_id.raw)
+
+    def test_interrupted_import_resumes(self):
+        names = [f"Resumed Row {index}" for index in range(5)]
+        job = self.env["inventory.expense.import.job"].enqueue(
+            "expenses.csv", "csv", 2, self._csv(names)
+        )
+        # the first two batches were committed before the worker died
+        job.write({"state": "failed", "rows_read": 4, "created_count": 4})
+        job.action_retry()
+        job._run()
+        self.assertEqual(job.state, "done")
+        self.assertEqual(job.created_count, 5)
+        self.assertEqual(self._count(names[:4]), 0)
+        self.assertEqual(self._count(names[4:]), 1)
@@ -0,0 +1,65 @@
+import tempfile
+
+from odoo.tests import HttpCase, TransactionCase, tagged
+
+from ..tools import metrics
+
+# above the largest pid Linux hands out, so never alive
+DEAD_PID = 4194305
+
+
+@tagged("post_install", "-at_install")
+class TestMetrics(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.patch(metrics, "_directory", directory.name)
+        self.patch(metrics, "_counters", {})
+        self.patch(metrics, "_histograms", {})
+
+    def _other_process(self, pid, value):
+        metrics._write(
+            metrics._process_path(pid),
+            {
+                "counters": [["inventory_expense_created_total", [], value]],
+                "histograms": [],
+            },
+        )
+
+    def _created(self):
+        counters, _histograms = metrics.snapshot()
+        return sum(
+            item["value"]
+            for item in counters
+            if item["name"] == "inventory_expense_created_total"
+        )
+
+    def test_totals_summed_over_processes(self):
+        metrics.inc("inventory_expense_created_total", 2)
+        self._other_process(DEAD_PID, 3)
+        self.assertEqual(self._created(), 5)
+        # the exited process was folded into the retired totals
+        self.assertEqual(self._created(), 5)
+        self.assertIn(
+            "inventory_expense_created_total 5", metrics.render_prometheus()
+        )
+
+    def test_reset_clears_all_processes(self):
+        metrics.inc("inventory_expense_created_total", 2)
+        self._other_process(DEAD_PID, 3)
+        metrics.reset()
+        self.assertEqual(self._created(), 0)
+
+
+@tagged("post_install", "-at_install")
+class TestMetricsEndpoint(HttpCase):
+    def test_non_ascii_authorization_refused(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "inventory_expense.metrics_token", "secret"
+        )
+        response = self.url_open(
+            "/inventory_expense/metrics",
+            headers={"Authorization": "Bearer s\xe9cret"},
+        )
+        self.assertEqual(response.status_code, 403)
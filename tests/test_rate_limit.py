@@ -0,0 +1,56 @@
+from odoo.tests import TransactionCase, tagged
+
+from ..models.inventory_expense_rate_limit import DatabaseRateLimiter
+from ..tools import rate_limit
+
+
+@tagged("post_install", "-at_install")
+class TestRateLimit(TransactionCase):
+    def test_refill(self):
+        self.assertEqual(rate_limit.refill(0, 30, 60), 30)
+        self.assertEqual(rate_limit.refill(50, 30, 60), 60)
+        self.assertEqual(rate_limit.refill(-10, 5, 60), -5)
+        self.assertEqual(rate_limit.refill(10, -5, 60), 10)
+
+    def test_wait_time(self):
+        limits = {"requests": 60, "tokens": 6000}
+        costs = {"requests": 1, "tokens": 100}
+        levels = {"requests": 1, "tokens": 100}
+        self.assertEqual(rate_limit.wait_time(levels, costs, limits), 0)
+        # the tokens bucket has the largest shortfall: 200 tokens at 100/s
+        levels = {"requests": 0, "tokens": -100}
+        self.assertEqual(rate_limit.wait_time(levels, costs, limits), 2)
+        # an oversized request waits for a full bucket, not forever
+        levels = {"requests": 60, "tokens": 0}
+        costs = {"requests": 1, "tokens": 10**6}
+        self.assertEqual(rate_limit.wait_time(levels, costs, limits), 60)
+
+    def test_reservations_queue_in_order(self):
+        limiter = DatabaseRateLimiter(
+            self.env.cr.dbname, {"requests": 60}, estimated_tokens=1, max_wait=1.5
+        )
+        costs = limiter._costs(1)
+        waits = [limiter._reserve(self.env.cr, costs) for _i in range(61)]
+        self.assertEqual(waits[0], 0)
+        self.assertAlmostEqual(waits[-1], 1, delta=0.1)
+        self.assertEqual(
+            self.env["inventory.expense.rate.bucket"]._get_queue_depth(
+                {"requests": -1}
+            ),
+            1,
+        )
+        self.assertGreater(waits[-1], waits[-2])
+
+    def test_reservation_beyond_max_wait_fails_without_charge(self):
+        limiter = DatabaseRateLimiter(
+            self.env.cr.dbname, {"requests": 60}, estimated_tokens=1, max_wait=0.5
+        )
+        costs = limiter._costs(1)
+        for _i in range(60):
+            limiter._reserve(self.env.cr, costs)
+        with self.assertRaises(rate_limit.RateLimitTimeout):
+            limiter._reserve(self.env.cr, costs)
+        bucket = self.env["inventory.expense.rate.bucket"].search(
+            [("name", "=", "requests")]
+        )
+        self.assertAlmostEqual(bucket.level, 0, delta=0.1)
@@ -0,0 +1,97 @@
+from dateutil.relativedelta import relativedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestReportCache(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.Cache = self.env["inventory.expense.report.cache"]
+        self.wizard = self.env["expense.report.wizard"].create(
+            {
+                "date_from": "2023-03-01",
+                "date_to": "2023-03-31",
+                "report_type": "detailed",
+            }
+        )
+
+    def test_current_month_not_cached(self):
+        today = fields.Date.context_today(self.wizard)
+        self.wizard.write(
+            {"date_from": today - relativedelta(months=1), "date_to": today}
+        )
+        self.assertIsNone(self.Cache._get_key(self.wizard, "pdf"))
+
+    def test_key_follows_parameters_and_data(self):
+        key = self.Cache._get_key(self.wizard, "pdf")
+        self.assertTrue(key)
+        self.assertEqual(self.Cache._get_key(self.wizard, "pdf"), key)
+        self.assertNotEqual(self.Cache._get_key(self.wizard, "xlsx"), key)
+
+        self.env["inventory.expense"].create(
+            {"name": "Supplies", "date": "2023-04-10", "total_with_tax": 10.0}
+        )
+        self.assertEqual(self.Cache._get_key(self.wizard, "pdf"), key)
+        expense = self.env["inventory.expense"].create(
+            {"name": "Supplies", "date": "2023-03-10", "total_with_tax": 10.0}
+        )
+        changed = self.Cache._get_key(self.wizard, "pdf")
+        self.assertNotEqual(changed, key)
+        expense.total_with_tax = 20.0
+        self.assertNotEqual(self.Cache._get_key(self.wizard, "pdf"), changed)
+
+    def test_consolidated_key_follows_rates(self):
+        foreign = self.env.ref("base.EUR")
+        if foreign == self.env.company.currency_id:
+            foreign = self.env.ref("base.USD")
+        foreign.active = True
+        self.wizard.write(
+            {
+                "report_type": "consolidated",
+                "company_ids": [(6, 0, self.env.company.ids)],
+                "currency_id": foreign.id,
+            }
+        )
+        key = self.Cache._get_key(self.wizard, "pdf")
+        rate = self.env["res.currency.rate"].create(
+            {
+                "currency_id": foreign.id,
+                "name": "2023-03-15",
+                "rate": 1.5,
+                "company_id": self.env.company.id,
+            }
+        )
+        changed = self.Cache._get_key(self.wizard, "pdf")
+        self.assertNotEqual(changed, key)
+        rate.rate = 2.0
+        self.assertNotEqual(self.Cache._get_key(self.wizard, "pdf"), changed)
+
+    def test_store_and_lookup(self):
+        self.assertFalse(self.wizard._get_cached_report("pdf"))
+        self.wizard._cache_report("pdf", b"%PDF-1.4 report")
+        entry = self.wizard._get_cached_report("pdf")
+        self.assertEqual(entry._get_content(), b"%PDF-1.4 report")
+        self.wizard._get_cached_report("pdf")
+        entry.invalidate_recordset()
+        self.assertEqual(entry.hit_count, 2)
+        self.assertFalse(self.wizard._get_cached_report("xlsx"))
+
+    def test_disabled_cache(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "inventory_expense.report_cache_max_mb", 0
+        )
+        self.assertIsNone(self.Cache._get_key(self.wizard, "pdf"))
+
+    def test_evicts_least_recently_used(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "inventory_expense.report_cache_max_mb", 1
+        )
+        self.Cache.sudo().search([]).unlink()
+        content = b"x" * (600 * 1024)
+        self.wizard._cache_report("pdf", content)
+        self.wizard._cache_report("xlsx", content)
+        self.assertFalse(self.wizard._get_cached_report("pdf"))
+        self.assertTrue(self.wizard._get_cached_report("xlsx"))
+
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+from ..models.inventory_expense_report_job import (
+    REPORT_JOB_MAX_ATTEMPTS,
+    REPORT_JOB_RETENTION_DAYS,
+    REPORT_JOB_TIMEOUT_MINUTES,
+)
+
+
+@tagged("post_install", "-at_install")
+class TestReportJob(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.patch(self.env.cr, "commit", lambda: None)
+
+    def _create(self, **values):
+        return self.env["inventory.expense.report.job"].create(
+            dict(
+                {
+                    "date_from": "2024-01-01",
+                    "date_to": "2024-01-31",
+                    "company_id": self.env.company.id,
+                    "report_format": "xlsx",
+                },
+                **values,
+            )
+        )
+
+    def _age(self, job, **delta):
+        job.flush_recordset()
+        self.env.cr.execute(
+            "UPDATE inventory_expense_report_job SET write_date = %s WHERE id = %s",
+            [fields.Datetime.now() - timedelta(**delta), job.id],
+        )
+        job.invalidate_recordset()
+
+    def test_stale_running_job_requeued_then_failed(self):
+        job = self._create(state="running", attempts=1)
+        busy = self._create(state="running", attempts=1)
+        self._age(job, minutes=REPORT_JOB_TIMEOUT_MINUTES + 1)
+        self.env["inventory.expense.report.job"]._recover_stale_jobs()
+        self.assertEqual(job.state, "queued")
+        self.assertEqual(busy.state, "running")
+
+        job.write({"state": "running", "attempts": REPORT_JOB_MAX_ATTEMPTS})
+        self._age(job, minutes=REPORT_JOB_TIMEOUT_MINUTES + 1)
+        self.env["inventory.expense.report.job"]._recover_stale_jobs()
+        self.assertEqual(job.state, "failed")
+        self.assertTrue(job.error_message)
+
+    def test_old_jobs_and_files_collected(self):
+        old = self._create(state="done")
+        old.attachment_id = self.env["ir.attachment"].create(
+            {
+                "name": "report.xlsx",
+                "raw": b"report",
+                "res_model": old._name,
+                "res_id": old.id,
+            }
+        )
+        attachment = old.attachment_id
+        recent = self._create(state="done")
+        queued = self._create(state="queued")
+        self._age(old, days=REPORT_JOB_RETENTION_DAYS + 1)
+        self._age(queued, days=REPORT_JOB_RETENTION_DAYS + 1)
+        self.env["inventory.expense.report.job"]._gc_jobs()
+        self.assertFalse(old.exists())
+        self.assertFalse(attachment.exists())
+        self.assertTrue(recent.exists())
+        self.assertTrue(queued.exists())
@@ -0,0 +1,26 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestReportWizard(TransactionCase):
+    def test_comparison_totals_match_lines_without_onchange(self):
+        Expense = self.env["inventory.expense"]
+        for date, total in [("2023-01-15", 10.0), ("2023-02-15", 20.0), ("2023-03-15", 40.0)]:
+            Expense.create({"name": "Supplies", "date": date, "total_with_tax": total})
+        # created over RPC: the onchange moving date_from has not run
+        wizard = self.env["expense.report.wizard"].create(
+            {
+                "date_from": "2023-03-01",
+                "date_to": "2023-03-31",
+                "report_type": "comparison",
+                "comparison_granularity": "month",
+                "comparison_periods": 3,
+            }
+        )
+        lines = wizard._get_comparison_lines()
+        self.assertEqual(wizard._get_report_range()[0].isoformat(), "2023-01-01")
+        self.assertEqual(wizard.expense_count, sum(line["count"] for line in lines))
+        self.assertEqual(
+            wizard.total_with_tax, sum(line["total_with_tax"] for line in lines)
+        )
+        self.assertEqual(len(wizard.expense_ids), wizard.expense_count)
@@ -0,0 +1,115 @@
+import hashlib
+import io
+import json
+import os
+
+from odoo.exceptions import UserError
+from odoo.tests import HttpCase, TransactionCase, tagged
+
+from .common import make_receipt_photo, to_jpeg
+
+
+@tagged("post_install", "-at_install")
+class TestUpload(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.Upload = self.env["inventory.expense.upload"]
+        self.receipt = to_jpeg(make_receipt_photo(7))
+
+    def _start(self, **params):
+        status = self.Upload._start(
+            dict(
+                {
+                    "filename": "receipt.jpg",
+                    "size": len(self.receipt),
+                    "mode": "quick_add",
+                    "name": "Hardware",
+                    "date": "2023-03-10",
+                    "total": 11.3,
+                },
+                **params,
+            )
+        )
+        if "upload_id" in status:
+            upload = self.Upload._get_open_upload(status["upload_id"])
+            self.addCleanup(
+                lambda path=upload._get_part_path(): os.path.exists(path)
+                and os.unlink(path)
+            )
+        return status
+
+    def _write(self, token, offset, data):
+        upload = self.Upload._get_open_upload(token)
+        return upload._write_chunk(offset, io.BytesIO(data))
+
+    def _send(self, **params):
+        status = self._start(**params)
+        self._write(status["upload_id"], 0, self.receipt)
+        return self.Upload._get_open_upload(status["upload_id"])._complete()
+
+    def test_resume(self):
+        token = self._start()["upload_id"]
+        half = len(self.receipt) // 2
+        self.assertEqual(self._write(token, 0, self.receipt[:half])["offset"], half)
+        # the acknowledgement of the next chunk got lost; it is sent again
+        self._write(token, half, self.receipt[half:half + 100])
+        status = self._write(token, half, self.receipt[half:])
+        self.assertEqual(status["offset"], len(self.receipt))
+        with self.assertRaises(UserError):
+            self._write(token, len(self.receipt) + 1, b"x")
+
+        result = self.Upload._get_open_upload(token)._complete()
+        self.assertFalse(result["duplicate"])
+        expense = self.env["inventory.expense"].browse(result["expense_id"])
+        self.assertEqual(expense.name, "Hardware")
+        self.assertEqual(expense.total_with_tax, 11.3)
+        self.assertTrue(expense.receipt_image)
+
+    def test_gap_refused(self):
+        token = self._start()["upload_id"]
+        self._write(token, 0, self.receipt[:100])
+        with self.assertRaises(UserError):
+            self._write(token, 200, self.receipt[200:300])
+        with self.assertRaises(UserError):
+            self.Upload._get_open_upload(token)._complete()
+
+    def test_chunk_beyond_size(self):
+        token = self._start()["upload_id"]
+        with self.assertRaises(UserError):
+            self._write(token, 0, self.receipt + b"x")
+
+    def test_duplicate_by_declared_hash(self):
+        first = self._send()
+        status = self._start(sha256=hashlib.sha256(self.receipt).hexdigest())
+        self.assertTrue(status["duplicate"])
+        self.assertEqual(status["expense_id"], first["expense_id"])
+
+    def test_duplicate_by_content(self):
+        first = self._send()
+        second = self._send()
+        self.assertTrue(second["duplicate"])
+        self.assertEqual(second["expense_id"], first["expense_id"])
+
+
+@tagged("post_install", "-at_install")
+class TestUploadApi(HttpCase):
+    def test_invalid_offset(self):
+        self.authenticate("admin", "admin")
+        response = self.url_open(
+            "/inventory_expense/api/uploads",
+            data=json.dumps({"filename": "receipt.jpg", "size": 10}),
+            headers={"Content-Type": "application/json"},
+        )
+        token = response.json()["upload_id"]
+        path = (
+            self.env["inventory.expense.upload"]
+            .search([("token", "=", token)])
+            ._get_part_path()
+        )
+        self.addCleanup(lambda: os.path.exists(path) and os.unlink(path))
+        response = self.url_open(
+            f"/inventory_expense/api/uploads/{token}?offset=abc",
+            data=b"0123456789",
+            method="PUT",
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,7 @@
+from . import xlsx_export
+from . import openai_client
+from . import receipt_preprocess
+from . import expense_import
+from . import extraction_providers
+from . import receipt_archive
+from . import rate_limit
@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+
+FIELD_ALIASES = {
+    "name": "name",
+    "description": "name",
+    "vendor": "name",
+    "date": "date",
+    "subtotal": "total_without_tax",
+    "total_without_tax": "total_without_tax",
+    "total": "total_with_tax",
+    "total_paid": "total_with_tax",
+    "total_with_tax": "total_with_tax",
+    "notes": "notes",
+    "company": "company",
+    "company_id": "company",
+    "user": "user",
+    "login": "user",
+    "user_id": "user",
+    "needs_review": "needs_review",
+}
+
+
+def normalize_row(row):
+    """Map a raw row onto import keys, dropping unknown columns."""
+    normalized = {}
+    for key, value in row.items():
+        target = FIELD_ALIASES.get(str(key).strip().lower())
+        if target:
+            normalized[target] = value.strip() if isinstance(value, str) else value
+    return normalized
+
+
+def iter_csv(fileobj):
+    """Yield ``(line_number, row)`` from a binary CSV file object."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    for row in reader:
+        yield reader.line_num, normalize_row(row)
+
+
+def iter_jsonl(fileobj):
+    """Yield ``(line_number, row)`` from a binary JSON Lines file object."""
+    for line_number, line in enumerate(fileobj, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, {"__error__": f"Invalid JSON: {e}"}
+            continue
+        if not isinstance(row, dict):
+            yield line_number, {"__error__": "Each line must be a JSON object"}
+            continue
+        yield line_number, normalize_row(row)
+
+
+def iter_json(fileobj):
+    """Yield ``(index, row)`` from a JSON array. The array is parsed at once."""
+    rows = json.load(fileobj)
+    if not isinstance(rows, list):
+        raise ValueError("The JSON file must contain an array of objects")
+    for index, row in enumerate(rows, 1):
+        if not isinstance(row, dict):
+            yield index, {"__error__": "Each entry must be a JSON object"}
+            continue
+        yield index, normalize_row(row)
+
+
+READERS = {
+    "csv": iter_csv,
+    "jsonl": iter_jsonl,
+    "json": iter_json,
+}
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
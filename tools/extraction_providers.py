@@ -0,0 +1,252 @@
+"""Receipt extraction providers.
+
+A provider turns ``(file_data, mime_type)`` receipts (base64 encoded, as
+stored in binary fields) into the extracted fields ``vendor_name``,
+``date``, ``subtotal`` and ``total``. Nothing here touches the ORM, so
+providers can run in worker threads and be exercised without a database.
+"""
+
+import base64
+import hashlib
+import io
+import json
+
+from . import metrics, openai_client, receipt_preprocess
+
+EXTRACTED_KEYS = ("vendor_name", "date", "subtotal", "total")
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_PENDING_STATUSES = {"validating", "in_progress", "finalizing", "cancelling"}
+# "high" tiles every 512 px of the image and is billed per tile; preprocessed
+# receipts are already sized for reading, so the model may pick
+DEFAULT_IMAGE_DETAIL = "auto"
+
+
+def prepare_images(config, file_data, mime_type):
+    """Return the ``(base64 data, mime_type)`` images sent for one receipt."""
+    if isinstance(file_data, str):
+        file_data = file_data.encode()
+    if not (config.get("preprocess") or mime_type == "application/pdf"):
+        return [(file_data, mime_type)]
+    return [
+        (base64.b64encode(data), image_mime_type)
+        for data, image_mime_type in receipt_preprocess.preprocess_receipt(
+            base64.b64decode(file_data),
+            mime_type,
+            max_dimension=config["max_dimension"],
+            image_format=config["image_format"],
+        )
+    ]
+
+
+def build_request(config, images):
+    """Chat completion parameters for one receipt."""
+    detail = config.get("image_detail") or DEFAULT_IMAGE_DETAIL
+    return {
+        "model": config["model"],
+        "messages": [
+            {
+                "role": "system",
+                "content": config["prompt"],
+            },
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:{image_mime_type};base64,{data.decode()}",
+                            "detail": detail,
+                        },
+                    }
+                    for data, image_mime_type in images
+                ],
+            },
+        ],
+        "response_format": {"type": "json_object"},
+        "max_tokens": 500,
+    }
+
+
+def record_usage(usage, provider):
+    """Count the prompt and completion tokens of one response; return the total."""
+    if not usage:
+        return 0
+    if not isinstance(usage, dict):
+        usage = {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0),
+            "completion_tokens": getattr(usage, "completion_tokens", 0),
+        }
+    total = 0
+    for kind in ("prompt", "completion"):
+        tokens = usage.get(f"{kind}_tokens") or 0
+        metrics.inc(
+            "inventory_expense_ai_tokens_total",
+            tokens,
+            provider=provider,
+            kind=kind,
+        )
+        total += tokens
+    return total
+
+
+def parse_content(content):
+    if not content:
+        raise ValueError("Empty response from the model")
+    data = json.loads(content)
+    return {key: data.get(key) for key in EXTRACTED_KEYS}
+
+
+class ExtractionProvider:
+    """Base class: extract one receipt at a time, raising on failure.
+
+    ``limiter`` is an optional shared rate limiter with ``acquire()`` (blocks
+    until a request may be sent, returns the tokens charged) and
+    ``settle(charged, actual)``. Every attempt, retries included, acquires.
+    """
+
+    name = None
+    cacheable = True
+    batch = False
+    needs_client = True
+
+    def __init__(self, config, client=None, limiter=None):
+        self.config = config
+        self.client = client
+        self.limiter = limiter
+
+    def extract(self, file_data, mime_type):
+        raise NotImplementedError
+
+
+class OpenAIChatProvider(ExtractionProvider):
+    """One chat completion request per receipt (the interactive path)."""
+
+    name = "openai_chat"
+
+    def extract(self, file_data, mime_type):
+        images = prepare_images(self.config, file_data, mime_type)
+        timeout = openai_client.make_timeout(
+            self.config["connect_timeout"], self.config["read_timeout"]
+        )
+        request = build_request(self.config, images)
+        # failed attempts keep their estimated charge: the API counts them too
+        charged = []
+
+        def send():
+            if self.limiter:
+                charged.append(self.limiter.acquire())
+            return self.client.with_options(timeout=timeout).chat.completions.create(
+                **request
+            )
+
+        response = openai_client.call_with_retry(
+            send,
+            max_retries=self.config["max_retries"],
+            label="AI receipt extraction",
+        )
+        used = record_usage(getattr(response, "usage", None), self.name)
+        if self.limiter:
+            self.limiter.settle(charged[-1], used)
+        return parse_content(response.choices[0].message.content)
+
+
+class OpenAIBatchProvider(OpenAIChatProvider):
+    """Submit receipts to the asynchronous Batch API and collect the results.
+
+    :meth:`submit` uploads one JSONL request file and returns the batch id;
+    :meth:`collect` returns ``None`` while the batch is still running and
+    ``{custom_id: (extraction, error)}`` once it has finished. Single
+    receipts (interactive use) fall back to the chat endpoint.
+    """
+
+    name = "openai_batch"
+    batch = True
+
+    def submit(self, receipts, metadata=None):
+        """Submit ``(custom_id, file_data, mime_type)`` receipts as one batch."""
+        lines = io.BytesIO()
+        for custom_id, file_data, mime_type in receipts:
+            images = prepare_images(self.config, file_data, mime_type)
+            request = {
+                "custom_id": str(custom_id),
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": build_request(self.config, images),
+            }
+            lines.write(json.dumps(request, separators=(",", ":")).encode())
+            lines.write(b"\n")
+        input_file = openai_client.call_with_retry(
+            lambda: self.client.files.create(
+                file=("receipts.jsonl", lines.getvalue()), purpose="batch"
+            ),
+            max_retries=self.config["max_retries"],
+            label="Batch file upload",
+        )
+        batch = openai_client.call_with_retry(
+            lambda: self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window=BATCH_COMPLETION_WINDOW,
+                metadata=metadata,
+            ),
+            max_retries=self.config["max_retries"],
+            label="Batch creation",
+        )
+        return batch.id
+
+    def _read_file(self, file_id):
+        if not file_id:
+            return []
+        content = self.client.files.content(file_id).text
+        return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    def collect(self, batch_id):
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status in BATCH_PENDING_STATUSES:
+            return None
+        if batch.status != "completed":
+            return {"*": (None, f"Batch {batch_id} ended with status {batch.status}")}
+        results = {}
+        for entry in self._read_file(batch.output_file_id) + self._read_file(
+            batch.error_file_id
+        ):
+            custom_id = entry.get("custom_id")
+            response = entry.get("response") or {}
+            if entry.get("error") or response.get("status_code") != 200:
+                error = entry.get("error") or response.get("body", {}).get("error")
+                results[custom_id] = (None, str(error or "Request failed"))
+                continue
+            try:
+                record_usage(response["body"].get("usage"), self.name)
+                content = response["body"]["choices"][0]["message"]["content"]
+                results[custom_id] = (parse_content(content), None)
+            except (KeyError, IndexError, ValueError) as e:
+                results[custom_id] = (None, f"Invalid response: {e}")
+        return results
+
+
+class StubProvider(ExtractionProvider):
+    """Deterministic offline provider: values derive from the file checksum."""
+
+    name = "stub"
+    cacheable = False
+    needs_client = False
+
+    def extract(self, file_data, mime_type):
+        if isinstance(file_data, str):
+            file_data = file_data.encode()
+        digest = hashlib.sha256(base64.b64decode(file_data)).hexdigest()
+        subtotal = int(digest[:6], 16) % 100000 / 100
+        return {
+            "vendor_name": f"Stub Vendor {digest[:6].upper()}",
+            "date": None,
+            "subtotal": subtotal,
+            "total": round(subtotal * 1.13, 2),
+        }
+
+
+PROVIDERS = {
+    provider.name: provider
+    for provider in (OpenAIChatProvider, OpenAIBatchProvider, StubProvider)
+}
@@ -0,0 +1,373 @@
+"""Metrics: counters and fixed-bucket latency histograms.
+
+Recording a value is a dictionary lookup and a few additions under a lock,
+so instrumentation can stay enabled in production. Every Odoo worker process
+keeps its own registry in memory. Once :func:`configure` has set a shared
+directory, each process also writes its registry there (at most every
+``FLUSH_INTERVAL`` seconds), and :func:`collect` sums every process's
+registry. The files of processes that have exited are folded into one file
+per host, so the totals survive worker recycling.
+"""
+
+import atexit
+import fcntl
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+DESCRIPTIONS = {
+    "inventory_expense_ai_extraction_seconds": "AI receipt extraction latency",
+    "inventory_expense_ai_extractions_total": "AI receipt extractions by outcome",
+    "inventory_expense_ai_tokens_total": "Tokens used by AI receipt extraction",
+    "inventory_expense_ai_rate_limit_wait_seconds": "Time spent queued by the AI rate limiter",
+    "inventory_expense_ai_rate_limit_timeouts_total": "AI requests that gave up waiting for the rate limiter",
+    "inventory_expense_ai_rate_limit_queue_depth": "AI requests waiting to be admitted by the rate limiter",
+    "inventory_expense_report_render_seconds": "Expense report rendering time",
+    "inventory_expense_report_rows_total": "Expense rows rendered in reports",
+    "inventory_expense_wizard_compute_seconds": "Report wizard compute time",
+    "inventory_expense_create_seconds": "Time spent in inventory.expense create",
+    "inventory_expense_created_total": "Expenses created",
+    "inventory_expense_quick_search_seconds": "Expense quick search latency",
+    "inventory_expense_uploads_total": "Receipt uploads through the upload API by outcome",
+    "inventory_expense_upload_bytes_total": "Receipt bytes received through the upload API",
+}
+
+FLUSH_INTERVAL = 5.0
+RETIRED = "retired"
+RESET_MARKER = "reset"
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_started = time.time()
+
+_directory = None
+_flush_lock = threading.Lock()
+_last_flush = 0.0
+_flushed_pid = None
+
+
+def _key(name, labels):
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def inc(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+    _maybe_flush()
+
+
+def observe(name, value, buckets=DEFAULT_BUCKETS, **labels):
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {
+                "buckets": buckets,
+                "counts": [0] * len(buckets),
+                "count": 0,
+                "sum": 0.0,
+            }
+        for index, bound in enumerate(histogram["buckets"]):
+            if value <= bound:
+                histogram["counts"][index] += 1
+                break
+        histogram["count"] += 1
+        histogram["sum"] += value
+    _maybe_flush()
+
+
+@contextmanager
+def timed(name, **labels):
+    """Observe the duration of the ``with`` block in seconds."""
+    started = time.perf_counter()
+    try:
+        yield labels
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+
+def _reset_local():
+    global _started
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _started = time.time()
+
+
+def reset():
+    """Clear the registry, and every process's registry once configured."""
+    if _directory is not None:
+        # processes clear their registry on their next flush after the marker
+        with _directory_lock():
+            for filename in os.listdir(_directory):
+                if filename.endswith(".json"):
+                    os.unlink(os.path.join(_directory, filename))
+            with open(os.path.join(_directory, RESET_MARKER), "w") as marker:
+                marker.write(str(time.time()))
+    _reset_local()
+
+
+def configure(directory):
+    """Share this process's registry through ``directory``."""
+    global _directory
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError as e:
+        _logger.warning("Metrics stay per process, cannot use %s: %s", directory, e)
+        return
+    _directory = directory
+
+
+@contextmanager
+def _directory_lock():
+    with open(os.path.join(_directory, ".lock"), "w") as lockfile:
+        fcntl.flock(lockfile, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lockfile, fcntl.LOCK_UN)
+
+
+def _process_path(pid=None):
+    host = socket.gethostname()
+    return os.path.join(_directory, f"{host}-{pid or os.getpid()}.json")
+
+
+def _dump():
+    with _lock:
+        return {
+            "counters": [
+                [name, labels, value] for (name, labels), value in _counters.items()
+            ],
+            "histograms": [
+                [name, labels, dict(histogram, counts=list(histogram["counts"]))]
+                for (name, labels), histogram in _histograms.items()
+            ],
+        }
+
+
+def _write(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as output:
+        json.dump(data, output)
+    os.replace(tmp, path)
+
+
+def _read(path):
+    try:
+        with open(path) as source:
+            return json.load(source)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge(into, data):
+    """Add a dumped registry ``data`` to ``(counters, histograms)`` dicts."""
+    counters, histograms = into
+    for name, labels, value in data.get("counters", ()):
+        key = (name, tuple(tuple(item) for item in labels))
+        counters[key] = counters.get(key, 0) + value
+    for name, labels, histogram in data.get("histograms", ()):
+        key = (name, tuple(tuple(item) for item in labels))
+        total = histograms.get(key)
+        if total is None:
+            histograms[key] = {
+                "buckets": tuple(histogram["buckets"]),
+                "counts": list(histogram["counts"]),
+                "count": histogram["count"],
+                "sum": histogram["sum"],
+            }
+        elif list(total["buckets"]) == list(histogram["buckets"]):
+            total["counts"] = [a + b for a, b in zip(total["counts"], histogram["counts"])]
+            total["count"] += histogram["count"]
+            total["sum"] += histogram["sum"]
+
+
+def _dumped(merged):
+    counters, histograms = merged
+    return {
+        "counters": [[name, labels, value] for (name, labels), value in counters.items()],
+        "histograms": [
+            [name, labels, histogram] for (name, labels), histogram in histograms.items()
+        ],
+    }
+
+
+def _retire(paths):
+    """Fold the files of exited processes into this host's retired file."""
+    retired_path = _process_path(RETIRED)
+    merged = ({}, {})
+    _merge(merged, _read(retired_path) or {})
+    for path in paths:
+        _merge(merged, _read(path) or {})
+    _write(retired_path, _dumped(merged))
+    for path in paths:
+        os.unlink(path)
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def flush():
+    """Write this process's registry to the shared directory."""
+    global _last_flush, _flushed_pid
+    if _directory is None:
+        return
+    pid = os.getpid()
+    try:
+        marker = os.path.join(_directory, RESET_MARKER)
+        if os.path.exists(marker) and os.path.getmtime(marker) > _started:
+            _reset_local()
+        path = _process_path()
+        if _flushed_pid != pid and os.path.exists(path):
+            # left behind by an exited process whose pid we were given
+            with _directory_lock():
+                _retire([path])
+        _write(path, _dump())
+    except OSError as e:
+        _logger.warning("Could not write the metrics of process %s: %s", pid, e)
+    _last_flush = time.monotonic()
+    _flushed_pid = pid
+
+
+def _maybe_flush():
+    if _directory is None or time.monotonic() - _last_flush < FLUSH_INTERVAL:
+        return
+    if _flush_lock.acquire(blocking=False):
+        try:
+            flush()
+        finally:
+            _flush_lock.release()
+
+
+atexit.register(flush)
+# a forked worker starts empty instead of counting its parent's values again
+os.register_at_fork(after_in_child=_reset_local)
+
+
+def collect():
+    """Return the ``(counters, histograms)`` registries summed over processes.
+
+    Without a shared directory this is the registry of this process alone.
+    Other processes' most recent values may be up to ``FLUSH_INTERVAL``
+    seconds old.
+    """
+    if _directory is None:
+        merged = ({}, {})
+        _merge(merged, _dump())
+        return merged
+    with _flush_lock:
+        flush()
+    host = socket.gethostname()
+    merged = ({}, {})
+    with _directory_lock():
+        dead = []
+        for filename in os.listdir(_directory):
+            stem, _sep, extension = filename.rpartition(".")
+            if extension != "json":
+                continue
+            owner, _sep, pid = stem.rpartition("-")
+            if owner == host and pid.isdigit() and not _is_alive(int(pid)):
+                dead.append(os.path.join(_directory, filename))
+        if dead:
+            _retire(dead)
+        for filename in os.listdir(_directory):
+            if filename.endswith(".json"):
+                _merge(merged, _read(os.path.join(_directory, filename)) or {})
+    return merged
+
+
+def _quantile(histogram, quantile):
+    """Upper bucket bound containing ``quantile`` (``None`` beyond the last)."""
+    target = quantile * histogram["count"]
+    seen = 0
+    for bound, count in zip(histogram["buckets"], histogram["counts"]):
+        seen += count
+        if seen >= target:
+            return bound
+    return None
+
+
+def snapshot():
+    """Return ``(counters, histograms)`` of all processes as lists of plain dicts."""
+    counters, histograms = collect()
+    return (
+        [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(counters.items())
+        ],
+        [
+            {
+                "name": name,
+                "labels": dict(labels),
+                "count": histogram["count"],
+                "sum": histogram["sum"],
+                "p50": _quantile(histogram, 0.5),
+                "p95": _quantile(histogram, 0.95),
+            }
+            for (name, labels), histogram in sorted(histograms.items())
+        ],
+    )
+
+
+def _format_labels(labels, **extra):
+    items = list(labels) + sorted(extra.items())
+    if not items:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in items
+    )
+    return "{" + body + "}"
+
+
+def render_prometheus(gauges=None):
+    """Render the registries of all processes in the Prometheus text format.
+
+    ``gauges`` maps names to values read from the database by the caller.
+    """
+    counters, histograms = collect()
+    lines = []
+    for name, value in sorted((gauges or {}).items()):
+        lines.append(f"# HELP {name} {DESCRIPTIONS.get(name, name)}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+    seen = set()
+    for (name, labels), value in sorted(counters.items()):
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# HELP {name} {DESCRIPTIONS.get(name, name)}")
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    for (name, labels), histogram in sorted(histograms.items()):
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# HELP {name} {DESCRIPTIONS.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, count in zip(histogram["buckets"], histogram["counts"]):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(labels, le=bound)} {cumulative}")
+        lines.append(
+            f"{name}_bucket{_format_labels(labels, le='+Inf')} {histogram['count']}"
+        )
+        lines.append(f"{name}_sum{_format_labels(labels)} {histogram['sum']}")
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,89 @@
+import logging
+import random
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key, base_url):
+    """Return the process-wide OpenAI client for ``(base_url, api_key)``.
+
+    The client owns an HTTP connection pool, so reusing it keeps connections
+    (and their TLS sessions) alive across extractions and threads. Retries
+    are disabled on the client because :func:`call_with_retry` handles them.
+    """
+    key = (base_url, api_key)
+    client = _clients.get(key)
+    if client is None:
+        from openai import OpenAI
+
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+                _clients[key] = client
+    return client
+
+
+def make_timeout(connect_timeout, read_timeout):
+    from openai import Timeout
+
+    return Timeout(read_timeout, connect=connect_timeout)
+
+
+def is_retryable(error):
+    try:
+        import openai
+    except ImportError:
+        return False
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES
+
+
+def call_with_retry(func, max_retries=3, base_delay=1.0, max_delay=20.0, label="request"):
+    """Call ``func()`` and retry transient API errors with jittered backoff.
+
+    Only errors accepted by :func:`is_retryable` are retried; anything else,
+    or the last failure, propagates. Latency and retry counts are logged.
+    """
+    started = time.monotonic()
+    for attempt in range(max_retries + 1):
+        attempt_started = time.monotonic()
+        try:
+            result = func()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                _logger.warning(
+                    "%s failed after %.2fs and %d retries: %s",
+                    label,
+                    time.monotonic() - started,
+                    attempt,
+                    e,
+                )
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2**attempt))
+            _logger.info(
+                "%s attempt %d failed after %.2fs (%s), retrying in %.2fs",
+                label,
+                attempt + 1,
+                time.monotonic() - attempt_started,
+                e,
+                delay,
+            )
+            time.sleep(delay)
+        else:
+            _logger.info(
+                "%s succeeded in %.2fs (last attempt %.2fs, %d retries)",
+                label,
+                time.monotonic() - started,
+                time.monotonic() - attempt_started,
+                attempt,
+            )
+            return result
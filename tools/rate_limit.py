@@ -0,0 +1,33 @@
+"""Token bucket arithmetic for the shared OpenAI rate limiter.
+
+Each bucket holds up to one minute of its limit (requests or tokens) and
+refills continuously. A caller needs every bucket to cover its cost; the
+time to wait is set by the bucket with the largest shortfall. Levels may
+be negative when callers reserve their cost before it is covered. Storage
+and coordination between workers are left to the caller.
+"""
+
+SECONDS_PER_MINUTE = 60.0
+
+
+class RateLimitTimeout(Exception):
+    """The request could not be admitted within the maximum wait."""
+
+
+def refill(level, elapsed, per_minute):
+    """Level of a bucket ``elapsed`` seconds after it was at ``level``."""
+    return min(per_minute, level + per_minute * max(elapsed, 0.0) / SECONDS_PER_MINUTE)
+
+
+def wait_time(levels, costs, limits):
+    """Seconds until every bucket in ``levels`` can pay its cost (0 if now).
+
+    A cost larger than a whole bucket is capped at the bucket size, so an
+    oversized request waits for a full bucket instead of forever.
+    """
+    wait = 0.0
+    for name, level in levels.items():
+        cost = min(costs[name], limits[name])
+        if cost > level:
+            wait = max(wait, (cost - level) * SECONDS_PER_MINUTE / limits[name])
+    return wait
@@ -0,0 +1,65 @@
+"""Packing of archived receipts into compact zip blobs.
+
+Receipt images are re-encoded as grayscale JPEG when that makes them
+smaller; PDFs and other files are stored deflated. Members are read back
+with random access, so opening one receipt does not load the whole pack.
+"""
+
+import logging
+import zipfile
+
+from . import receipt_preprocess
+
+_logger = logging.getLogger(__name__)
+
+ARCHIVE_MAX_DIMENSION = 1600
+ARCHIVE_QUALITY = 70
+PACK_MIMETYPE = "application/zip"
+EXTENSIONS = {
+    mime_type: extension
+    for extension, mime_type in reversed(receipt_preprocess.MIME_MAP.items())
+}
+
+
+def compact_receipt(raw, mime_type):
+    """Return ``(data, mime_type)`` for the archived copy of a receipt."""
+    if receipt_preprocess.Image is None or not (mime_type or "").startswith("image/"):
+        return raw, mime_type
+    try:
+        data, compact_mime_type = receipt_preprocess.preprocess_image(
+            raw,
+            max_dimension=ARCHIVE_MAX_DIMENSION,
+            image_format="JPEG",
+            quality=ARCHIVE_QUALITY,
+        )
+    except Exception as e:
+        _logger.warning("Could not recompress receipt, keeping the original: %s", e)
+        return raw, mime_type
+    if len(data) >= len(raw):
+        return raw, mime_type
+    return data, compact_mime_type
+
+
+def member_name(key, mime_type):
+    return f"{key}.{EXTENSIONS.get(mime_type, 'bin')}"
+
+
+def write_pack(fileobj, members):
+    """Write ``(name, data, mime_type)`` members to a zip; return their sizes."""
+    sizes = {}
+    with zipfile.ZipFile(fileobj, "w") as pack:
+        for name, data, mime_type in members:
+            compression = (
+                zipfile.ZIP_STORED
+                if mime_type in ("image/jpeg", "image/webp", "image/png")
+                else zipfile.ZIP_DEFLATED
+            )
+            pack.writestr(name, data, compress_type=compression)
+            sizes[name] = len(data)
+    return sizes
+
+
+def read_member(source, name):
+    """Read one member from a pack given as a path or a file object."""
+    with zipfile.ZipFile(source) as pack:
+        return pack.read(name)
@@ -0,0 +1,224 @@
+import io
+import logging
+import math
+import threading
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+try:
+    import pymupdf as fitz
+except ImportError:
+    try:
+        import fitz
+    except ImportError:
+        fitz = None
+
+_logger = logging.getLogger(__name__)
+
+# PyMuPDF is not thread-safe, and receipts are extracted from worker threads
+_fitz_lock = threading.Lock()
+
+DEFAULT_MAX_DIMENSION = 1600
+DEFAULT_FORMAT = "JPEG"
+DEFAULT_QUALITY = 80
+PDF_DPI = 150
+MAX_PDF_PAGES = 5
+CROP_THRESHOLD = 160
+CROP_MARGIN = 24
+CROP_MASK_SIZE = 256
+CROP_MIN_AREA = 0.2
+
+THUMBNAIL_SIZE = 512
+PHASH_SIZE = 32
+PHASH_FREQUENCIES = 8
+
+MIME_MAP = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "pdf": "application/pdf",
+}
+
+FORMAT_MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+}
+
+# DCT-II basis of the hashed frequencies: _PHASH_COSINES[u][x]
+_PHASH_COSINES = [
+    [math.cos(math.pi * (2 * x + 1) * u / (2 * PHASH_SIZE)) for x in range(PHASH_SIZE)]
+    for u in range(PHASH_FREQUENCIES)
+]
+
+
+def get_mime_type(filename):
+    if filename:
+        return MIME_MAP.get(filename.lower().split(".")[-1], "image/jpeg")
+    return "image/jpeg"
+
+
+def _crop_to_receipt(image):
+    """Crop a grayscale image to the bright paper area, if one stands out.
+
+    The mask is computed on a box-filtered thumbnail so isolated bright
+    pixels in the background do not widen the bounding box.
+    """
+    width, height = image.size
+    scale = max(width, height) / CROP_MASK_SIZE
+    if scale <= 1:
+        return image
+    small = image.resize((int(width / scale), int(height / scale)), Image.BOX)
+    bbox = small.point(lambda value: 255 if value > CROP_THRESHOLD else 0).getbbox()
+    if not bbox:
+        return image
+    left, top, right, bottom = (round(edge * scale) for edge in bbox)
+    if (right - left) * (bottom - top) < CROP_MIN_AREA * width * height:
+        return image
+    return image.crop(
+        (
+            max(0, left - CROP_MARGIN),
+            max(0, top - CROP_MARGIN),
+            min(width, right + CROP_MARGIN),
+            min(height, bottom + CROP_MARGIN),
+        )
+    )
+
+
+def preprocess_image(
+    raw,
+    max_dimension=DEFAULT_MAX_DIMENSION,
+    image_format=DEFAULT_FORMAT,
+    quality=DEFAULT_QUALITY,
+):
+    """Normalize a receipt photo for extraction.
+
+    The image is rotated according to its EXIF orientation, converted to
+    grayscale, cropped to the receipt, downscaled to ``max_dimension`` and
+    re-encoded. Returns ``(bytes, mime_type)``.
+    """
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(raw)))
+    image = _crop_to_receipt(image.convert("L"))
+    if max_dimension:
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    output = io.BytesIO()
+    image.save(output, format=image_format, quality=quality, optimize=True)
+    return output.getvalue(), FORMAT_MIME_TYPES[image_format]
+
+
+def _render_pdf_page(raw, index, dpi):
+    with _fitz_lock, fitz.open(stream=raw, filetype="pdf") as document:
+        return document[index].get_pixmap(dpi=dpi).tobytes("png")
+
+
+def rasterize_pdf(raw, dpi=PDF_DPI, max_pages=MAX_PDF_PAGES):
+    """Render the first ``max_pages`` pages of a PDF to PNG bytes.
+
+    Pages are rendered in the calling thread from one open document.
+    PyMuPDF calls are serialized across threads; the image preprocessing
+    and API calls that follow still run concurrently.
+    """
+    if fitz is None:
+        raise ValueError("PyMuPDF is required to extract PDF receipts")
+    with _fitz_lock, fitz.open(stream=raw, filetype="pdf") as document:
+        return [
+            document[index].get_pixmap(dpi=dpi).tobytes("png")
+            for index in range(min(document.page_count, max_pages))
+        ]
+
+
+def preprocess_receipt(
+    raw,
+    mime_type,
+    max_dimension=DEFAULT_MAX_DIMENSION,
+    image_format=DEFAULT_FORMAT,
+):
+    """Turn an uploaded receipt into a list of ``(bytes, mime_type)`` images.
+
+    PDFs are rasterized page by page. Files Pillow cannot read are returned
+    untouched so the extraction can still be attempted.
+    """
+    if mime_type == "application/pdf":
+        pages = rasterize_pdf(raw)
+    else:
+        pages = [raw]
+    if Image is None:
+        return [(page, mime_type) for page in pages]
+
+    images = []
+    for page in pages:
+        try:
+            images.append(preprocess_image(page, max_dimension, image_format))
+        except Exception as e:
+            _logger.warning("Receipt preprocessing failed, sending original: %s", e)
+            images.append((page, "image/png" if page is not raw else mime_type))
+    return images
+
+
+def make_thumbnail(raw, mime_type, size=THUMBNAIL_SIZE):
+    """Return a JPEG thumbnail of a receipt (first page for PDFs), or ``None``."""
+    if Image is None:
+        return None
+    try:
+        if mime_type == "application/pdf":
+            if fitz is None:
+                return None
+            raw = _render_pdf_page(raw, 0, 72)
+        image = ImageOps.exif_transpose(Image.open(io.BytesIO(raw)))
+        image.thumbnail((size, size), Image.LANCZOS)
+        output = io.BytesIO()
+        image.convert("RGB").save(output, format="JPEG", quality=75, optimize=True)
+        return output.getvalue()
+    except Exception as e:
+        _logger.warning("Could not build receipt thumbnail: %s", e)
+        return None
+
+
+def perceptual_hash(raw):
+    """Return a 64-bit DCT hash of a receipt image as a hex string, or ``None``.
+
+    The paper is cropped out of the background, reduced to a
+    ``PHASH_SIZE`` grid and transformed with a 2D DCT; every bit records
+    whether one of the 8x8 lowest frequencies is above their median. The
+    low frequencies carry the layout of the receipt, so re-photos of the
+    same receipt differ in only a few bits; compare hashes with
+    :func:`hash_distance`.
+    """
+    if Image is None:
+        return None
+    try:
+        image = _crop_to_receipt(Image.open(io.BytesIO(raw)).convert("L"))
+        image = ImageOps.autocontrast(image).resize(
+            (PHASH_SIZE, PHASH_SIZE), Image.BOX
+        )
+        pixels = image.tobytes()
+    except Exception as e:
+        _logger.warning("Could not hash receipt image: %s", e)
+        return None
+    rows = [
+        [
+            sum(cosines[x] * pixels[y * PHASH_SIZE + x] for x in range(PHASH_SIZE))
+            for cosines in _PHASH_COSINES
+        ]
+        for y in range(PHASH_SIZE)
+    ]
+    coefficients = [
+        sum(cosines[y] * rows[y][u] for y in range(PHASH_SIZE))
+        for cosines in _PHASH_COSINES
+        for u in range(PHASH_FREQUENCIES)
+    ]
+    # the DC term only tracks overall brightness
+    median = sorted(coefficients[1:])[len(coefficients) // 2 - 1]
+    bits = 0
+    for coefficient in coefficients:
+        bits = bits << 1 | (coefficient > median)
+    return f"{bits:016x}"
+
+
+def hash_distance(first, second):
+    """Number of differing bits between two :func:`perceptual_hash` values."""
+    return bin(int(first, 16) ^ int(second, 16)).count("1")
@@ -0,0 +1,112 @@
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+except ImportError:
+    Workbook = None
+
+AMOUNT_FORMAT = "#,##0.00"
+PERCENT_FORMAT = "0.0%"
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+DETAIL_COLUMNS = [
+    ("Date", 12),
+    ("Expense Name", 40),
+    ("Subtotal", 15),
+    ("Total Paid", 15),
+    ("Tax Paid", 15),
+    ("Created By", 20),
+]
+
+
+class ExpenseXlsxWriter:
+    """Write an expense report to a write-only (streaming) openpyxl workbook.
+
+    Rows are serialized as soon as they are appended and every cell shares one
+    of a handful of named styles, so memory stays flat regardless of the number
+    of rows written. The workbook is written to ``fileobj`` on :meth:`save`.
+    """
+
+    def __init__(self, title="Expense Report"):
+        if Workbook is None:
+            raise ImportError("openpyxl is not installed")
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(title)
+        self._register_styles()
+        for col, (_label, width) in enumerate(DETAIL_COLUMNS, 1):
+            self.sheet.column_dimensions[get_column_letter(col)].width = width
+
+    def _register_styles(self):
+        border = Border(
+            left=Side(style="thin"),
+            right=Side(style="thin"),
+            top=Side(style="thin"),
+            bottom=Side(style="thin"),
+        )
+        styles = [
+            NamedStyle(name="expense_title", font=Font(bold=True, size=14)),
+            NamedStyle(name="expense_section", font=Font(bold=True, size=12)),
+            NamedStyle(name="expense_total", number_format=AMOUNT_FORMAT),
+            NamedStyle(
+                name="expense_header",
+                font=Font(bold=True, color="FFFFFF"),
+                fill=PatternFill(
+                    start_color="4472C4", end_color="4472C4", fill_type="solid"
+                ),
+                border=border,
+                alignment=Alignment(horizontal="center"),
+            ),
+            NamedStyle(name="expense_cell", border=border),
+            NamedStyle(
+                name="expense_amount", border=border, number_format=AMOUNT_FORMAT
+            ),
+            NamedStyle(
+                name="expense_percent", border=border, number_format=PERCENT_FORMAT
+            ),
+        ]
+        for style in styles:
+            self.workbook.add_named_style(style)
+
+    def _cell(self, value, style=None):
+        cell = WriteOnlyCell(self.sheet, value=value)
+        if style:
+            cell.style = style
+        return cell
+
+    def write_title(self, title, lines=()):
+        self.sheet.append([self._cell(title, "expense_title")])
+        for line in lines:
+            self.sheet.append([line])
+        self.sheet.append([])
+
+    def write_summary(self, items, title="Summary"):
+        """Write ``(label, value, is_amount)`` tuples under a section title."""
+        self.sheet.append([self._cell(title, "expense_section")])
+        for label, value, is_amount in items:
+            self.sheet.append(
+                [label, self._cell(value, "expense_total" if is_amount else None)]
+            )
+        self.sheet.append([])
+
+    def write_table_header(self, labels=None):
+        labels = labels or [label for label, _width in DETAIL_COLUMNS]
+        self.sheet.append([self._cell(label, "expense_header") for label in labels])
+
+    def write_rows(self, rows, amount_columns=(2, 3, 4), percent_columns=()):
+        """Append an iterable of row tuples; column indexes are 0-based."""
+        styles = {index: "expense_amount" for index in amount_columns}
+        styles.update((index, "expense_percent") for index in percent_columns)
+        count = 0
+        for row in rows:
+            self.sheet.append(
+                [
+                    self._cell(value, styles.get(index, "expense_cell"))
+                    for index, value in enumerate(row)
+                ]
+            )
+            count += 1
+        return count
+
+    def save(self, fileobj):
+        self.workbook.save(fileobj)
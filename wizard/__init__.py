@@ -1,2 +1,5 @@
 from . import expense_report_wizard
 from . import quick_add_wizard
+from . import quick_add_batch_wizard
+from . import expense_import_wizard
+from . import metrics_dashboard
@@ -0,0 +1,183 @@
+import base64
+import csv
+import io
+import tempfile
+import time
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+from ..tools import expense_import
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_BACKGROUND_IMPORT_KB = 1024
+
+
+class ExpenseImportWizard(models.TransientModel):
+    _name = "expense.import.wizard"
+    _description = "Bulk Expense Import Wizard"
+
+    import_file = fields.Binary(
+        string="File",
+        required=True,
+        attachment=False,
+        help="CSV with a header row, JSON Lines, or a JSON array of objects",
+    )
+    import_filename = fields.Char(
+        string="Filename",
+    )
+    file_format = fields.Selection(
+        selection=[
+            ("csv", "CSV"),
+            ("jsonl", "JSON Lines"),
+            ("json", "JSON Array"),
+        ],
+        string="Format",
+        compute="_compute_file_format",
+        store=True,
+        readonly=False,
+        required=True,
+    )
+    chunk_size = fields.Integer(
+        string="Batch Size",
+        default=DEFAULT_CHUNK_SIZE,
+        help="Number of rows created per batch. Small files are imported in "
+        "one transaction; large files are imported in the background, one "
+        "committed batch at a time, and resume after the last batch if "
+        "interrupted",
+    )
+    state = fields.Selection(
+        selection=[
+            ("draft", "Upload"),
+            ("queued", "Queued"),
+            ("done", "Done"),
+        ],
+        default="draft",
+    )
+    job_id = fields.Many2one(
+        comodel_name="inventory.expense.import.job",
+        string="Import Job",
+        readonly=True,
+    )
+    created_count = fields.Integer(
+        string="Imported",
+        readonly=True,
+    )
+    rejected_count = fields.Integer(
+        string="Rejected",
+        readonly=True,
+    )
+    duration = fields.Float(
+        string="Duration (s)",
+        digits=(16, 2),
+        readonly=True,
+    )
+    rejected_file = fields.Binary(
+        string="Rejected Rows",
+        readonly=True,
+        attachment=False,
+    )
+    rejected_filename = fields.Char(
+        string="Rejected Rows Filename",
+        readonly=True,
+    )
+
+    @api.depends("import_filename")
+    def _compute_file_format(self):
+        for wizard in self:
+            ext = (wizard.import_filename or "").lower().rsplit(".", 1)[-1]
+            wizard.file_format = {"jsonl": "jsonl", "ndjson": "jsonl", "json": "json"}.get(
+                ext, "csv"
+            )
+
+    def _rejected_csv(self, rejected):
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(["line", "reason"])
+        writer.writerows(rejected)
+        return base64.b64encode(output.getvalue().encode())
+
+    def _should_run_in_background(self):
+        self.ensure_one()
+        threshold_kb = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param(
+                "inventory_expense.background_import_kb",
+                default=DEFAULT_BACKGROUND_IMPORT_KB,
+            )
+        )
+        # base64 encodes 3 bytes in 4 characters
+        size = len(self.import_file) * 3 // 4
+        return bool(threshold_kb) and size > threshold_kb * 1024
+
+    def _enqueue_import_job(self):
+        self.ensure_one()
+        job = self.env["inventory.expense.import.job"].enqueue(
+            self.import_filename or f"expenses.{self.file_format}",
+            self.file_format,
+            self.chunk_size,
+            base64.b64decode(self.import_file),
+        )
+        self.write({"state": "queued", "import_file": False, "job_id": job.id})
+        return {
+            "type": "ir.actions.act_window",
+            "name": _("Import Expenses"),
+            "res_model": self._name,
+            "res_id": self.id,
+            "view_mode": "form",
+            "target": "new",
+        }
+
+    def action_import(self):
+        self.ensure_one()
+        if not self.import_file:
+            raise UserError(_("Please upload a file to import."))
+        if self.chunk_size < 1:
+            raise UserError(_("The batch size must be at least 1."))
+        if self._should_run_in_background():
+            return self._enqueue_import_job()
+
+        started = time.monotonic()
+        reader = expense_import.READERS[self.file_format]
+        with tempfile.TemporaryFile() as tmp:
+            base64.decode(io.BytesIO(self.import_file), tmp)
+            tmp.seek(0)
+            try:
+                result = self.env["inventory.expense"]._import_expenses(
+                    reader(tmp),
+                    chunk_size=self.chunk_size,
+                )
+            except (ValueError, UnicodeDecodeError, csv.Error) as e:
+                raise UserError(_("The file could not be read: %s", e))
+
+        rejected = result["rejected"]
+        self.write(
+            {
+                "state": "done",
+                "import_file": False,
+                "created_count": result["created"],
+                "rejected_count": len(rejected),
+                "duration": time.monotonic() - started,
+                "rejected_file": self._rejected_csv(rejected) if rejected else False,
+                "rejected_filename": "rejected_rows.csv" if rejected else False,
+            }
+        )
+        return {
+            "type": "ir.actions.act_window",
+            "name": _("Import Expenses"),
+            "res_model": self._name,
+            "res_id": self.id,
+            "view_mode": "form",
+            "target": "new",
+        }
+
+    def action_view_job(self):
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_window",
+            "res_model": self.job_id._name,
+            "res_id": self.job_id.id,
+            "view_mode": "form",
+            "target": "current",
+        }
@@ -1,17 +1,30 @@
-import io
-import base64
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
+from odoo.osv import expression
 
-try:
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-    from openpyxl.utils import get_column_letter
-except ImportError:
-    Workbook = None
+from ..tools import metrics, xlsx_export
+
+EXPORT_BATCH_SIZE = 2000
+REPORT_MIMETYPES = {
+    "pdf": "application/pdf",
+    "xlsx": xlsx_export.XLSX_MIMETYPE,
+}
+DEFAULT_BACKGROUND_THRESHOLD = 5000
+COMPARISON_STEPS = {
+    "month": relativedelta(months=1),
+    "quarter": relativedelta(months=3),
+    "year": relativedelta(years=1),
+}
+
+
+def _with_progress(rows, callback, every=EXPORT_BATCH_SIZE):
+    for count, row in enumerate(rows, 1):
+        yield row
+        if count % every == 0:
+            callback(count)
 
 
 class ExpenseReportWizard(models.TransientModel):
@@ -32,13 +45,40 @@ class ExpenseReportWizard(models.TransientModel):
         selection=[
             ("summary", "Summary Only"),
             ("detailed", "Detailed Report"),
+            ("comparison", "Period Comparison"),
+            ("consolidated", "Consolidated (All Companies)"),
         ],
         string="Report Type",
         default="detailed",
         required=True,
     )
+    summary_groupby = fields.Selection(
+        selection=[
+            ("none", "No Breakdown"),
+            ("month", "Month"),
+            ("week", "Week"),
+            ("user", "User"),
+        ],
+        string="Break Down By",
+        default="month",
+        help="Breakdown shown in summary reports",
+    )
+    comparison_granularity = fields.Selection(
+        selection=[
+            ("month", "Month"),
+            ("quarter", "Quarter"),
+            ("year", "Year"),
+        ],
+        string="Compare By",
+        default="month",
+    )
+    comparison_periods = fields.Integer(
+        string="Number of Periods",
+        default=6,
+        help="Periods compared, ending with the one containing the end date",
+    )
     expense_ids = fields.Many2many(
-        comodel_name="inventory.expense",
+        comodel_name="inventory.expense.all",
         string="Expenses",
         compute="_compute_expenses",
         store=False,
@@ -72,30 +112,269 @@ class ExpenseReportWizard(models.TransientModel):
         string="Company",
         default=lambda self: self.env.company,
     )
+    company_ids = fields.Many2many(
+        comodel_name="res.company",
+        string="Companies",
+        default=lambda self: self.env.companies,
+        help="Companies included in a consolidated report",
+    )
+
+    def _get_report_companies(self):
+        self.ensure_one()
+        if self.report_type == "consolidated":
+            return self.company_ids & self.env.user.company_ids
+        return self.company_id
 
-    @api.depends("date_from", "date_to")
+    def _get_expense_domain(self):
+        self.ensure_one()
+        date_from, date_to = self._get_report_range()
+        return [
+            ("date", ">=", date_from),
+            ("date", "<=", date_to),
+            ("company_id", "in", self._get_report_companies().ids),
+        ]
+
+    @api.depends(
+        "date_from",
+        "date_to",
+        "company_id",
+        "company_ids",
+        "report_type",
+        "comparison_granularity",
+        "comparison_periods",
+    )
+    @metrics.timed("inventory_expense_wizard_compute_seconds", compute="expenses")
     def _compute_expenses(self):
         for wizard in self:
             if wizard.date_from and wizard.date_to:
-                wizard.expense_ids = self.env["inventory.expense"].search(
-                    [
-                        ("date", ">=", wizard.date_from),
-                        ("date", "<=", wizard.date_to),
-                        ("company_id", "=", wizard.company_id.id),
-                    ],
+                wizard.expense_ids = self.env["inventory.expense.all"].search(
+                    wizard._get_expense_domain(),
                     order="date desc",
                 )
             else:
                 wizard.expense_ids = False
 
-    @api.depends("expense_ids")
+    @api.depends(
+        "date_from",
+        "date_to",
+        "company_id",
+        "company_ids",
+        "report_type",
+        "comparison_granularity",
+        "comparison_periods",
+        "currency_id",
+    )
+    @metrics.timed("inventory_expense_wizard_compute_seconds", compute="totals")
     def _compute_totals(self):
         for wizard in self:
-            expenses = wizard.expense_ids
-            wizard.total_with_tax = sum(expenses.mapped("total_with_tax"))
-            wizard.total_tax = sum(expenses.mapped("tax_amount"))
-            wizard.total_without_tax = sum(expenses.mapped("total_without_tax"))
-            wizard.expense_count = len(expenses)
+            if not (wizard.date_from and wizard.date_to):
+                wizard.total_with_tax = 0.0
+                wizard.total_tax = 0.0
+                wizard.total_without_tax = 0.0
+                wizard.expense_count = 0
+                continue
+            if wizard.report_type == "consolidated":
+                lines = wizard._get_consolidated_lines()
+                wizard.total_with_tax = sum(line["total_with_tax"] for line in lines)
+                wizard.total_tax = sum(line["tax_amount"] for line in lines)
+                wizard.total_without_tax = sum(
+                    line["total_without_tax"] for line in lines
+                )
+                wizard.expense_count = sum(line["count"] for line in lines)
+                continue
+            [(count, total_with_tax, total_tax, total_without_tax)] = self.env[
+                "inventory.expense.daily.summary"
+            ]._read_group(
+                wizard._get_expense_domain(),
+                aggregates=[
+                    "expense_count:sum",
+                    "total_with_tax:sum",
+                    "tax_amount:sum",
+                    "total_without_tax:sum",
+                ],
+            )
+            wizard.total_with_tax = total_with_tax or 0.0
+            wizard.total_tax = total_tax or 0.0
+            wizard.total_without_tax = total_without_tax or 0.0
+            wizard.expense_count = count or 0
+
+    def _get_summary_lines(self):
+        """Return the summary breakdown from aggregates only.
+
+        Month and week breakdowns read the daily summary table; the user
+        breakdown needs ``user_id`` and is grouped on ``inventory.expense.all``
+        so archived expenses are included.
+        """
+        self.ensure_one()
+        if self.summary_groupby in (False, "none"):
+            return []
+        domain = self._get_expense_domain()
+        if self.summary_groupby == "user":
+            groups = self.env["inventory.expense.all"]._read_group(
+                domain,
+                groupby=["user_id"],
+                aggregates=[
+                    "__count",
+                    "total_without_tax:sum",
+                    "tax_amount:sum",
+                    "total_with_tax:sum",
+                ],
+                order="total_with_tax:sum desc",
+            )
+            labels = [user.name or _("Unknown") for user, *_values in groups]
+        else:
+            groups = self.env["inventory.expense.daily.summary"]._read_group(
+                domain,
+                groupby=[f"date:{self.summary_groupby}"],
+                aggregates=[
+                    "expense_count:sum",
+                    "total_without_tax:sum",
+                    "tax_amount:sum",
+                    "total_with_tax:sum",
+                ],
+                order=f"date:{self.summary_groupby} asc",
+            )
+            if self.summary_groupby == "month":
+                labels = [period.strftime("%B %Y") for period, *_values in groups]
+            else:
+                labels = [
+                    _("Week of %s", fields.Date.to_string(period))
+                    for period, *_values in groups
+                ]
+        return [
+            {
+                "label": label,
+                "count": count or 0,
+                "total_without_tax": subtotal or 0.0,
+                "tax_amount": tax or 0.0,
+                "total_with_tax": total or 0.0,
+            }
+            for label, (_key, count, subtotal, tax, total) in zip(labels, groups)
+        ]
+
+    def _get_consolidated_lines(self):
+        """Return one line per company with amounts in the report currency.
+
+        Totals come from one query grouped by company and month; each
+        (currency, month) pair needs a single rate lookup, taken at the end
+        of the month (or the end of the report period).
+        """
+        self.ensure_one()
+        target = self.currency_id or self.env.company.currency_id
+        groups = self.env["inventory.expense.daily.summary"]._read_group(
+            self._get_expense_domain(),
+            groupby=["company_id", "date:month"],
+            aggregates=[
+                "expense_count:sum",
+                "total_without_tax:sum",
+                "tax_amount:sum",
+                "total_with_tax:sum",
+            ],
+        )
+        Currency = self.env["res.currency"]
+        date_to = self._get_report_range()[1]
+        rates = {}
+        lines = {}
+        for company, month, count, subtotal, tax, total in groups:
+            currency = company.currency_id
+            rate_date = min(month + relativedelta(months=1, days=-1), date_to)
+            key = (currency.id, rate_date)
+            if key not in rates:
+                rates[key] = (
+                    1.0
+                    if currency == target
+                    else Currency._get_conversion_rate(
+                        currency, target, company, rate_date
+                    )
+                )
+            rate = rates[key]
+            line = lines.setdefault(
+                company.id,
+                {
+                    "label": company.name,
+                    "currency": currency.name,
+                    "count": 0,
+                    "local_total": 0.0,
+                    "total_without_tax": 0.0,
+                    "tax_amount": 0.0,
+                    "total_with_tax": 0.0,
+                },
+            )
+            line["count"] += count or 0
+            line["local_total"] += total or 0.0
+            line["total_without_tax"] += (subtotal or 0.0) * rate
+            line["tax_amount"] += (tax or 0.0) * rate
+            line["total_with_tax"] += (total or 0.0) * rate
+        for line in lines.values():
+            for key in ("total_without_tax", "tax_amount", "total_with_tax"):
+                line[key] = target.round(line[key])
+        return sorted(lines.values(), key=lambda line: line["label"])
+
+    def _get_comparison_periods(self):
+        """Return the start dates of the compared periods, oldest first."""
+        self.ensure_one()
+        step = COMPARISON_STEPS[self.comparison_granularity or "month"]
+        last = self.date_to.replace(day=1)
+        if self.comparison_granularity == "quarter":
+            last = last.replace(month=(last.month - 1) // 3 * 3 + 1)
+        elif self.comparison_granularity == "year":
+            last = last.replace(month=1)
+        count = max(self.comparison_periods, 1)
+        return [last - step * index for index in reversed(range(count))]
+
+    def _get_comparison_lines(self):
+        """Return per-period totals and deltas from one grouped query."""
+        self.ensure_one()
+        granularity = self.comparison_granularity or "month"
+        periods = self._get_comparison_periods()
+        groups = self.env["inventory.expense.daily.summary"]._read_group(
+            self._get_expense_domain(),
+            groupby=[f"date:{granularity}"],
+            aggregates=[
+                "expense_count:sum",
+                "total_without_tax:sum",
+                "tax_amount:sum",
+                "total_with_tax:sum",
+            ],
+        )
+        totals = {period: values for period, *values in groups}
+        lines = []
+        previous = None
+        for period in periods:
+            count, subtotal, tax, total = totals.get(period, (0, 0.0, 0.0, 0.0))
+            line = {
+                "label": self._format_period(period, granularity),
+                "count": count or 0,
+                "total_without_tax": subtotal or 0.0,
+                "tax_amount": tax or 0.0,
+                "total_with_tax": total or 0.0,
+                "total_change": None,
+                "total_change_pct": None,
+                "tax_change": None,
+            }
+            if previous:
+                line["total_change"] = line["total_with_tax"] - previous["total_with_tax"]
+                line["tax_change"] = line["tax_amount"] - previous["tax_amount"]
+                if previous["total_with_tax"]:
+                    line["total_change_pct"] = (
+                        line["total_change"] / previous["total_with_tax"]
+                    )
+            lines.append(line)
+            previous = line
+        return lines
+
+    @api.model
+    def _format_period(self, period, granularity):
+        if granularity == "year":
+            return str(period.year)
+        if granularity == "quarter":
+            return f"Q{(period.month - 1) // 3 + 1} {period.year}"
+        return period.strftime("%B %Y")
+
+    @api.onchange("report_type", "comparison_granularity", "comparison_periods", "date_to")
+    def _onchange_comparison(self):
+        if self.report_type == "comparison" and self.date_to:
+            self.date_from = self._get_comparison_periods()[0]
 
     @api.onchange("date_from")
     def _onchange_date_from(self):
@@ -108,126 +387,352 @@ class ExpenseReportWizard(models.TransientModel):
             if wizard.date_from > wizard.date_to:
                 raise UserError(_("Start date must be before or equal to end date."))
 
+    def action_view_expenses(self):
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_window",
+            "name": _("Expenses"),
+            "res_model": "inventory.expense",
+            "view_mode": "list,form",
+            "domain": self._get_expense_domain(),
+            "target": "current",
+        }
+
+    def _get_report_range(self):
+        """Return the first and last dates the report reads data for."""
+        self.ensure_one()
+        if self.report_type == "comparison":
+            granularity = self.comparison_granularity or "month"
+            periods = self._get_comparison_periods()
+            step = COMPARISON_STEPS[granularity]
+            return periods[0], periods[-1] + step - timedelta(days=1)
+        return self.date_from, self.date_to
+
+    def _get_cached_report(self, report_format, touch=True):
+        """Return the cached rendering of this report (empty if none)."""
+        self.ensure_one()
+        Cache = self.env["inventory.expense.report.cache"]
+        key = Cache._get_key(self, report_format)
+        return Cache._lookup(key, touch=touch) if key else Cache
+
+    def _cache_report(self, report_format, content):
+        self.ensure_one()
+        Cache = self.env["inventory.expense.report.cache"]
+        key = Cache._get_key(self, report_format)
+        if key:
+            Cache._store(
+                key,
+                self,
+                report_format,
+                self._get_export_filename(report_format),
+                REPORT_MIMETYPES[report_format],
+                content,
+            )
+
+    def _should_run_in_background(self, report_format=None):
+        self.ensure_one()
+        if self.report_type in ("summary", "comparison", "consolidated"):
+            return False
+        if report_format and self._get_cached_report(report_format, touch=False):
+            return False
+        threshold = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param(
+                "inventory_expense.background_report_threshold",
+                default=DEFAULT_BACKGROUND_THRESHOLD,
+            )
+        )
+        return bool(threshold) and self.expense_count > threshold
+
+    def _get_report_job_values(self, report_format):
+        self.ensure_one()
+        return {
+            "date_from": self.date_from,
+            "date_to": self.date_to,
+            "company_id": self.company_id.id,
+            "report_type": self.report_type,
+            "summary_groupby": self.summary_groupby,
+            "comparison_granularity": self.comparison_granularity,
+            "comparison_periods": self.comparison_periods,
+            "report_format": report_format,
+        }
+
+    def _enqueue_report_job(self, report_format):
+        self.ensure_one()
+        job = self.env["inventory.expense.report.job"].enqueue(
+            self._get_report_job_values(report_format)
+        )
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "type": "info",
+                "title": _("Report Queued"),
+                "message": _(
+                    "%(name)s covers %(count)s expenses and is being generated in the "
+                    "background. You will be notified when it is ready.",
+                    name=job.name,
+                    count=self.expense_count,
+                ),
+                "next": {"type": "ir.actions.act_window_close"},
+            },
+        }
+
+    def _report_timer(self, report_format):
+        if self.report_type == "detailed":
+            metrics.inc(
+                "inventory_expense_report_rows_total",
+                self.expense_count,
+                format=report_format,
+            )
+        return metrics.timed(
+            "inventory_expense_report_render_seconds",
+            format=report_format,
+            report_type=self.report_type,
+        )
+
+    def _render_pdf(self):
+        self.ensure_one()
+        with self._report_timer("pdf"):
+            content, _report_format = self.env["ir.actions.report"]._render_qweb_pdf(
+                "inventory_expense.action_report_inventory_expense", self.ids
+            )
+            return content
+
     def action_generate_pdf(self):
         self.ensure_one()
+        if self._should_run_in_background("pdf"):
+            return self._enqueue_report_job("pdf")
+        if self.env["inventory.expense.report.cache"]._get_key(self, "pdf"):
+            # closed period: served (and cached) by the export controller
+            return self._export_action("pdf")
         return self.env.ref(
             "inventory_expense.action_report_inventory_expense"
         ).report_action(self)
 
+    def _iter_expense_rows(self, batch_size=EXPORT_BATCH_SIZE):
+        """Yield detail rows for the export, reading ``batch_size`` at a time.
+
+        Batches are paged with a keyset on ``(date, id)`` and the ORM cache is
+        dropped after each batch, so memory does not grow with the range.
+        """
+        self.ensure_one()
+        Expense = self.env["inventory.expense.all"]
+        domain = self._get_expense_domain()
+        read_fields = [
+            "date",
+            "name",
+            "total_without_tax",
+            "total_with_tax",
+            "tax_amount",
+            "user_id",
+        ]
+        last_date = last_id = None
+        while True:
+            batch_domain = domain
+            if last_id:
+                batch_domain = expression.AND(
+                    [
+                        domain,
+                        [
+                            "|",
+                            ("date", "<", last_date),
+                            "&",
+                            ("date", "=", last_date),
+                            ("id", "<", last_id),
+                        ],
+                    ]
+                )
+            records = Expense.search_read(
+                batch_domain, read_fields, order="date desc, id desc", limit=batch_size
+            )
+            for record in records:
+                yield (
+                    str(record["date"]),
+                    record["name"],
+                    record["total_without_tax"],
+                    record["total_with_tax"],
+                    record["tax_amount"] or 0,
+                    record["user_id"][1] if record["user_id"] else "",
+                )
+            if len(records) < batch_size:
+                break
+            last_date, last_id = records[-1]["date"], records[-1]["id"]
+            Expense.invalidate_model()
+
+    def _write_excel(self, fileobj, progress=None):
+        self.ensure_one()
+        date_from, date_to = self._get_report_range()
+        with self._report_timer("xlsx"):
+            writer = xlsx_export.ExpenseXlsxWriter()
+            writer.write_title(
+                "Inventory Expense Report",
+                [
+                    f"Period: {date_from} to {date_to}",
+                    "Companies: "
+                    + ", ".join(self._get_report_companies().mapped("name"))
+                    if self.report_type == "consolidated"
+                    else f"Company: {self.company_id.name}",
+                ],
+            )
+            writer.write_summary(
+                [
+                    ("Total Expenses:", self.expense_count, False),
+                    ("Total Paid:", self.total_with_tax, True),
+                    ("Total Tax:", self.total_tax, True),
+                    ("Total Subtotal:", self.total_without_tax, True),
+                ]
+            )
+            if self.report_type == "summary":
+                lines = self._get_summary_lines()
+                if lines:
+                    writer.write_table_header(
+                        [
+                            dict(self._fields["summary_groupby"].selection)[
+                                self.summary_groupby
+                            ],
+                            "Expenses",
+                            "Subtotal",
+                            "Total Paid",
+                            "Tax Paid",
+                        ]
+                    )
+                    writer.write_rows(
+                        (
+                            (
+                                line["label"],
+                                line["count"],
+                                line["total_without_tax"],
+                                line["total_with_tax"],
+                                line["tax_amount"],
+                            )
+                            for line in lines
+                        )
+                    )
+            elif self.report_type == "consolidated":
+                writer.write_table_header(
+                    [
+                        "Company",
+                        "Currency",
+                        "Expenses",
+                        "Total (Company Currency)",
+                        f"Subtotal ({self.currency_id.name})",
+                        f"Total Paid ({self.currency_id.name})",
+                        f"Tax Paid ({self.currency_id.name})",
+                    ]
+                )
+                writer.write_rows(
+                    (
+                        (
+                            line["label"],
+                            line["currency"],
+                            line["count"],
+                            line["local_total"],
+                            line["total_without_tax"],
+                            line["total_with_tax"],
+                            line["tax_amount"],
+                        )
+                        for line in self._get_consolidated_lines()
+                    ),
+                    amount_columns=(3, 4, 5, 6),
+                )
+            elif self.report_type == "comparison":
+                writer.write_table_header(
+                    [
+                        "Period",
+                        "Expenses",
+                        "Subtotal",
+                        "Total Paid",
+                        "Tax Paid",
+                        "Change",
+                        "Change %",
+                        "Tax Change",
+                    ]
+                )
+                writer.write_rows(
+                    (
+                        (
+                            line["label"],
+                            line["count"],
+                            line["total_without_tax"],
+                            line["total_with_tax"],
+                            line["tax_amount"],
+                            line["total_change"],
+                            line["total_change_pct"],
+                            line["tax_change"],
+                        )
+                        for line in self._get_comparison_lines()
+                    ),
+                    amount_columns=(2, 3, 4, 5, 7),
+                    percent_columns=(6,),
+                )
+            else:
+                writer.write_table_header()
+                rows = self._iter_expense_rows()
+                if progress:
+                    rows = _with_progress(rows, progress)
+                writer.write_rows(rows)
+            writer.save(fileobj)
+
     def action_export_excel(self):
         self.ensure_one()
-        if Workbook is None:
+        if xlsx_export.Workbook is None:
             raise UserError(
                 _(
                     "The openpyxl library is not installed. Please contact your system administrator."
                 )
             )
+        if self._should_run_in_background("xlsx"):
+            return self._enqueue_report_job("xlsx")
+        return self._export_action("xlsx")
 
-        workbook = Workbook()
-        sheet = workbook.active
-        sheet.title = "Expense Report"
-
-        header_font = Font(bold=True, size=12)
-        title_font = Font(bold=True, size=14)
-        currency_font = Font(bold=True)
-        border = Border(
-            left=Side(style="thin"),
-            right=Side(style="thin"),
-            top=Side(style="thin"),
-            bottom=Side(style="thin"),
-        )
-        header_fill = PatternFill(
-            start_color="4472C4", end_color="4472C4", fill_type="solid"
-        )
-        header_font_white = Font(bold=True, color="FFFFFF")
-
-        company = self.company_id
-        currency = self.currency_id
-
-        sheet["A1"] = "Inventory Expense Report"
-        sheet["A1"].font = title_font
-        sheet.merge_cells("A1:E1")
-
-        sheet["A2"] = f"Period: {self.date_from} to {self.date_to}"
-        sheet.merge_cells("A2:E2")
-
-        sheet["A3"] = f"Company: {company.name}"
-        sheet.merge_cells("A3:E3")
-
-        sheet["A5"] = "Summary"
-        sheet["A5"].font = header_font
-
-        sheet["A6"] = "Total Expenses:"
-        sheet["B6"] = self.expense_count
-        sheet["A7"] = "Total Paid:"
-        sheet["B7"] = self.total_with_tax
-        sheet["B7"].number_format = "#,##0.00"
-        sheet["A8"] = "Total Tax:"
-        sheet["B8"] = self.total_tax
-        sheet["B8"].number_format = "#,##0.00"
-        sheet["A9"] = "Total Subtotal:"
-        sheet["B9"] = self.total_without_tax
-        sheet["B9"].number_format = "#,##0.00"
-
-        start_row = 11
-        headers = [
-            "Date",
-            "Expense Name",
-            "Subtotal",
-            "Total Paid",
-            "Tax Paid",
-            "Created By",
-        ]
-        for col, header in enumerate(headers, 1):
-            cell = sheet.cell(row=start_row, column=col)
-            cell.value = header
-            cell.font = header_font_white
-            cell.fill = header_fill
-            cell.border = border
-            cell.alignment = Alignment(horizontal="center")
-
-        row = start_row + 1
-        for expense in self.expense_ids:
-            sheet.cell(row=row, column=1).value = str(expense.date)
-            sheet.cell(row=row, column=2).value = expense.name
-            sheet.cell(row=row, column=3).value = expense.total_without_tax
-            sheet.cell(row=row, column=3).number_format = "#,##0.00"
-            sheet.cell(row=row, column=4).value = expense.total_with_tax
-            sheet.cell(row=row, column=4).number_format = "#,##0.00"
-            sheet.cell(row=row, column=5).value = expense.tax_amount or 0
-            sheet.cell(row=row, column=5).number_format = "#,##0.00"
-            sheet.cell(row=row, column=6).value = expense.user_id.name or ""
-
-            for col in range(1, 7):
-                sheet.cell(row=row, column=col).border = border
-            row += 1
-
-        for col, width in [(1, 12), (2, 40), (3, 15), (4, 15), (5, 15), (6, 20)]:
-            sheet.column_dimensions[get_column_letter(col)].width = width
-
-        buffer = io.BytesIO()
-        workbook.save(buffer)
-        buffer.seek(0)
-
-        filename = f"expense_report_{self.date_from}_{self.date_to}.xlsx"
-
-        attachment = self.env["ir.attachment"].create(
-            {
-                "name": filename,
-                "type": "binary",
-                "datas": base64.b64encode(buffer.read()),
-                "res_model": self._name,
-                "res_id": self.id,
-                "mimetype": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            }
-        )
+    def action_export_csv(self):
+        return self._export_action("csv")
+
+    def action_export_jsonl(self):
+        return self._export_action("jsonl")
+
+    def _export_action(self, export_format):
+        """Download the export from the streaming controller.
 
+        Only PDF and Excel reports of closed periods are kept, in the report
+        cache.
+        """
+        self.ensure_one()
         return {
-            "type": "ir.actions.act_window",
-            "name": _("Excel Export"),
-            "res_model": "ir.attachment",
-            "res_id": attachment.id,
-            "view_mode": "form",
-            "views": [(False, "form")],
-            "target": "new",
+            "type": "ir.actions.act_url",
+            "url": f"/inventory_expense/export/{self.id}/{export_format}",
+            "target": "self",
         }
+
+    def _get_export_filename(self, export_format):
+        date_from, date_to = self._get_report_range()
+        return f"expense_report_{date_from}_{date_to}.{export_format}"
+
+    def _iter_export_records(self):
+        """Yield the report table as dicts, for the CSV and JSON Lines exports."""
+        self.ensure_one()
+        if self.report_type == "summary":
+            yield from self._get_summary_lines()
+        elif self.report_type == "consolidated":
+            yield from self._get_consolidated_lines()
+        elif self.report_type == "comparison":
+            yield from self._get_comparison_lines()
+        else:
+            for date, name, subtotal, total, tax, user in self._iter_expense_rows():
+                yield {
+                    "date": date,
+                    "name": name,
+                    "total_without_tax": subtotal,
+                    "total_with_tax": total,
+                    "tax_amount": tax,
+                    "user": user,
+                }
+
+    @api.autovacuum
+    def _gc_export_attachments(self):
+        """Remove Excel exports stored as attachments by earlier versions."""
+        self.env["ir.attachment"].sudo().search(
+            [("res_model", "=", self._name)]
+        ).unlink()
@@ -0,0 +1,87 @@
+from markupsafe import Markup
+
+from odoo import _, api, fields, models
+
+from ..tools import metrics
+
+
+def _format_labels(labels):
+    return ", ".join(f"{key}={value}" for key, value in labels.items())
+
+
+def _format_seconds(value):
+    if value is None:
+        return "> 60 s"
+    return f"{value * 1000:.1f} ms" if value < 1 else f"{value:.2f} s"
+
+
+class InventoryExpenseMetricsDashboard(models.TransientModel):
+    _name = "inventory.expense.metrics.dashboard"
+    _description = "Inventory Expense Metrics"
+
+    counters_html = fields.Html(
+        string="Counters",
+        compute="_compute_metrics",
+        sanitize=False,
+    )
+    histograms_html = fields.Html(
+        string="Latencies",
+        compute="_compute_metrics",
+        sanitize=False,
+    )
+
+    def _compute_metrics(self):
+        counters, histograms = metrics.snapshot()
+        counter_rows = Markup("").join(
+            Markup("<tr><td>%s</td><td>%s</td><td class='text-end'>%s</td></tr>")
+            % (item["name"], _format_labels(item["labels"]), item["value"])
+            for item in counters
+        )
+        histogram_rows = Markup("").join(
+            Markup(
+                "<tr><td>%s</td><td>%s</td><td class='text-end'>%s</td>"
+                "<td class='text-end'>%s</td><td class='text-end'>%s</td>"
+                "<td class='text-end'>%s</td></tr>"
+            )
+            % (
+                item["name"],
+                _format_labels(item["labels"]),
+                item["count"],
+                _format_seconds(item["sum"] / item["count"]),
+                _format_seconds(item["p50"]),
+                _format_seconds(item["p95"]),
+            )
+            for item in histograms
+            if item["count"]
+        )
+        for dashboard in self:
+            dashboard.counters_html = self._table(
+                [_("Metric"), _("Labels"), _("Value")], counter_rows
+            )
+            dashboard.histograms_html = self._table(
+                [_("Metric"), _("Labels"), _("Count"), _("Mean"), _("p50"), _("p95")],
+                histogram_rows,
+            )
+
+    @api.model
+    def _table(self, headers, rows):
+        if not rows:
+            return Markup("<p class='text-muted'>%s</p>") % _("Nothing recorded yet.")
+        header = Markup("").join(Markup("<th>%s</th>") % h for h in headers)
+        return Markup(
+            "<table class='table table-sm table-striped'><thead><tr>%s</tr></thead>"
+            "<tbody>%s</tbody></table>"
+        ) % (header, rows)
+
+    def action_refresh(self):
+        return {
+            "type": "ir.actions.act_window",
+            "name": _("Performance Metrics"),
+            "res_model": self._name,
+            "view_mode": "form",
+            "target": "current",
+        }
+
+    def action_reset(self):
+        metrics.reset()
+        return self.action_refresh()
@@ -0,0 +1,220 @@
+import base64
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from odoo import _, fields, models
+from odoo.exceptions import UserError
+
+from ..tools import metrics
+from ..tools.receipt_preprocess import get_mime_type
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class QuickAddBatchWizard(models.TransientModel):
+    _name = "quick.add.batch.wizard"
+    _description = "Batch Quick Add Expense Wizard"
+
+    attachment_ids = fields.Many2many(
+        comodel_name="ir.attachment",
+        string="Receipt Files",
+        help="Upload receipt images (JPG, PNG, GIF, WebP) or PDFs",
+    )
+    state = fields.Selection(
+        selection=[
+            ("draft", "Upload"),
+            ("done", "Done"),
+        ],
+        default="draft",
+    )
+    line_ids = fields.One2many(
+        comodel_name="quick.add.batch.wizard.line",
+        inverse_name="wizard_id",
+        string="Results",
+        readonly=True,
+    )
+    success_count = fields.Integer(
+        string="Extracted",
+        readonly=True,
+    )
+    failure_count = fields.Integer(
+        string="Failed",
+        readonly=True,
+    )
+    duration = fields.Float(
+        string="Duration (s)",
+        digits=(16, 2),
+        readonly=True,
+    )
+
+    def _get_max_workers(self):
+        value = (
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("inventory_expense.ai_max_workers", default=DEFAULT_MAX_WORKERS)
+        )
+        return max(1, int(value))
+
+    def _extract_all(self, receipts):
+        """Extract ``(data, mime_type)`` receipts concurrently.
+
+        Receipts already in the extraction cache are answered without an API
+        call. Returns one ``(extraction, error)`` tuple per receipt, in input
+        order.
+        """
+        QuickAdd = self.env["quick.add.wizard"]
+        Cache = self.env["inventory.expense.extraction.cache"]
+        config = QuickAdd._get_config()
+        cacheable = QuickAdd._get_provider_class(config, interactive=True).cacheable
+        checksums = [Cache._checksum(base64.b64decode(data)) for data, _m in receipts]
+        results = [
+            (cacheable and Cache._lookup(checksum, config), None)
+            for checksum in checksums
+        ]
+        pending = [index for index, (cached, _e) in enumerate(results) if not cached]
+        if len(pending) < len(receipts):
+            metrics.inc(
+                "inventory_expense_ai_extractions_total",
+                len(receipts) - len(pending),
+                provider=QuickAdd._get_provider_class(config, interactive=True).name,
+                outcome="cache_hit",
+            )
+        if not pending:
+            return results
+
+        provider = QuickAdd._get_provider(config, interactive=True)
+
+        def run(receipt):
+            data, mime_type = receipt
+            with metrics.timed(
+                "inventory_expense_ai_extraction_seconds", provider=provider.name
+            ) as labels:
+                try:
+                    result = provider.extract(data, mime_type), None
+                    labels["outcome"] = "success"
+                except Exception as e:
+                    _logger.warning("AI extraction failed: %s", e)
+                    result = None, str(e)
+                    labels["outcome"] = "failure"
+            metrics.inc("inventory_expense_ai_extractions_total", **labels)
+            return result
+
+        workers = min(self._get_max_workers(), len(pending))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="quick_add_ai"
+        ) as pool:
+            extracted = pool.map(run, [receipts[index] for index in pending])
+            for index, (extraction, error) in zip(pending, extracted):
+                results[index] = (extraction, error)
+                # unusable amounts are not kept: a retry asks the model again
+                if extraction and cacheable and not QuickAdd._check_extraction(
+                    extraction
+                ):
+                    Cache._store(checksums[index], config, extraction)
+        return results
+
+    def action_process(self):
+        self.ensure_one()
+        attachments = self.attachment_ids
+        if not attachments:
+            raise UserError(_("Please upload at least one receipt file."))
+
+        started = time.monotonic()
+        receipts = [(att.datas, get_mime_type(att.name)) for att in attachments]
+        results = self._extract_all(receipts)
+
+        QuickAdd = self.env["quick.add.wizard"]
+        # a result with unusable amounts falls back to a generic entry, so
+        # one bad receipt cannot fail the multi-create of the others
+        for index, (extraction, _error) in enumerate(results):
+            issue = extraction and QuickAdd._check_extraction(extraction)
+            if issue:
+                results[index] = (None, issue)
+        vals_list = [
+            QuickAdd._prepare_extracted_values(extraction, data, att.name)
+            for att, (data, _mime), (extraction, _error) in zip(
+                attachments, receipts, results
+            )
+        ]
+        expenses = (
+            self.env["inventory.expense"]
+            .with_context(inventory_expense_ledger="quick_add_ai")
+            .create(vals_list)
+        )
+
+        self.write(
+            {
+                "state": "done",
+                "success_count": sum(1 for extraction, _e in results if extraction),
+                "failure_count": sum(1 for extraction, _e in results if not extraction),
+                "duration": time.monotonic() - started,
+                "attachment_ids": [(5, 0, 0)],
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "filename": att.name,
+                            "expense_id": expense.id,
+                            "status": "success" if extraction else "failed",
+                            "message": error or False,
+                        },
+                    )
+                    for att, expense, (extraction, error) in zip(
+                        attachments, expenses, results
+                    )
+                ],
+            }
+        )
+        attachments.unlink()
+
+        return {
+            "type": "ir.actions.act_window",
+            "name": _("Batch Quick Add"),
+            "res_model": self._name,
+            "res_id": self.id,
+            "view_mode": "form",
+            "target": "new",
+        }
+
+    def action_view_expenses(self):
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_window",
+            "name": _("Expenses Created"),
+            "res_model": "inventory.expense",
+            "view_mode": "list,form",
+            "domain": [("id", "in", self.line_ids.expense_id.ids)],
+            "target": "current",
+        }
+
+
+class QuickAddBatchWizardLine(models.TransientModel):
+    _name = "quick.add.batch.wizard.line"
+    _description = "Batch Quick Add Result"
+
+    wizard_id = fields.Many2one(
+        comodel_name="quick.add.batch.wizard",
+        required=True,
+        ondelete="cascade",
+    )
+    filename = fields.Char(
+        string="File",
+    )
+    expense_id = fields.Many2one(
+        comodel_name="inventory.expense",
+        string="Expense",
+    )
+    status = fields.Selection(
+        selection=[
+            ("success", "Extracted"),
+            ("failed", "Failed"),
+        ],
+        string="Status",
+    )
+    message = fields.Char(
+        string="Details",
+    )
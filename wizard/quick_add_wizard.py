@@ -1,10 +1,14 @@
-import json
 import logging
+import math
 import os
 from datetime import datetime
 
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError
+from odoo.tools import str2bool
+
+from ..tools import extraction_providers, openai_client, receipt_preprocess
+from ..tools.receipt_preprocess import get_mime_type
 
 _logger = logging.getLogger(__name__)
 
@@ -17,6 +21,22 @@ DEFAULT_EXTRACTION_PROMPT = """Extract the following information from this recei
 Be precise with the numbers. If you cannot clearly read a value, set it to null.
 Return the result as a JSON object with these exact keys: vendor_name, date, subtotal, total."""
 
+EXTRACTION_PROMPT_VERSION = "1"
+
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 60.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_PROVIDER = "openai_chat"
+
+
+def _parse_amount(value):
+    """Return ``value`` as a non-negative amount, or ``None`` if it is not one."""
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        return None
+    return amount if math.isfinite(amount) and amount >= 0 else None
+
 
 class QuickAddWizard(models.TransientModel):
     _name = "quick.add.wizard"
@@ -32,22 +52,12 @@ class QuickAddWizard(models.TransientModel):
     )
 
     def _get_mime_type(self):
-        if self.receipt_filename:
-            ext = self.receipt_filename.lower().split(".")[-1]
-            mime_map = {
-                "jpg": "image/jpeg",
-                "jpeg": "image/jpeg",
-                "png": "image/png",
-                "gif": "image/gif",
-                "webp": "image/webp",
-                "pdf": "application/pdf",
-            }
-            return mime_map.get(ext, "image/jpeg")
-        return "image/jpeg"
+        return get_mime_type(self.receipt_filename)
 
+    @api.model
     def _get_openai_client(self):
         try:
-            from openai import OpenAI
+            import openai  # noqa: F401
         except ImportError:
             raise UserError(
                 _("OpenAI library is not installed. Please contact your administrator.")
@@ -63,73 +73,92 @@ class QuickAddWizard(models.TransientModel):
                 )
             )
 
-        return OpenAI(api_key=api_key, base_url=base_url)
+        return openai_client.get_client(api_key, base_url)
 
+    @api.model
     def _get_config(self):
         get_param = self.env["ir.config_parameter"].sudo().get_param
         return {
             "model": get_param("inventory_expense.openai_model", default="gpt-4o-mini"),
             "prompt": DEFAULT_EXTRACTION_PROMPT,
+            "prompt_version": EXTRACTION_PROMPT_VERSION,
+            "connect_timeout": float(
+                get_param(
+                    "inventory_expense.openai_connect_timeout",
+                    default=DEFAULT_CONNECT_TIMEOUT,
+                )
+            ),
+            "read_timeout": float(
+                get_param(
+                    "inventory_expense.openai_read_timeout",
+                    default=DEFAULT_READ_TIMEOUT,
+                )
+            ),
+            "max_retries": int(
+                get_param(
+                    "inventory_expense.openai_max_retries",
+                    default=DEFAULT_MAX_RETRIES,
+                )
+            ),
+            "preprocess": str2bool(
+                get_param("inventory_expense.receipt_preprocess", default="True")
+            ),
+            "max_dimension": int(
+                get_param(
+                    "inventory_expense.receipt_max_dimension",
+                    default=receipt_preprocess.DEFAULT_MAX_DIMENSION,
+                )
+            ),
+            "image_format": get_param(
+                "inventory_expense.receipt_image_format",
+                default=receipt_preprocess.DEFAULT_FORMAT,
+            ),
+            "image_detail": get_param(
+                "inventory_expense.receipt_image_detail",
+                default=extraction_providers.DEFAULT_IMAGE_DETAIL,
+            ),
+            "provider": get_param(
+                "inventory_expense.extraction_provider", default=DEFAULT_PROVIDER
+            ),
         }
 
-    def _extract_with_ai(self):
-        self.ensure_one()
-
-        client = self._get_openai_client()
-        config = self._get_config()
-        mime_type = self._get_mime_type()
-
-        file_data = self.receipt_file
-        if isinstance(file_data, bytes):
-            file_data = file_data.decode("utf-8")
-        image_url = f"data:{mime_type};base64,{file_data}"
-
-        try:
-            response = client.chat.completions.create(
-                model=config["model"],
-                messages=[
-                    {
-                        "role": "system",
-                        "content": config["prompt"],
-                    },
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": image_url,
-                                    "detail": "high",
-                                },
-                            }
-                        ],
-                    },
-                ],
-                response_format={"type": "json_object"},
-                max_tokens=500,
-            )
-
-            content = response.choices[0].message.content
-            if not content:
-                return None
-
-            data = json.loads(content)
-            return {
-                "vendor_name": data.get("vendor_name"),
-                "date": data.get("date"),
-                "subtotal": data.get("subtotal"),
-                "total": data.get("total"),
-            }
-
-        except json.JSONDecodeError as e:
-            _logger.warning("Failed to parse AI response as JSON: %s", e)
-            return None
-        except Exception as e:
-            _logger.error("AI extraction failed: %s", e)
-            return None
+    @api.model
+    def _get_provider_class(self, config, interactive=False):
+        provider_class = extraction_providers.PROVIDERS.get(
+            config["provider"], extraction_providers.OpenAIChatProvider
+        )
+        if interactive and provider_class.batch:
+            # the user is waiting for the answer: use the chat endpoint
+            return extraction_providers.OpenAIChatProvider
+        return provider_class
+
+    @api.model
+    def _get_provider(self, config=None, interactive=False):
+        """Return the configured extraction provider.
+
+        Interactive callers always get an immediate (non-batch) provider.
+        Providers calling the API share the database-wide rate limiter.
+        """
+        config = config or self._get_config()
+        provider_class = self._get_provider_class(config, interactive=interactive)
+        if not provider_class.needs_client:
+            return provider_class(config)
+        return provider_class(
+            config,
+            client=self._get_openai_client(),
+            limiter=self.env["inventory.expense.rate.bucket"]._get_limiter(),
+        )
 
-    def _create_expense(
-        self, name, date=None, subtotal=None, total=None, needs_review=False
+    @api.model
+    def _prepare_expense_values(
+        self,
+        name,
+        date=None,
+        subtotal=None,
+        total=None,
+        needs_review=False,
+        receipt_file=None,
+        receipt_filename=None,
     ):
         today = fields.Date.context_today(self)
 
@@ -141,18 +170,71 @@ class QuickAddWizard(models.TransientModel):
         else:
             parsed_date = today
 
-        expense = self.env["inventory.expense"].create(
-            {
-                "name": name,
-                "date": parsed_date,
-                "total_without_tax": subtotal if subtotal is not None else 0.0,
-                "total_with_tax": total if total is not None else 0.0,
-                "receipt_image": self.receipt_file,
-                "receipt_filename": self.receipt_filename,
-                "needs_review": needs_review,
-            }
+        return {
+            "name": name,
+            "date": parsed_date,
+            "total_without_tax": subtotal if subtotal is not None else 0.0,
+            "total_with_tax": total if total is not None else 0.0,
+            "receipt_image": receipt_file,
+            "receipt_filename": receipt_filename,
+            "needs_review": needs_review,
+        }
+
+    @api.model
+    def _check_extraction(self, extraction):
+        """Return why the amounts of an AI result are unusable, or ``None``."""
+        subtotal = extraction.get("subtotal")
+        total = _parse_amount(extraction.get("total"))
+        if total is None:
+            return _("No valid total was read from the receipt.")
+        if subtotal is not None and _parse_amount(subtotal) is None:
+            return _("No valid subtotal was read from the receipt.")
+        if (_parse_amount(subtotal) or 0.0) > total:
+            return _("The subtotal read from the receipt exceeds its total.")
+        return None
+
+    @api.model
+    def _prepare_extracted_values(self, extraction, receipt_file, receipt_filename):
+        """Expense values for an AI result, or a generic entry if it failed.
+
+        Amounts that cannot be stored as read are clamped; the expense is
+        flagged for review either way.
+        """
+        today = fields.Date.context_today(self)
+        if not extraction:
+            return self._prepare_expense_values(
+                name=f"Quick Add - {today}",
+                receipt_file=receipt_file,
+                receipt_filename=receipt_filename,
+            )
+        subtotal = _parse_amount(extraction.get("subtotal")) or 0.0
+        total = _parse_amount(extraction.get("total")) or subtotal
+        values = self._prepare_expense_values(
+            name=extraction.get("vendor_name") or f"Quick Add - {today}",
+            date=extraction.get("date"),
+            subtotal=min(subtotal, total),
+            total=total,
+            needs_review=True,
+            receipt_file=receipt_file,
+            receipt_filename=receipt_filename,
+        )
+        values["vendor_name"] = extraction.get("vendor_name") or False
+        return values
+
+    def _create_expense(
+        self, name, date=None, subtotal=None, total=None, needs_review=False
+    ):
+        return self.env["inventory.expense"].create(
+            self._prepare_expense_values(
+                name,
+                date=date,
+                subtotal=subtotal,
+                total=total,
+                needs_review=needs_review,
+                receipt_file=self.receipt_file,
+                receipt_filename=self.receipt_filename,
+            )
         )
-        return expense
 
     def action_quick_add(self):
         self.ensure_one()
@@ -180,50 +262,23 @@ class QuickAddWizard(models.TransientModel):
         if not self.receipt_file:
             raise UserError(_("Please upload a receipt file."))
 
-        extraction = self._extract_with_ai()
-        today = fields.Date.context_today(self)
-
-        if extraction:
-            vendor_name = extraction.get("vendor_name") or f"Quick Add - {today}"
-            date = extraction.get("date")
-            subtotal = extraction.get("subtotal")
-            total = extraction.get("total")
-
-            if subtotal is None:
-                subtotal = 0.0
-            if total is None:
-                total = 0.0
-
-            expense = self._create_expense(
-                name=vendor_name,
-                date=date,
-                subtotal=subtotal,
-                total=total,
-                needs_review=True,
+        expense = self.env["inventory.expense"].with_context(
+            inventory_expense_ledger="quick_add_ai"
+        ).create(
+            dict(
+                self._prepare_extracted_values(
+                    None, self.receipt_file, self.receipt_filename
+                ),
+                extraction_state="pending",
             )
+        )
+        expense._trigger_extraction()
 
-            return {
-                "type": "ir.actions.act_window",
-                "name": _("Expense Created"),
-                "res_model": "inventory.expense",
-                "res_id": expense.id,
-                "view_mode": "form",
-                "target": "current",
-            }
-        else:
-            name = f"Quick Add - {today}"
-            expense = self._create_expense(name=name)
-
-            return {
-                "type": "ir.actions.act_window",
-                "name": _("Expense Created"),
-                "res_model": "inventory.expense",
-                "res_id": expense.id,
-                "view_mode": "form",
-                "target": "current",
-                "context": {
-                    "default_message": _(
-                        "AI extraction failed. Created expense with generic name. Please review and update manually."
-                    )
-                },
-            }
+        return {
+            "type": "ir.actions.act_window",
+            "name": _("Expense Created"),
+            "res_model": "inventory.expense",
+            "res_id": expense.id,
+            "view_mode": "form",
+            "target": "current",
+        }